@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Cleaner Backend Benchmark
+=========================
+
+Times ElectoralDataCleaner.clean() (pandas) against
+PolarsElectoralDataCleaner.clean() (one Polars LazyFrame plan) on the same
+homologated frame, and checks that both give identical output.
+
+Usage:
+    uv run python analytics/benchmarks/bench_cleaner_backends.py
+    uv run python analytics/benchmarks/bench_cleaner_backends.py --rows 1000000 --years 2024
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import polars as pl
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parents[1] / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from analytics.clean_votes import ElectoralDataReader, ColumnMapper, ElectoralDataCleaner, PolarsElectoralDataCleaner
+from synthetic import write_prep_csv, layout_years
+
+
+def best_time(cleaner, df: pd.DataFrame, repeat: int):
+    """Best wall-clock time of `repeat` clean() runs, and the last result."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = cleaner.clean(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark pandas vs Polars cleaning')
+    parser.add_argument('--rows', type=int, default=200_000, help='Casillas per file (default: 200000)')
+    parser.add_argument('--years', nargs='+', default=layout_years(), help='Layouts to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions per backend (default: 3)')
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    print("\n" + "="*70)
+    print(f"CLEANER BACKEND BENCHMARK ({args.rows:,} rows, {pl.thread_pool_size()} Polars threads)")
+    print("="*70)
+    print(f"{'Layout':<8}{'pandas (s)':>14}{'polars (s)':>14}{'Speedup':>12}{'Identical':>12}")
+    print("-"*70)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for year in args.years:
+            file_path = write_prep_csv(Path(tmp) / f'PREP_{year}.csv', year, args.rows)
+            df = ColumnMapper().homologate_columns(ElectoralDataReader().read_file(str(file_path)))
+            
+            t_pandas, expected = best_time(ElectoralDataCleaner(), df, args.repeat)
+            t_polars, result = best_time(PolarsElectoralDataCleaner(), df, args.repeat)
+            identical = result.equals(expected) and (result.dtypes == expected.dtypes).all()
+            
+            print(f"{year:<8}{t_pandas:>14.2f}{t_polars:>14.2f}{t_pandas / t_polars:>11.1f}x{str(identical):>12}")
+    
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+CSV Engine Benchmark
+====================
+
+Compares the pandas and PyArrow CSV parse engines of ElectoralDataReader
+on synthetic 2018, 2021 and 2024 PREP layouts.
+
+Usage:
+    uv run python analytics/benchmarks/bench_csv_engines.py
+    uv run python analytics/benchmarks/bench_csv_engines.py --rows 2000000 --repeat 3
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parents[1] / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from analytics.clean_votes import ElectoralDataReader
+from synthetic import write_prep_csv, layout_years
+
+
+def time_read(reader: ElectoralDataReader, file_path: Path, repeat: int) -> float:
+    """Best wall-clock time of `repeat` full reads."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        reader.read_file(str(file_path))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark CSV parse engines')
+    parser.add_argument('--rows', type=int, default=500_000, help='Casillas per file (default: 500000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions per measurement (default: 3)')
+    parser.add_argument('--years', nargs='+', default=layout_years(), help='Layouts to benchmark')
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    print("\n" + "="*70)
+    print(f"CSV ENGINE BENCHMARK ({args.rows:,} rows, best of {args.repeat})")
+    print("="*70)
+    print(f"{'Layout':<8}{'Size (MB)':>12}{'pandas (s)':>14}{'pyarrow (s)':>14}{'Speedup':>10}")
+    print("-"*70)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for year in args.years:
+            file_path = write_prep_csv(Path(tmp) / f'PREP_{year}.csv', year, args.rows)
+            size_mb = file_path.stat().st_size / 1024 / 1024
+            
+            t_pandas = time_read(ElectoralDataReader(csv_engine='pandas'), file_path, args.repeat)
+            t_arrow = time_read(ElectoralDataReader(csv_engine='pyarrow'), file_path, args.repeat)
+            
+            print(f"{year:<8}{size_mb:>12.1f}{t_pandas:>14.2f}{t_arrow:>14.2f}{t_pandas / t_arrow:>9.1f}x")
+    
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    main()
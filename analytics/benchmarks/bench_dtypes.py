@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Dtype Profile Memory Benchmark
+==============================
+
+Measures peak resident memory of read + homologate + clean with the default
+dtypes (object labels, float64 counts and percentages) and with
+CompactDtypeProfile (categoricals, int32 counts, float32 percentages).
+
+Every measurement runs in a fresh subprocess so peak RSS is not polluted by
+earlier runs. "Working set" is peak RSS minus the RSS after imports.
+
+Usage:
+    uv run python analytics/benchmarks/bench_dtypes.py
+    uv run python analytics/benchmarks/bench_dtypes.py --rows 200000 --years 2024
+"""
+
+import argparse
+import json
+import logging
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parents[1] / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from analytics.clean_votes import ElectoralDataReader, ColumnMapper, ElectoralDataCleaner, CompactDtypeProfile
+from synthetic import write_prep_csv, layout_years
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MB.
+    
+    Uses VmHWM on Linux: ru_maxrss survives exec, so a child started by a
+    large parent would report the parent's peak.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_once(file_path: str, engine: str, compact: bool) -> dict:
+    """Read, homologate and clean one file; report peak memory and time."""
+    logging.disable(logging.INFO)
+    profile = CompactDtypeProfile() if compact else None
+    
+    reader = ElectoralDataReader(csv_engine=engine)
+    mapper = ColumnMapper(dtype_profile=profile)
+    cleaner = ElectoralDataCleaner(dtype_profile=profile)
+    
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    df_raw = reader.read_file(file_path)
+    raw_mb = df_raw.memory_usage(deep=True).sum() / 1024 / 1024
+    df_clean = cleaner.clean(mapper.homologate_columns(df_raw))
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'working_set_mb': peak_rss_mb() - baseline,
+        'raw_frame_mb': raw_mb,
+        'clean_frame_mb': df_clean.memory_usage(deep=True).sum() / 1024 / 1024,
+        'seconds': elapsed,
+    }
+
+
+def measure(file_path: Path, engine: str, compact: bool) -> dict:
+    """Run one measurement in a fresh interpreter."""
+    cmd = [sys.executable, __file__, '--child', str(file_path), '--engine', engine]
+    if compact:
+        cmd.append('--compact')
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark memory of the compact dtype profile')
+    parser.add_argument('--rows', type=int, default=50_000, help='Casillas per file (default: 50000)')
+    parser.add_argument('--years', nargs='+', default=layout_years(), help='Layouts to benchmark')
+    parser.add_argument('--engine', choices=ElectoralDataReader.CSV_ENGINES, default='pandas', help='CSV parse engine')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--compact', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        print(json.dumps(run_once(args.child, args.engine, args.compact)))
+        return
+    
+    print("\n" + "="*86)
+    print(f"DTYPE PROFILE MEMORY BENCHMARK ({args.rows:,} rows, {args.engine} engine)")
+    print("="*86)
+    print(f"{'Layout':<8}{'Profile':<10}{'Working set (MB)':>18}{'Raw frame (MB)':>16}"
+          f"{'Clean frame (MB)':>18}{'Time (s)':>10}")
+    print("-"*86)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for year in args.years:
+            file_path = write_prep_csv(Path(tmp) / f'PREP_{year}.csv', year, args.rows)
+            results = {}
+            for compact in (False, True):
+                result = measure(file_path, args.engine, compact)
+                results[compact] = result
+                print(f"{year:<8}{'compact' if compact else 'default':<10}"
+                      f"{result['working_set_mb']:>18.1f}{result['raw_frame_mb']:>16.1f}"
+                      f"{result['clean_frame_mb']:>18.1f}{result['seconds']:>10.2f}")
+            ratio = results[False]['working_set_mb'] / max(results[True]['working_set_mb'], 1e-9)
+            print(f"{'':<8}{'ratio':<10}{ratio:>17.1f}x")
+    
+    print("="*86 + "\n")
+
+
+if __name__ == '__main__':
+    main()
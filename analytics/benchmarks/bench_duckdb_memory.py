@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Out-of-Core Cleaning Memory Benchmark
+=====================================
+
+Measures peak resident memory and time of cleaning one PREP file with:
+
+- pandas:    read the whole file, then ElectoralDataCleaner.clean()
+- streaming: read in chunks, then ElectoralDataCleaner.clean_chunks()
+- duckdb:    DuckDBElectoralDataCleaner.clean_file() on the CSV itself
+
+Every measurement runs in a fresh subprocess so peak RSS is not polluted by
+earlier runs. "Working set" is peak RSS minus the RSS after imports.
+
+Usage:
+    uv run python analytics/benchmarks/bench_duckdb_memory.py
+    uv run python analytics/benchmarks/bench_duckdb_memory.py --rows 2000000 --memory-limit 1GB
+    uv run python analytics/benchmarks/bench_duckdb_memory.py --rows 250000 500000 1000000
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parents[1] / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from analytics.clean_votes import ElectoralDataReader, ColumnMapper, ElectoralDataCleaner, DuckDBElectoralDataCleaner
+from bench_dtypes import peak_rss_mb
+from synthetic import write_prep_csv
+
+MODES = ['pandas', 'streaming', 'duckdb']
+
+
+def run_once(file_path: str, mode: str, memory_limit: str) -> dict:
+    """Clean one file with one mode; report peak memory and time."""
+    logging.disable(logging.INFO)
+    reader = ElectoralDataReader()
+    mapper = ColumnMapper()
+    
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == 'pandas':
+        df_clean = ElectoralDataCleaner().clean(mapper.homologate_columns(reader.read_file(file_path)))
+    elif mode == 'streaming':
+        chunks = (mapper.homologate_columns(c) for c in reader.read_file_chunks(file_path))
+        df_clean = ElectoralDataCleaner().clean_chunks(chunks)
+    else:
+        df_clean = DuckDBElectoralDataCleaner(memory_limit=memory_limit).clean_file(file_path, reader, mapper)
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'working_set_mb': peak_rss_mb() - baseline,
+        'sections': len(df_clean),
+        'seconds': elapsed,
+    }
+
+
+def measure(file_path: Path, mode: str, memory_limit: str) -> dict:
+    """Run one measurement in a fresh interpreter."""
+    cmd = [sys.executable, __file__, '--child', str(file_path), '--mode', mode, '--memory-limit', memory_limit]
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark memory of out-of-core DuckDB cleaning')
+    parser.add_argument('--rows', type=int, nargs='+', default=[250_000, 1_000_000], help='Casillas per file')
+    parser.add_argument('--sections', type=int, default=2_200,
+                        help='Sections per entidad (default: 2200, about 70k nationally like a real PREP file)')
+    parser.add_argument('--year', default='2024', help='Layout to benchmark (default: 2024)')
+    parser.add_argument('--memory-limit', default='256MB', help='DuckDB memory limit (default: 256MB)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        print(json.dumps(run_once(args.child, args.mode, args.memory_limit)))
+        return
+    
+    print("\n" + "="*70)
+    print(f"OUT-OF-CORE MEMORY BENCHMARK ({args.year} layout, DuckDB limit {args.memory_limit})")
+    print("="*70)
+    print(f"{'Rows':>10}{'File (MB)':>11}  {'Mode':<12}{'Working set (MB)':>18}{'Sections':>10}{'Time (s)':>9}")
+    print("-"*70)
+    
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = write_prep_csv(Path(tmp) / f'PREP_{args.year}.csv', args.year, n_rows, n_sections=args.sections)
+            file_mb = file_path.stat().st_size / 1024 / 1024
+            for mode in MODES:
+                result = measure(file_path, mode, args.memory_limit)
+                print(f"{n_rows:>10,}{file_mb:>11.0f}  {mode:<12}{result['working_set_mb']:>18.1f}"
+                      f"{result['sections']:>10,}{result['seconds']:>9.2f}")
+    
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    main()
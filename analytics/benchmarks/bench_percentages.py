@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Percentage Computation Benchmark
+================================
+
+Compares the row-wise {party}_PCT computation (one Python call per row and
+party) with the vectorized ElectoralDataCleaner._add_percentages, and checks
+that both give bit-identical shares.
+
+Usage:
+    uv run python analytics/benchmarks/bench_percentages.py
+    uv run python analytics/benchmarks/bench_percentages.py --rows 10000 100000 --parties 20
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parents[1] / 'src'))
+
+from analytics.clean_votes import ElectoralDataCleaner
+
+
+def build_votes(n_rows: int, n_parties: int, seed: int = 0) -> pd.DataFrame:
+    """Vote counts with TOTAL_VOTOS_SUM; about 1% of rows have no votes."""
+    rng = np.random.default_rng(seed)
+    columns = [f'P{i:02d}' for i in range(n_parties)]
+    votes = rng.integers(0, 300, size=(n_rows, n_parties)).astype('float64')
+    votes[rng.random(n_rows) < 0.01] = 0
+    df = pd.DataFrame(votes, columns=columns)
+    df['TOTAL_VOTOS_SUM'] = df[columns].sum(axis=1)
+    return df
+
+
+def row_wise(df: pd.DataFrame, vote_columns) -> pd.DataFrame:
+    """The previous implementation: DataFrame.apply(axis=1) per party."""
+    df_votes = df[vote_columns + ['TOTAL_VOTOS_SUM']]
+    for col in vote_columns:
+        df[f'{col}_PCT'] = df_votes.apply(
+            lambda row: (row[col] / row['TOTAL_VOTOS_SUM']) * 100 if row['TOTAL_VOTOS_SUM'] > 0 else 0,
+            axis=1
+        )
+    return df
+
+
+def best_time(func, df: pd.DataFrame, vote_columns, repeat: int):
+    """Best wall-clock time of `repeat` runs, and the last result."""
+    best = float('inf')
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        result = func(frame, vote_columns)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark percentage computation')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 70_000], help='Rows per frame')
+    parser.add_argument('--parties', type=int, default=20, help='Vote columns (default: 20)')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions of the vectorized run (default: 3)')
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    cleaner = ElectoralDataCleaner()
+    
+    print("\n" + "="*70)
+    print(f"PERCENTAGE BENCHMARK ({args.parties} parties)")
+    print("="*70)
+    print(f"{'Rows':>10}{'row-wise (s)':>16}{'vectorized (s)':>18}{'Speedup':>12}{'Identical':>12}")
+    print("-"*70)
+    
+    for n_rows in args.rows:
+        df = build_votes(n_rows, args.parties)
+        vote_columns = [col for col in df.columns if col != 'TOTAL_VOTOS_SUM']
+        
+        t_rows, expected = best_time(row_wise, df, vote_columns, 1)
+        t_vec, result = best_time(cleaner._add_percentages, df, vote_columns, args.repeat)
+        
+        pct_columns = [f'{col}_PCT' for col in vote_columns]
+        identical = np.array_equal(result[pct_columns].to_numpy(), expected[pct_columns].to_numpy(dtype='float64'))
+        
+        print(f"{n_rows:>10,}{t_rows:>16.2f}{t_vec:>18.4f}{t_rows / t_vec:>11.0f}x{str(identical):>12}")
+    
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    main()
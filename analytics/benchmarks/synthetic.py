@@ -0,0 +1,159 @@
+"""
+Synthetic PREP Files
+====================
+
+Generates casilla-level CSV files in the 2018, 2021 and 2024 PREP layouts
+for benchmarking the clean_votes pipeline without real INE downloads.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Column layouts as published by INE (subset relevant to the pipeline)
+LAYOUTS: Dict[str, Dict] = {
+    '2018': {
+        'delimiter': '|',
+        'columns': [
+            'CLAVE_CASILLA', 'CLAVE_ACTA', 'ID_ESTADO', 'NOMBRE_ESTADO', 'ID_DISTRITO',
+            'NOMBRE_DISTRITO', 'SECCION', 'ID_CASILLA', 'TIPO_CASILLA', 'EXT_CONTIGUA',
+            'CASILLA', 'NUM_ACTA_IMPRESO', 'PAN', 'PRI', 'PRD', 'PVEM', 'PT',
+            'MOVIMIENTO CIUDADANO', 'NUEVA ALIANZA', 'MORENA', 'ENCUENTRO SOCIAL',
+            'PAN_PRD_MC', 'PAN_PRD', 'PAN_MC', 'PRD_MC', 'PRI_PVEM_NA', 'PRI_PVEM',
+            'PRI_NA', 'PVEM_NA', 'PT_MORENA_PES', 'PT_MORENA', 'PT_PES', 'MORENA_PES',
+            'CAND_IND_01', 'CAND_IND_02', 'CNR', 'VN', 'TOTAL_VOTOS_CALCULADOS',
+            'LISTA_NOMINAL_CASILLA', 'OBSERVACIONES', 'MECANISMOS_TRASLADO', 'FECHA_HORA', '',
+        ],
+    },
+    '2021': {
+        'delimiter': '|',
+        'columns': [
+            'CLAVE_CASILLA', 'CLAVE_ACTA', 'ID_ESTADO', 'NOMBRE_ESTADO', 'ID_DISTRITO',
+            'NOMBRE_DISTRITO', 'SECCION', 'ID_CASILLA', 'TIPO_CASILLA', 'EXT_CONTIGUA',
+            'CASILLA', 'TIPO_ACTA', 'PAN', 'PRI', 'PRD', 'PVEM', 'PT', 'MC', 'MORENA',
+            'PES', 'RSP', 'FXM', 'PAN-PRI-PRD', 'PAN-PRI', 'PAN-PRD', 'PRI-PRD',
+            'PVEM_PT_MORENA', 'PVEM_PT', 'PVEM_MORENA', 'PT_MORENA',
+            'CANDIDATO/A NO REGISTRADO/A', 'VOTOS NULOS', 'TOTAL_VOTOS_CALCULADOS',
+            'LISTA_NOMINAL_CASILLA', 'OBSERVACIONES', 'CONTABILIZADA', 'MECANISMOS_TRASLADO',
+            'FECHA_HORA_ACOPIO', 'FECHA_HORA_CAPTURA', 'FECHA_HORA_VERIFICACION', 'ORIGEN',
+            'DIGITALIZACION', 'TIPO_DOCUMENTO', 'COTEJADA', '',
+        ],
+    },
+    '2024': {
+        'delimiter': ',',
+        'columns': [
+            'CLAVE_CASILLA', 'CLAVE_ACTA', 'ID_ENTIDAD', 'ENTIDAD', 'ID_DISTRITO_FEDERAL',
+            'DISTRITO_FEDERAL', 'SECCION', 'ID_CASILLA', 'TIPO_CASILLA', 'EXT_CONTIGUA',
+            'UBICACION_CASILLA', 'TIPO_ACTA', 'TOTAL_BOLETAS_SOBRANTES',
+            'TOTAL_PERSONAS_VOTARON', 'TOTAL_REP_PARTIDO_CI_VOTARON', 'TOTAL_VOTOS_SACADOS',
+            'PAN', 'PRI', 'PRD', 'PVEM', 'PT', 'MC', 'MORENA', 'PAN-PRI-PRD', 'PAN-PRI',
+            'PAN-PRD', 'PRI-PRD', 'PVEM_PT_MORENA', 'PVEM_PT', 'PVEM_MORENA', 'PT_MORENA',
+            'NO_REGISTRADAS', 'NULOS', 'TOTAL_VOTOS_ASENTADO', 'TOTAL_VOTOS_CALCULADO',
+            'LISTA_NOMINAL', 'REPRESENTANTES_PP_CI', 'OBSERVACIONES', 'CONTABILIZADA',
+            'MECANISMOS_TRASLADO', 'CODIGO_INTEGRIDAD', 'FECHA_HORA_ACOPIO',
+            'FECHA_HORA_CAPTURA', 'FECHA_HORA_VERIFICACION', 'ORIGEN', 'DIGITALIZACION',
+            'TIPO_DOCUMENTO', 'COTEJADA',
+        ],
+    },
+}
+
+# Rows generated at a time by write_prep_csv, so large files fit in memory
+BLOCK_ROWS = 200_000
+
+ID_ENTIDAD_COLUMNS = {'ID_ESTADO', 'ID_ENTIDAD'}
+ENTIDAD_COLUMNS = {'NOMBRE_ESTADO', 'ENTIDAD'}
+ID_DISTRITO_COLUMNS = {'ID_DISTRITO', 'ID_DISTRITO_FEDERAL'}
+DISTRITO_COLUMNS = {'NOMBRE_DISTRITO', 'DISTRITO_FEDERAL'}
+LISTA_COLUMNS = {'LISTA_NOMINAL', 'LISTA_NOMINAL_CASILLA'}
+TEXT_COLUMNS = {
+    'OBSERVACIONES', 'MECANISMOS_TRASLADO', 'CODIGO_INTEGRIDAD', 'REPRESENTANTES_PP_CI',
+    'FECHA_HORA', 'FECHA_HORA_ACOPIO', 'FECHA_HORA_CAPTURA', 'FECHA_HORA_VERIFICACION',
+    'ORIGEN', 'DIGITALIZACION', 'TIPO_DOCUMENTO', 'COTEJADA', 'CONTABILIZADA', 'TIPO_ACTA',
+    'UBICACION_CASILLA', 'EXT_CONTIGUA', 'CASILLA', 'NUM_ACTA_IMPRESO',
+}
+
+
+def build_frame(year: str, n_rows: int, seed: int = 0, n_sections: Optional[int] = None) -> pd.DataFrame:
+    """
+    Build a casilla-level DataFrame of strings in the given PREP layout.
+    
+    Args:
+        year: Layout year ('2018', '2021' or '2024')
+        n_rows: Number of casillas
+        seed: Random seed
+        n_sections: Section numbers to draw from (default: one per 64 casillas)
+        
+    Returns:
+        DataFrame with one string column per layout column
+    """
+    rng = np.random.default_rng(seed)
+    entidad = rng.integers(1, 33, n_rows)
+    distrito = rng.integers(1, 21, n_rows)
+    # ~70k sections nationally, ~2 casillas per section
+    seccion = rng.integers(1, n_sections or max(n_rows // 64, 2), n_rows)
+    
+    data = {}
+    for col in LAYOUTS[year]['columns']:
+        if col in ID_ENTIDAD_COLUMNS:
+            values = entidad.astype(str)
+        elif col in ENTIDAD_COLUMNS:
+            values = np.char.add('ENTIDAD ', entidad.astype(str))
+        elif col in ID_DISTRITO_COLUMNS:
+            values = distrito.astype(str)
+        elif col in DISTRITO_COLUMNS:
+            values = np.char.add('DISTRITO ', distrito.astype(str))
+        elif col == 'SECCION':
+            values = np.char.zfill(seccion.astype(str), 4)
+        elif col in LISTA_COLUMNS:
+            values = rng.integers(300, 800, n_rows).astype(str)
+        elif col in TEXT_COLUMNS or col == '':
+            values = np.full(n_rows, 'Sin observaciones registradas en el acta de escrutinio')
+        elif col.startswith(('CLAVE_', 'ID_', 'TIPO_')):
+            values = np.char.add(col[:3], np.arange(n_rows).astype(str))
+        else:
+            values = rng.integers(0, 150, n_rows).astype(str)
+            values[rng.random(n_rows) < 0.01] = '-'
+        data[col] = values
+    
+    return pd.DataFrame(data)
+
+
+def write_prep_csv(path: Path, year: str, n_rows: int, seed: int = 0, n_sections: Optional[int] = None) -> Path:
+    """
+    Write a synthetic PREP CSV with a metadata preamble and CRLF line endings.
+    
+    Rows are generated in blocks of BLOCK_ROWS, so files larger than memory
+    can be written.
+    
+    Args:
+        path: Output CSV path
+        year: Layout year ('2018', '2021' or '2024')
+        n_rows: Number of casillas
+        seed: Random seed
+        n_sections: Section numbers per entidad (default: one per 64 casillas)
+        
+    Returns:
+        Path to the written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    layout = LAYOUTS[year]
+    n_sections = n_sections or max(n_rows // 64, 2)
+    
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(f'PREP {year} - DATOS SINTETICOS\r\n')
+        f.write('FECHA_CORTE 2024-06-03 20:05\r\n')
+        for block, start in enumerate(range(0, max(n_rows, 1), BLOCK_ROWS)):
+            df = build_frame(year, min(BLOCK_ROWS, n_rows - start), seed + block, n_sections)
+            df.to_csv(f, sep=layout['delimiter'], index=False, header=(block == 0), lineterminator='\r\n')
+    
+    return path
+
+
+def layout_years() -> List[str]:
+    """Available synthetic layouts."""
+    return list(LAYOUTS)
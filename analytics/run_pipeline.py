@@ -7,7 +7,8 @@ Scans data/raw/electoral/ for all electoral data files and processes them
 into the SQLite database with geometry for spatial analysis.
 
 This script:
-1. Finds all electoral files (CSV, Excel, Parquet) in data/raw/electoral/
+1. Finds all electoral files (CSV, Excel, Parquet) in data/raw/electoral/,
+   including files inside .zip/.7z bundles (read without extracting)
 2. Auto-detects election name and date from file paths
 3. Processes each file with cleaning and geometry integration
 4. Stores results in SQLite database (one table per election/entidad)
@@ -37,14 +38,15 @@ Usage:
 
 import sys
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Iterator
 import logging
 from datetime import datetime
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from analytics.clean_votes import CleanVotesOrchestrator, infer_election_metadata
+from analytics.clean_votes import CleanVotesOrchestrator, ElectoralDataReader, infer_election_metadata
+from analytics.clean_votes.archives import ARCHIVE_SUFFIXES, list_archive_members
 
 # Configure logging
 logging.basicConfig(
@@ -71,7 +73,15 @@ class ElectoralPipeline:
         db_path: str = None,
         include_geometry: bool = True,
         shapefile_type: str = 'peepjf',
-        skip_existing: bool = True
+        skip_existing: bool = True,
+        streaming: bool = False,
+        csv_engine: str = 'pandas',
+        use_staging: bool = True,
+        entidad_ids: Optional[List[int]] = None,
+        compact_dtypes: bool = False,
+        cleaner_backend: str = 'pandas',
+        memory_limit: Optional[str] = None,
+        max_workers: int = 1
     ):
         """
         Initialize the pipeline.
@@ -82,14 +92,38 @@ class ElectoralPipeline:
             include_geometry: Whether to merge with shapefiles (needed for Moran's analysis)
             shapefile_type: Type of shapefile ('peepjf' or 'nacional')
             skip_existing: If True, skip elections already in database
+            streaming: If True, read files in chunks to bound memory usage
+            csv_engine: CSV parse engine ('pandas' or 'pyarrow')
+            use_staging: If True, read raw files from their Parquet staging copy
+                        (data/processed/staging/) when one exists
+            entidad_ids: Only process these entidades (None = all). Staged and
+                        Parquet files only read the matching row groups.
+            compact_dtypes: If True, use categoricals, int32 counts and float32
+                           percentages to reduce memory
+            cleaner_backend: Cleaning implementation ('pandas', 'polars' or 'duckdb')
+            memory_limit: DuckDB memory limit (e.g. '3GB') for the 'duckdb' backend;
+                         past it the aggregation spills to disk
+            max_workers: Worker processes for the per-entidad geometry merge
+                        (1 = sequential); the database is written from the
+                        main process only
         """
         self.data_dir = Path(data_dir).resolve()
         self.include_geometry = include_geometry
         self.shapefile_type = shapefile_type
         self.skip_existing = skip_existing
+        self.streaming = streaming
+        self.entidad_ids = entidad_ids
+        self.max_workers = max_workers
         
         # Initialize orchestrator
-        self.orchestrator = CleanVotesOrchestrator(db_path=db_path)
+        self.orchestrator = CleanVotesOrchestrator(
+            db_path=db_path,
+            csv_engine=csv_engine,
+            use_staging=use_staging,
+            compact_dtypes=compact_dtypes,
+            cleaner_backend=cleaner_backend,
+            cleaner_options={'memory_limit': memory_limit} if memory_limit else None
+        )
         
         # Get existing elections
         self.existing_elections = set()
@@ -104,6 +138,15 @@ class ElectoralPipeline:
         logger.info(f"Database: {self.orchestrator.db_path}")
         logger.info(f"Include geometry: {include_geometry}")
         logger.info(f"Skip existing: {skip_existing}")
+        logger.info(f"Streaming: {streaming}")
+        logger.info(f"CSV engine: {csv_engine}")
+        logger.info(f"Compact dtypes: {compact_dtypes}")
+        logger.info(f"Cleaner backend: {cleaner_backend}")
+        if memory_limit:
+            logger.info(f"Memory limit: {memory_limit}")
+        logger.info(f"Max workers: {max_workers}")
+        logger.info(f"Entidades: {entidad_ids or 'all'}")
+        logger.info(f"Staging: {self.orchestrator.staging.staging_dir if use_staging else 'disabled'}")
     
     def find_electoral_files(self, years: List[str] = None, specific_folder: str = None) -> List[Tuple[Path, str, str, bool]]:
         """
@@ -170,23 +213,53 @@ class ElectoralPipeline:
         """
         files = []
         
+        for file_path in self._iter_candidate_files(directory):
+            # Infer metadata
+            election_name, election_date = infer_election_metadata(str(file_path))
+            
+            if election_name:
+                already_exists = election_name in self.existing_elections
+                files.append((file_path, election_name, election_date, already_exists))
+                
+                status = "EXISTS" if already_exists else "NEW"
+                logger.debug(f"Found [{status}]: {file_path.name} → {election_name} ({election_date})")
+        
+        return files
+    
+    def _iter_candidate_files(self, directory: Path) -> Iterator[Path]:
+        """
+        Yield supported data files in a directory tree.
+        
+        Files inside .zip/.7z archives are yielded as 'bundle.zip/member.csv'
+        paths, which the reader opens without extracting the archive.
+        
+        Args:
+            directory: Directory to scan
+        
+        Yields:
+            Paths of data files (plain or inside an archive)
+        """
         for ext in self.SUPPORTED_EXTENSIONS:
             for file_path in directory.rglob(f'*{ext}'):
                 # Skip hidden files
-                if file_path.name.startswith('.'):
+                if not file_path.name.startswith('.'):
+                    yield file_path
+        
+        for ext in ARCHIVE_SUFFIXES:
+            for archive_path in directory.rglob(f'*{ext}'):
+                if archive_path.name.startswith('.'):
                     continue
                 
-                # Infer metadata
-                election_name, election_date = infer_election_metadata(str(file_path))
+                try:
+                    members = list_archive_members(archive_path)
+                except Exception as e:
+                    logger.warning(f"Could not read archive {archive_path}: {e}")
+                    continue
                 
-                if election_name:
-                    already_exists = election_name in self.existing_elections
-                    files.append((file_path, election_name, election_date, already_exists))
-                    
-                    status = "EXISTS" if already_exists else "NEW"
-                    logger.debug(f"Found [{status}]: {file_path.name} → {election_name} ({election_date})")
-        
-        return files
+                for member in members:
+                    member_path = archive_path / member
+                    if member_path.suffix.lower() in self.SUPPORTED_EXTENSIONS and not member_path.name.startswith('.'):
+                        yield member_path
     
     def process_file(
         self,
@@ -222,22 +295,27 @@ class ElectoralPipeline:
             logger.info(f"Election: {election_name} ({election_date})")
             logger.info(f"{'='*70}")
             
-            # Process file
-            df = self.orchestrator.process_electoral_file(
+            # Process file (only counts are kept; each state is freed once saved)
+            summary = self.orchestrator.process_electoral_file(
                 file_path=str(file_path),
                 election_name=election_name,
                 election_date=election_date,
                 include_geometry=self.include_geometry,
                 shapefile_type=self.shapefile_type,
                 save_to_db=True,
-                encoding='utf-8'
+                streaming=self.streaming,
+                entidad_ids=self.entidad_ids,
+                max_workers=self.max_workers,
+                result_mode='summary'
             )
+            if not summary['entidades']:
+                raise ValueError("No entidades were processed successfully")
             
             # Update results
             result['success'] = True
-            result['rows'] = len(df)
-            result['entidades'] = df['ID_ENTIDAD'].nunique() if 'ID_ENTIDAD' in df.columns else 0
-            result['has_geometry'] = 'geometry' in df.columns
+            result['rows'] = summary['rows']
+            result['entidades'] = len(summary['entidades'])
+            result['has_geometry'] = summary['has_geometry']
             
             logger.info(f"✓ Success!")
             logger.info(f"  Rows: {result['rows']}")
@@ -419,6 +497,30 @@ Examples:
   # Process without geometry (faster)
   uv run python analytics/run_pipeline.py --no-geometry
   
+  # Stream large national files in chunks (lower memory)
+  uv run python analytics/run_pipeline.py --streaming
+  
+  # Parse CSVs with the multithreaded PyArrow engine
+  uv run python analytics/run_pipeline.py --csv-engine pyarrow
+  
+  # Lower peak memory with compact dtypes (int32 counts, float32 percentages)
+  uv run python analytics/run_pipeline.py --compact-dtypes
+  
+  # Clean with the Polars backend (one multi-threaded query plan)
+  uv run python analytics/run_pipeline.py --cleaner-backend polars
+  
+  # Clean national files larger than RAM in DuckDB, spilling to disk past 3GB
+  uv run python analytics/run_pipeline.py --cleaner-backend duckdb --memory-limit 3GB
+  
+  # Merge geometries for several states at once (4 worker processes)
+  uv run python analytics/run_pipeline.py --max-workers 4
+  
+  # Reprocess a single state (e.g. after a shapefile fix)
+  uv run python analytics/run_pipeline.py --no-skip-existing --entidades 9
+  
+  # Re-parse raw files instead of reading their staged Parquet copies
+  uv run python analytics/run_pipeline.py --no-skip-existing --no-staging
+  
   # Custom data directory
   uv run python analytics/run_pipeline.py --data-dir path/to/electoral
         """
@@ -465,6 +567,58 @@ Examples:
         help='Type of shapefile to use (default: nacional)'
     )
     
+    parser.add_argument(
+        '--streaming',
+        action='store_true',
+        help='Read files in chunks and aggregate incrementally (lower memory for national files)'
+    )
+    
+    parser.add_argument(
+        '--csv-engine',
+        choices=ElectoralDataReader.CSV_ENGINES,
+        default='pandas',
+        help='CSV parse engine (default: pandas; pyarrow parses in parallel on all cores)'
+    )
+    
+    parser.add_argument(
+        '--compact-dtypes',
+        action='store_true',
+        help='Use categoricals, int32 counts and float32 percentages (lower memory)'
+    )
+    
+    parser.add_argument(
+        '--cleaner-backend',
+        choices=list(CleanVotesOrchestrator.CLEANER_BACKENDS),
+        default='pandas',
+        help='Cleaning implementation (default: pandas; polars runs one multi-threaded query plan; '
+             'duckdb cleans files out of core)'
+    )
+    
+    parser.add_argument(
+        '--memory-limit',
+        help='DuckDB memory limit for --cleaner-backend duckdb (e.g., 3GB); spills to disk past it'
+    )
+    
+    parser.add_argument(
+        '--max-workers',
+        type=int,
+        default=1,
+        help='Worker processes for the per-entidad geometry merge (default: 1, sequential)'
+    )
+    
+    parser.add_argument(
+        '--entidades',
+        type=int,
+        nargs='+',
+        help='Process only these entidad ids (e.g., --entidades 9 26)'
+    )
+    
+    parser.add_argument(
+        '--no-staging',
+        action='store_true',
+        help='Always parse raw files (default: reuse Parquet copies in data/processed/staging/)'
+    )
+    
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -485,9 +639,13 @@ Examples:
     
     args = parser.parse_args()
     
+    if args.memory_limit and args.cleaner_backend != 'duckdb':
+        parser.error("--memory-limit requires --cleaner-backend duckdb")
+    if args.max_workers < 1:
+        parser.error("--max-workers must be at least 1")
+    
     # List elections if requested
     if args.list:
-        from analytics.clean_votes import CleanVotesOrchestrator
         orchestrator = CleanVotesOrchestrator(db_path=args.db_path)
         elections = orchestrator.list_available_elections()
         
@@ -511,7 +669,15 @@ Examples:
         db_path=args.db_path,
         include_geometry=not args.no_geometry,
         shapefile_type=args.shapefile_type,
-        skip_existing=not args.no_skip_existing
+        skip_existing=not args.no_skip_existing,
+        streaming=args.streaming,
+        csv_engine=args.csv_engine,
+        use_staging=not args.no_staging,
+        entidad_ids=args.entidades,
+        compact_dtypes=args.compact_dtypes,
+        cleaner_backend=args.cleaner_backend,
+        memory_limit=args.memory_limit,
+        max_workers=args.max_workers
     )
     
     results = pipeline.run(
@@ -8,8 +8,15 @@ This module provides functionality to clean and process electoral data from vari
 Main Components:
 - reader: Flexible file reading with automatic header detection
 - cleaner: Data transformation and aggregation functions
+- polars_cleaner: Polars LazyFrame backend for the cleaner
+- duckdb_cleaner: Out-of-core DuckDB backend cleaning files in place
 - geometry: Shapefile integration
+- shapefile_catalog: Persistent index of SECCION shapefiles by entidad
+- geometry_cache: LRU cache of prepared section GeoDataFrames
+- geoparquet_store: GeoParquet copies of the SECCION shapefiles
 - database: SQLite storage for processed data (auto-created)
+- rollups: Municipio, distrito and entidad rollups of section results
+- dtypes: Compact dtype profile (categoricals, int32 counts, float32 shares)
 - orchestrator: Main workflow coordinator
 - utils: Helper functions for metadata inference
 
@@ -22,8 +29,16 @@ Key Features:
 
 from .reader import ElectoralDataReader
 from .cleaner import ElectoralDataCleaner
+from .polars_cleaner import PolarsElectoralDataCleaner
+from .duckdb_cleaner import DuckDBElectoralDataCleaner
 from .geometry import GeometryMerger
+from .shapefile_catalog import ShapefileCatalog
+from .geometry_cache import GeometryCache, get_geometry_cache
+from .geoparquet_store import GeoParquetStore
 from .database import ElectoralDatabase
+from .staging import ParquetStagingCache
+from .rollups import SectionRollup
+from .dtypes import CompactDtypeProfile
 from .orchestrator import CleanVotesOrchestrator
 from .utils import infer_election_metadata, get_default_db_path
 from .column_mapper import ColumnMapper, homologate_dataframe
@@ -31,8 +46,17 @@ from .column_mapper import ColumnMapper, homologate_dataframe
 __all__ = [
     "ElectoralDataReader",
     "ElectoralDataCleaner",
+    "PolarsElectoralDataCleaner",
+    "DuckDBElectoralDataCleaner",
     "GeometryMerger",
+    "ShapefileCatalog",
+    "GeometryCache",
+    "get_geometry_cache",
+    "GeoParquetStore",
     "ElectoralDatabase",
+    "ParquetStagingCache",
+    "SectionRollup",
+    "CompactDtypeProfile",
     "CleanVotesOrchestrator",
     "ColumnMapper",
     "homologate_dataframe",
@@ -0,0 +1,329 @@
+"""
+Archive Sources
+===============
+
+Read electoral files out of .zip/.7z bundles. Zip members are streamed
+without touching disk; 7z members are extracted once and removed after
+reading.
+
+A file inside an archive is addressed by appending the member name to the
+archive path, e.g. ``data/raw/electoral/2024/PREP_PRES.zip/PRES_2024.csv``.
+Plain file paths are passed through unchanged.
+
+Solid 7z blocks cannot be read incrementally, so a 7z member is extracted
+once per archive version into EXTRACT_DIR and every later open (sniffing,
+hashing, reading) reuses that file. EXTRACT_DIR defaults to a folder in the
+system temporary directory and can be moved with the ELECTORAL_ARCHIVE_DIR
+environment variable. The orchestrator removes a member's extraction once it
+has read (and staged) the member; see remove_extracted().
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Tuple, List, Iterator, Union, BinaryIO
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Archive formats that can be read without extraction
+ARCHIVE_SUFFIXES = ['.zip', '.7z']
+
+# Where 7z members are extracted, one folder per archive version
+EXTRACT_DIR = Path(os.environ.get('ELECTORAL_ARCHIVE_DIR') or Path(tempfile.gettempdir()) / 'electoral_archives')
+
+
+def split_archive_path(file_path: str) -> Optional[Tuple[Path, str]]:
+    """
+    Split a path into an archive and the member inside it.
+    
+    Args:
+        file_path: Path to a file, possibly inside an archive
+    
+    Returns:
+        Tuple of (archive_path, member_name), or None for plain files
+    
+    Examples:
+        >>> split_archive_path('2024/PREP_PRES.zip/PRES_2024.csv')
+        (PosixPath('2024/PREP_PRES.zip'), 'PRES_2024.csv')
+    """
+    path = Path(file_path)
+    if path.is_file():
+        return None
+    
+    parts = path.parts
+    for i, part in enumerate(parts[:-1]):
+        if Path(part).suffix.lower() in ARCHIVE_SUFFIXES:
+            archive_path = Path(*parts[:i + 1])
+            if archive_path.is_file():
+                return archive_path, '/'.join(parts[i + 1:])
+    
+    return None
+
+
+def source_exists(file_path: str) -> bool:
+    """
+    Check whether a plain file or archive member exists.
+    
+    Args:
+        file_path: Path to a file, possibly inside an archive
+    
+    Returns:
+        True if the file can be opened
+    """
+    split = split_archive_path(file_path)
+    if split is None:
+        return Path(file_path).is_file()
+    
+    archive_path, member = split
+    return member in list_archive_members(archive_path)
+
+
+def source_signature(file_path: str) -> Tuple[int, int]:
+    """
+    Cheap change signature of a plain file or archive member.
+    
+    Archive members take the signature of their archive, so any change to
+    the bundle counts as a change to each of its members.
+    
+    Args:
+        file_path: Path to a file, possibly inside an archive
+    
+    Returns:
+        (mtime_ns, size) tuple
+    
+    Raises:
+        OSError: If the file does not exist
+    """
+    split = split_archive_path(file_path)
+    stat = os.stat(split[0] if split is not None else file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def list_archive_members(archive_path: Union[str, Path]) -> List[str]:
+    """
+    List the files stored in an archive.
+    
+    Args:
+        archive_path: Path to a .zip or .7z archive
+    
+    Returns:
+        Member names (directories excluded)
+    """
+    archive_path = Path(archive_path)
+    suffix = archive_path.suffix.lower()
+    
+    if suffix == '.zip':
+        with zipfile.ZipFile(archive_path) as archive:
+            return [info.filename for info in archive.infolist() if not info.is_dir()]
+    elif suffix == '.7z':
+        with _open_7z(archive_path) as archive:
+            return [info.filename for info in archive.list() if not info.is_directory]
+    else:
+        raise ValueError(f"Unsupported archive format: {suffix}")
+
+
+@contextmanager
+def open_source(file_path: str, as_file: bool = False) -> Iterator[Union[str, BinaryIO]]:
+    """
+    Open a plain file or archive member for reading.
+    
+    Zip members are decompressed on the fly as they are read. 7z members
+    are extracted to disk once (see extracted_7z_member) and opened like
+    plain files.
+    
+    Args:
+        file_path: Path to a file, possibly inside an archive
+        as_file: Always yield a binary file object. By default plain files
+                yield their path, so pandas/PyArrow can use their native
+                (multithreaded, memory-mapped) file readers.
+    
+    Yields:
+        The path of a plain file, or a binary file object
+    """
+    split = split_archive_path(file_path)
+    if split is not None and split[0].suffix.lower() == '.7z':
+        file_path = str(extracted_7z_member(*split))
+        split = None
+    
+    if split is None:
+        if not as_file:
+            yield file_path
+            return
+        with open(file_path, 'rb') as f:
+            yield f
+        return
+    
+    archive_path, member = split
+    logger.debug(f"Opening {member} from archive {archive_path}")
+    
+    with zipfile.ZipFile(archive_path) as archive, archive.open(member) as f:
+        yield f
+
+
+def read_source_head(file_path: str, size: int) -> bytes:
+    """
+    Read the first bytes of a plain file or archive member.
+    
+    7z members that have not been extracted yet are only decompressed up
+    to size bytes.
+    
+    Args:
+        file_path: Path to a file, possibly inside an archive
+        size: Maximum number of bytes to read
+    
+    Returns:
+        Up to size bytes from the start of the file
+    """
+    split = split_archive_path(file_path)
+    if split is not None and split[0].suffix.lower() == '.7z' and not _extraction_path(*split).exists():
+        return _read_7z_head(*split, size)
+    
+    with open_source(file_path, as_file=True) as f:
+        return f.read(size)
+
+
+def extracted_7z_member(archive_path: Path, member: str) -> Path:
+    """
+    Extract a 7z member to disk, once per archive version.
+    
+    The member is decompressed straight to a file (never held in memory)
+    and renamed into place, so concurrent readers never see a partial file.
+    Extractions of older versions of the same archive are removed.
+    
+    Args:
+        archive_path: Path to a .7z archive
+        member: Member name inside the archive
+    
+    Returns:
+        Path of the extracted file
+    
+    Raises:
+        FileNotFoundError: If the member is not in the archive
+    """
+    extracted = _extraction_path(archive_path, member)
+    if extracted.exists():
+        return extracted
+    
+    version_dir = extracted.parents[len(Path(member).parts) - 1]
+    archive_dir = version_dir.parent
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    
+    logger.info(f"Extracting {member} from {archive_path}")
+    tmp_dir = Path(tempfile.mkdtemp(dir=archive_dir))
+    try:
+        with _open_7z(archive_path) as archive:
+            archive.extract(path=tmp_dir, targets=[member])
+        if not (tmp_dir / member).is_file():
+            raise FileNotFoundError(f"{member} not found in {archive_path}")
+        extracted.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_dir / member, extracted)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    for old_dir in archive_dir.iterdir():
+        if old_dir != version_dir and not old_dir.name.startswith('tmp'):
+            shutil.rmtree(old_dir, ignore_errors=True)
+    
+    return extracted
+
+
+def remove_extracted(file_path: str) -> bool:
+    """
+    Delete the extracted copy of a 7z member, if there is one.
+    
+    Called once a member has been read, so extractions do not accumulate
+    in EXTRACT_DIR. Emptied folders are removed with it.
+    
+    Args:
+        file_path: Path to a file, possibly inside an archive
+    
+    Returns:
+        True if an extracted copy was deleted
+    """
+    split = split_archive_path(file_path)
+    if split is None or split[0].suffix.lower() != '.7z':
+        return False
+    
+    extracted = _extraction_path(*split)
+    if not extracted.exists():
+        return False
+    
+    extracted.unlink()
+    logger.info(f"Removed extracted copy of {split[1]} from {EXTRACT_DIR}")
+    for folder in extracted.parents:
+        if folder == EXTRACT_DIR or EXTRACT_DIR not in folder.parents:
+            break
+        try:
+            folder.rmdir()
+        except OSError:
+            break
+    return True
+
+
+def _extraction_path(archive_path: Path, member: str) -> Path:
+    """Where a 7z member is extracted: EXTRACT_DIR/<archive>/<mtime>-<size>/<member>."""
+    stat = os.stat(archive_path)
+    archive_key = hashlib.blake2b(str(Path(archive_path).resolve()).encode(), digest_size=8).hexdigest()
+    return EXTRACT_DIR / archive_key / f'{stat.st_mtime_ns}-{stat.st_size}' / member
+
+
+def _read_7z_head(archive_path: Path, member: str, size: int) -> bytes:
+    """Decompress the first size bytes of a 7z member, then stop."""
+    from py7zr.io import Py7zIO, WriterFactory
+    
+    class HeadComplete(Exception):
+        pass
+    
+    class HeadWriter(Py7zIO):
+        def __init__(self):
+            self.buffer = bytearray()
+        
+        def write(self, s) -> int:
+            self.buffer += s[:size - len(self.buffer)]
+            if len(self.buffer) >= size:
+                raise HeadComplete()
+            return len(s)
+        
+        def read(self, size=None) -> bytes:
+            return b''
+        
+        def seek(self, offset, whence=0) -> int:
+            return 0
+        
+        def flush(self):
+            pass
+        
+        def size(self) -> int:
+            return len(self.buffer)
+    
+    class HeadWriterFactory(WriterFactory):
+        def __init__(self):
+            self.writer = HeadWriter()
+        
+        def create(self, filename):
+            return self.writer
+    
+    factory = HeadWriterFactory()
+    try:
+        with _open_7z(archive_path) as archive:
+            archive.extract(targets=[member], factory=factory)
+    except HeadComplete:
+        pass
+    return bytes(factory.writer.buffer)
+
+
+def _open_7z(archive_path: Path):
+    """Open a 7z archive with py7zr, which is only needed for .7z bundles."""
+    try:
+        import py7zr
+    except ImportError as e:
+        raise ImportError(
+            f"Reading {archive_path} requires py7zr. Install the 'archives' extra: uv sync --extra archives"
+        ) from e
+    
+    return py7zr.SevenZipFile(archive_path, mode='r')
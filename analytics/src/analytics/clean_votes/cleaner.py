@@ -8,15 +8,58 @@ Based on the clean_votes.ipynb workflow.
 
 import pandas as pd
 import numpy as np
-from typing import List, Optional
+from typing import Iterable, List, Optional
 import logging
 
+from .dtypes import CompactDtypeProfile
+
 logger = logging.getLogger(__name__)
 
 
+def add_vote_shares(
+    df: pd.DataFrame,
+    vote_columns: List[str],
+    dtype_profile: Optional[CompactDtypeProfile] = None
+) -> pd.DataFrame:
+    """
+    Add a {party}_PCT column per vote column: its share of TOTAL_VOTOS_SUM, in percent.
+    
+    Shared by the cleaner (section shares) and SectionRollup (shares of the
+    summed votes). All shares are computed in a single array operation as
+    (votes / total) * 100 in float64, the same expression and order as
+    evaluating it row by row, so results are bit-identical. Rows whose
+    total is not positive (zero, negative or missing) get 0.
+    
+    Args:
+        df: DataFrame with vote columns and TOTAL_VOTOS_SUM
+        vote_columns: Columns to compute shares for
+        dtype_profile: Optional compact dtype profile to narrow the shares with
+    
+    Returns:
+        DataFrame with the percentage columns added
+    """
+    totals = df['TOTAL_VOTOS_SUM'].to_numpy(dtype='float64', na_value=np.nan)[:, np.newaxis]
+    votes = df[vote_columns].to_numpy(dtype='float64', na_value=np.nan)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = np.where(totals > 0, (votes / totals) * 100, 0.0)
+    
+    for i, col in enumerate(vote_columns):
+        df[f'{col}_PCT'] = shares[:, i]
+    
+    if dtype_profile is not None:
+        df = dtype_profile.apply_shares(df, [f'{col}_PCT' for col in vote_columns])
+    return df
+
+
 class ElectoralDataCleaner:
     """
     Cleans and transforms electoral data.
+    
+    Cleaning steps never copy the data of the frame they are given: they work
+    on a shallow copy (new column index, shared column arrays) and replace
+    whole columns, which pandas never does in place. The caller's frame is
+    left untouched without paying for a deep copy per step.
     """
     
     # Columns to exclude from processing
@@ -44,20 +87,40 @@ class ElectoralDataCleaner:
         'NO_REGISTRADAS', 'NULOS'
     ]
     
-    def __init__(self, columns_to_exclude: Optional[List[str]] = None):
+    # Section aggregation keys
+    KEY_COLUMNS = ['ID_ENTIDAD', 'SECCION']
+    
+    # Descriptive columns carried over to the section level
+    DESCRIPTIVE_COLUMNS = [
+        'ENTIDAD', 'DISTRITO_FEDERAL', 'ID_DISTRITO_FEDERAL',
+        'ID_DISTRITO_FEDERAL_STR', 'ID_ENTIDAD_STR', 'SECCION_STR'
+    ]
+    
+    def __init__(
+        self,
+        columns_to_exclude: Optional[List[str]] = None,
+        dtype_profile: Optional[CompactDtypeProfile] = None
+    ):
         """
         Initialize the cleaner.
         
         Args:
             columns_to_exclude: Custom list of columns to exclude.
                               If None, uses COLUMNS_TO_EXCLUDE.
+            dtype_profile: Optional compact dtype profile. Vote counts and
+                          LISTA_NOMINAL are then kept as int32 and percentages
+                          as float32 instead of float64.
         """
         self.columns_to_exclude = columns_to_exclude or self.COLUMNS_TO_EXCLUDE
+        self.dtype_profile = dtype_profile
     
     def clean(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Main cleaning pipeline.
         
+        Totals and percentages are only computed on the section-level sums;
+        use clean_casillas() for per-casilla totals and shares.
+        
         Args:
             df: Raw electoral DataFrame
             
@@ -74,52 +137,189 @@ class ElectoralDataCleaner:
         df = self._convert_numeric_columns(df)
         logger.info("Converted numeric columns")
         
-        # Step 3: Calculate totals and percentages
-        df = self._calculate_totals_and_percentages(df)
-        logger.info("Calculated totals and percentages")
-        
-        # Step 4: Homogenize ID columns with zfill
+        # Step 3: Homogenize ID columns with zfill
         df = self._homogenize_id_columns(df)
         logger.info("Homogenized ID columns")
         
-        # Step 5: Clean and aggregate LISTA_NOMINAL
-        df_lista = self._clean_and_aggregate_lista_nominal(df)
-        logger.info(f"Aggregated LISTA_NOMINAL: {df_lista.shape}")
+        # Step 4: Fill vote columns on the casilla rows. Like clean_chunks(),
+        # this also turns descriptive columns picked up as vote-like
+        # (e.g. DISTRITO_FEDERAL) into 0 instead of NaN.
+        vote_columns = self._get_vote_columns(df)
+        df = self._fill_vote_columns(df, vote_columns)
+        logger.info(f"Filled {len(vote_columns)} vote columns")
+        
+        # Step 5: Aggregate votes, LISTA_NOMINAL and descriptive columns by
+        # section in one grouping pass (adds section totals and percentages)
+        df_final = self._aggregate_sections(df, vote_columns)
+        logger.info(f"Aggregated sections: {df_final.shape}")
+        
+        # Step 6: Remove rows with null key columns
+        df_final = self._remove_null_rows(df_final)
+        logger.info(f"After removing nulls: {df_final.shape}")
+        
+        return self._compact_categories(df_final)
+    
+    def clean_casillas(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Casilla-level cleaning pipeline (no aggregation).
+        
+        Applies the same column, numeric and ID cleaning as clean(), and adds
+        TOTAL_VOTOS_SUM and {party}_PCT per casilla. clean() does not need
+        these, so only call this when casilla-level shares are wanted.
+        
+        Args:
+            df: Raw electoral DataFrame
+        
+        Returns:
+            Cleaned DataFrame with one row per casilla
+        """
+        logger.info(f"Starting casilla-level cleaning. Input shape: {df.shape}")
+        
+        df = self._remove_unwanted_columns(df)
+        df = self._convert_numeric_columns(df)
+        df = self._calculate_totals_and_percentages(df)
+        logger.info("Calculated casilla totals and percentages")
+        df = self._homogenize_id_columns(df)
+        
+        return self._compact_categories(df)
+    
+    def clean_chunks(self, chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Streaming cleaning pipeline for files read in chunks.
+        
+        Each chunk is reduced to per-section partial sums that are folded into
+        running totals keyed by (ID_ENTIDAD, SECCION), so peak memory depends on
+        the number of sections rather than the number of casillas. The result
+        is the same as calling clean() on the concatenated chunks.
+        
+        Args:
+            chunks: Iterable of raw electoral DataFrames sharing the same columns
+            
+        Returns:
+            Cleaned and aggregated DataFrame by ENTIDAD and SECCION
+        """
+        claves = ['ID_ENTIDAD', 'SECCION']
+        votes_total = None
+        lista_total = None
+        info_first = None
+        has_lista = True
+        rows_in = 0
+        
+        for chunk_number, chunk in enumerate(chunks, start=1):
+            rows_in += len(chunk)
+            
+            chunk = self._remove_unwanted_columns(chunk)
+            chunk = self._convert_numeric_columns(chunk)
+            chunk = self._homogenize_id_columns(chunk)
+            
+            # Votes: partial sums per section. Filling vote columns on the chunk
+            # itself matters: like clean(), descriptive columns picked up as
+            # vote-like (e.g. DISTRITO_FEDERAL) end up 0 instead of NaN.
+            vote_columns = self._get_vote_columns(chunk)
+            chunk = self._fill_vote_columns(chunk, vote_columns)
+            votes_partial = self._sum_votes_by_section(chunk, vote_columns).set_index(claves)
+            votes_total = self._fold_partial_sums(votes_total, votes_partial)
+            
+            # LISTA_NOMINAL: partial sums per section
+            has_lista = 'LISTA_NOMINAL' in chunk.columns
+            if has_lista:
+                lista_partial = self._clean_and_aggregate_lista_nominal(chunk).set_index(claves)
+                lista_total = self._fold_partial_sums(lista_total, lista_partial)
+            
+            # Descriptive columns: keep the first row seen for each section
+            descriptive_cols = self._get_descriptive_columns(chunk)
+            info_partial = chunk[claves + descriptive_cols].drop_duplicates(subset=claves)
+            if info_first is None:
+                info_first = info_partial
+            else:
+                info_first = (
+                    pd.concat([info_first, info_partial], ignore_index=True)
+                    .drop_duplicates(subset=claves)
+                )
+            
+            logger.info(f"Folded chunk {chunk_number} ({rows_in} rows so far, "
+                        f"{len(votes_total)} sections)")
+        
+        if votes_total is None:
+            raise ValueError("No data chunks to clean")
+        
+        logger.info(f"Starting streaming aggregation finalize. Input rows: {rows_in}")
         
-        # Step 6: Aggregate votes by section
-        df_voto = self._aggregate_votes_by_section(df)
+        # Sort sections the same way groupby does in clean()
+        df_voto = votes_total.groupby(level=claves, dropna=False).sum().reset_index()
+        df_voto = self._add_section_totals_and_percentages(df_voto, vote_columns)
         logger.info(f"Aggregated votes by section: {df_voto.shape}")
         
-        # Step 7: Merge votes and lista nominal
-        df_final = self._merge_votes_and_lista(df_voto, df_lista, df)
+        if has_lista:
+            df_lista = lista_total.groupby(level=claves, dropna=False).sum().reset_index()
+        else:
+            logger.warning("LISTA_NOMINAL column not found, skipping")
+            df_lista = pd.DataFrame(columns=['ID_ENTIDAD', 'SECCION', 'LISTA_NOMINAL'])
+        logger.info(f"Aggregated LISTA_NOMINAL: {df_lista.shape}")
+        
+        df_final = self._merge_votes_and_lista(df_voto, df_lista, info_first)
         logger.info(f"Final merged dataset: {df_final.shape}")
         
-        # Step 8: Remove rows with null key columns
         df_final = self._remove_null_rows(df_final)
         logger.info(f"After removing nulls: {df_final.shape}")
         
-        return df_final
+        return self._compact_categories(df_final)
+    
+    def _fold_partial_sums(
+        self,
+        running: Optional[pd.DataFrame],
+        partial: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Add per-section partial sums (indexed by ID_ENTIDAD, SECCION) to running totals."""
+        if running is None:
+            return partial
+        
+        return (
+            pd.concat([running, partial])
+            .groupby(level=['ID_ENTIDAD', 'SECCION'], dropna=False, sort=False)
+            .sum()
+        )
+    
+    def is_needed_column(self, col: str) -> bool:
+        """
+        Check whether a (homologated) input column can affect the output of clean().
+        
+        Used to project columns at read time. Besides the excluded columns,
+        text columns that never reach the section aggregation (CLAVE_*, TIPO_*,
+        TOTAL_*, ...) are not needed. Assumes string input as produced by
+        ElectoralDataReader.
+        
+        Args:
+            col: Column name after homologation
+            
+        Returns:
+            True if the column must be read
+        """
+        if not isinstance(col, str) or col in self.columns_to_exclude:
+            return False
+        
+        if col in self.KEY_COLUMNS or col in self.DESCRIPTIVE_COLUMNS or col == 'LISTA_NOMINAL':
+            return True
+        
+        return self._is_numeric_column_name(col) and self._is_vote_column_name(col)
     
     def _remove_unwanted_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """Remove columns that are not needed for analysis."""
-        df = df.copy()
-        cols_to_keep = [col for col in df.columns if col not in self.columns_to_exclude]
-        return df[cols_to_keep]
+        df = df.copy(deep=False)
+        
+        # Deleting from a shallow copy keeps the other columns as views
+        # (df[cols_to_keep] would copy every kept column)
+        for col in [col for col in df.columns if col in self.columns_to_exclude]:
+            del df[col]
+        
+        return df
     
     def _convert_numeric_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """Identify and convert numeric vote columns."""
-        df = df.copy()
+        df = df.copy(deep=False)
         
         # Detect vote columns (existing standard columns + any that look like parties/coalitions)
-        numeric_cols = []
-        for col in df.columns:
-            if col in self.STANDARD_VOTE_COLUMNS:
-                numeric_cols.append(col)
-            # Also detect columns with vote-like patterns (all caps, underscores/hyphens)
-            elif col.isupper() and any(char in col for char in ['_', '-']) and col not in ['ID_ENTIDAD', 'ID_DISTRITO_FEDERAL']:
-                # Check if it looks like a party/coalition column
-                if not any(keyword in col for keyword in ['FECHA', 'HORA', 'CODIGO', 'CLAVE', 'TIPO', 'ID_']):
-                    numeric_cols.append(col)
+        numeric_cols = [col for col in df.columns if self._is_numeric_column_name(col)]
         
         logger.info(f"Converting {len(numeric_cols)} numeric columns")
         
@@ -129,9 +329,21 @@ class ElectoralDataCleaner:
         
         return df
     
+    def _is_numeric_column_name(self, col: str) -> bool:
+        """Check whether a column name looks like a numeric vote/total column."""
+        if col in self.STANDARD_VOTE_COLUMNS:
+            return True
+        
+        # Also detect columns with vote-like patterns (all caps, underscores/hyphens)
+        if col.isupper() and any(char in col for char in ['_', '-']) and col not in ['ID_ENTIDAD', 'ID_DISTRITO_FEDERAL']:
+            # Check if it looks like a party/coalition column
+            return not any(keyword in col for keyword in ['FECHA', 'HORA', 'CODIGO', 'CLAVE', 'TIPO', 'ID_'])
+        
+        return False
+    
     def _calculate_totals_and_percentages(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calculate TOTAL_VOTOS_SUM and percentage for each party."""
-        df = df.copy()
+        df = df.copy(deep=False)
         
         # Identify vote columns (excluding TOTAL_* columns)
         vote_columns = [col for col in df.columns 
@@ -144,26 +356,25 @@ class ElectoralDataCleaner:
         logger.info(f"Calculating totals for {len(vote_columns)} vote columns")
         
         # Clean values
-        df[vote_columns] = df[vote_columns].replace({'-': pd.NA, '': pd.NA, ' ': pd.NA})
-        df[vote_columns] = df[vote_columns].apply(pd.to_numeric, errors='coerce').fillna(0)
+        df = self._fill_vote_columns(df, vote_columns)
         
         # Calculate total
         df['TOTAL_VOTOS_SUM'] = df[vote_columns].sum(axis=1)
+        df = self._compact_counts(df, ['TOTAL_VOTOS_SUM'])
         
         # Calculate percentages
-        for col in vote_columns:
-            df[f'{col}_PCT'] = df.apply(
-                lambda row: (row[col] / row['TOTAL_VOTOS_SUM']) * 100 if row['TOTAL_VOTOS_SUM'] > 0 else 0,
-                axis=1
-            )
-        
-        return df
+        return self._add_percentages(df, vote_columns)
     
     def _homogenize_id_columns(self, df: pd.DataFrame, width: int = 3) -> pd.DataFrame:
         """
         Homogenize ID columns (convert to Int64 and create string version with zfill).
+        
+        IDs repeat heavily (32 entidades, a few hundred distritos, tens of
+        thousands of secciones against millions of casillas), so each
+        distinct value is parsed once and both the Int64 column and its
+        _STR label are gathered back by factorized code.
         """
-        df = df.copy()
+        df = df.copy(deep=False)
         
         id_columns = ['ID_DISTRITO_FEDERAL', 'ID_ENTIDAD', 'SECCION']
         
@@ -171,82 +382,205 @@ class ElectoralDataCleaner:
             if col not in df.columns:
                 continue
             
-            # Convert to string, strip, and handle NaN
-            col_temp = (
-                df[col]
-                .astype(str)
-                .str.strip()
-                .replace({'nan': pd.NA, 'None': pd.NA, '<NA>': pd.NA})
-            )
+            # Missing values get code -1
+            codes, uniques = pd.factorize(df[col])
             
             # Convert to Int64
-            df[col] = col_temp.apply(
-                lambda x: int(x) if pd.notna(x) and str(x).replace('.', '').replace('-', '').isdigit() else pd.NA
-            ).astype("Int64")
+            ids = pd.array([self._parse_id(value) for value in uniques], dtype="Int64")
+            df[col] = ids.take(codes, allow_fill=True)
             
-            # Create string version with zfill
-            str_col_name = f"{col}_STR"
-            df[str_col_name] = df[col].astype(str).str.zfill(width)
+            # Create string version with zfill; code -1 picks the trailing '<NA>'
+            labels = np.array([str(value).zfill(width) for value in ids] + [str(pd.NA)], dtype=object)
+            df[f"{col}_STR"] = labels[codes]
         
         return df
     
+    @staticmethod
+    def _parse_id(value) -> Optional[int]:
+        """
+        Parse one raw ID value.
+        
+        Digits, optionally with a leading minus sign and surrounding
+        whitespace, become an int; anything else ('', 'nan', 'abc', '7.0')
+        becomes NA.
+        
+        Args:
+            value: Raw ID value
+        
+        Returns:
+            The integer ID, or pd.NA
+        """
+        if pd.isna(value):
+            return pd.NA
+        
+        text = str(value).strip()
+        if not text.replace('.', '').replace('-', '').isdigit():
+            return pd.NA
+        
+        try:
+            return int(text)
+        except ValueError:
+            # Passes the digit check but is not an integer literal ('7.0', '1-2')
+            return pd.NA
+    
+    def _clean_lista_nominal(self, lista_nominal: pd.Series) -> pd.Series:
+        """Clean the LISTA_NOMINAL column: numbers as float, missing as 0."""
+        # It is usually already numeric at this point (_convert_numeric_columns
+        # picks it up); stringifying a float column would turn "523.0" into
+        # 5230, so only strip non-digits from text.
+        if pd.api.types.is_numeric_dtype(lista_nominal):
+            lista_nominal_limpia = lista_nominal.astype(float)
+        else:
+            lista_nominal_limpia = (
+                lista_nominal
+                .astype(str)
+                .str.replace(r'\D', '', regex=True)
+                .replace('', np.nan)
+                .astype(float)
+            )
+        
+        lista_nominal = lista_nominal_limpia.fillna(0)
+        if self.dtype_profile is not None:
+            lista_nominal = self.dtype_profile.apply_counts(lista_nominal.to_frame(), ['LISTA_NOMINAL'])['LISTA_NOMINAL']
+        
+        return lista_nominal
+    
     def _clean_and_aggregate_lista_nominal(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean LISTA_NOMINAL column and aggregate by section."""
-        df = df.copy()
-        
         if 'LISTA_NOMINAL' not in df.columns:
             logger.warning("LISTA_NOMINAL column not found, skipping")
             # Return empty dataframe with expected structure
             return pd.DataFrame(columns=['ID_ENTIDAD', 'SECCION', 'LISTA_NOMINAL'])
         
-        # Clean LISTA_NOMINAL
-        lista_nominal_limpia = (
-            df['LISTA_NOMINAL']
-            .astype(str)
-            .str.replace(r'\D', '', regex=True)
-            .replace('', np.nan)
-            .astype(float)
-        )
-        
-        df['LISTA_NOMINAL'] = lista_nominal_limpia.fillna(0)
+        lista_nominal = self._clean_lista_nominal(df['LISTA_NOMINAL'])
         
-        # Aggregate by section
-        df_lista = df.groupby(['ID_ENTIDAD', 'SECCION'], dropna=False)['LISTA_NOMINAL'].sum().reset_index()
+        # Aggregate by section (grouping by the key columns themselves, so the
+        # casilla-level frame is not copied to hold the cleaned column)
+        df_lista = (
+            lista_nominal
+            .groupby([df['ID_ENTIDAD'], df['SECCION']], dropna=False)
+            .sum()
+            .reset_index()
+        )
         
         return df_lista
     
-    def _aggregate_votes_by_section(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Aggregate vote counts by ENTIDAD and SECCION."""
-        df = df.copy()
+    def _aggregate_sections(self, df: pd.DataFrame, vote_columns: List[str]) -> pd.DataFrame:
+        """
+        Aggregate casillas to sections in a single grouping pass.
         
-        # Identify vote columns
-        vote_columns = [col for col in df.columns 
-                       if pd.api.types.is_numeric_dtype(df[col]) 
-                       and not col.startswith('TOTAL_')
-                       and not col.startswith('ID_')
-                       and not col.startswith('LISTA_')
-                       and not col.endswith('_PCT')
-                       and col not in ['SECCION', 'CASILLA']]
+        Vote columns and LISTA_NOMINAL are summed and descriptive columns take
+        the value of the first casilla of each section, all from one groupby
+        on (ID_ENTIDAD, SECCION), so the composite key is hashed once and no
+        merges are needed. The result is the same as merging the separate
+        LISTA_NOMINAL, vote and descriptive aggregations: sections sorted by
+        key (missing keys last), and columns present in both the vote and
+        descriptive sets (DISTRITO_FEDERAL) suffixed _x (sum) and _y (first).
         
-        claves = ['ID_ENTIDAD', 'SECCION']
+        Args:
+            df: Casilla-level DataFrame with filled vote columns
+            vote_columns: Columns to sum and compute shares for
+        
+        Returns:
+            Section-level DataFrame with LISTA_NOMINAL, votes, TOTAL_VOTOS_SUM,
+            percentages and descriptive columns
+        """
+        has_lista = 'LISTA_NOMINAL' in df.columns
+        df = df.copy(deep=False)
+        if has_lista:
+            df['LISTA_NOMINAL'] = self._clean_lista_nominal(df['LISTA_NOMINAL'])
+        else:
+            logger.warning("LISTA_NOMINAL column not found, skipping")
         
-        # Ensure clean numeric data
-        df[vote_columns] = df[vote_columns].replace({'-': pd.NA, '': pd.NA, ' ': pd.NA})
-        df[vote_columns] = df[vote_columns].apply(pd.to_numeric, errors='coerce').fillna(0)
+        grouped = df.groupby(self.KEY_COLUMNS, dropna=False)
+        sum_columns = (['LISTA_NOMINAL'] if has_lista else []) + vote_columns
+        df_sections = self._add_section_totals_and_percentages(grouped[sum_columns].sum(), vote_columns)
         
-        # Aggregate
-        df_agrupado = df.groupby(claves, dropna=False)[vote_columns].sum().reset_index()
+        descriptive_cols = self._get_descriptive_columns(df)
+        if descriptive_cols:
+            # Row of the first casilla of each section, in group order (like
+            # drop_duplicates, its values are kept even when missing)
+            _, first_rows = np.unique(grouped.ngroup().to_numpy(), return_index=True)
+            
+            overlap = set(descriptive_cols) & set(df_sections.columns)
+            df_sections = df_sections.rename(columns={col: f"{col}_x" for col in overlap})
+            for col in descriptive_cols:
+                name = f"{col}_y" if col in overlap else col
+                df_sections[name] = df[col].iloc[first_rows].array
         
-        # Recalculate total and percentages
-        df_agrupado['TOTAL_VOTOS_SUM'] = df_agrupado[vote_columns].sum(axis=1)
+        df_sections = df_sections.reset_index()
+        
+        # Without LISTA_NOMINAL there are no sections to merge votes into
+        if not has_lista:
+            df_sections.insert(len(self.KEY_COLUMNS), 'LISTA_NOMINAL', pd.Series(dtype=object))
+            df_sections = df_sections.iloc[0:0]
+        
+        return df_sections
+    
+    def _get_vote_columns(self, df: pd.DataFrame) -> List[str]:
+        """Identify numeric vote columns (parties, coalitions, NULOS, etc.)."""
+        return [col for col in df.columns 
+                if pd.api.types.is_numeric_dtype(df[col]) 
+                and self._is_vote_column_name(col)]
+    
+    def _is_vote_column_name(self, col: str) -> bool:
+        """Check that a numeric column is a vote count rather than a key or total."""
+        return (not col.startswith('TOTAL_')
+                and not col.startswith('ID_')
+                and not col.startswith('LISTA_')
+                and not col.endswith('_PCT')
+                and col not in ['SECCION', 'CASILLA'])
+    
+    def _fill_vote_columns(self, df: pd.DataFrame, vote_columns: List[str]) -> pd.DataFrame:
+        """Coerce vote columns to numbers and fill missing values with 0."""
+        df = df.copy(deep=False)
         
+        # Ensure clean numeric data, one column at a time so only a single
+        # column's temporaries are alive at once
         for col in vote_columns:
-            df_agrupado[f'{col}_PCT'] = df_agrupado.apply(
-                lambda row: (row[col] / row['TOTAL_VOTOS_SUM']) * 100 if row['TOTAL_VOTOS_SUM'] > 0 else 0,
-                axis=1
-            )
+            values = df[col].replace({'-': pd.NA, '': pd.NA, ' ': pd.NA})
+            df[col] = pd.to_numeric(values, errors='coerce').fillna(0)
+        
+        return self._compact_counts(df, vote_columns)
+    
+    def _sum_votes_by_section(self, df: pd.DataFrame, vote_columns: List[str]) -> pd.DataFrame:
+        """Sum vote columns by ENTIDAD and SECCION."""
+        claves = ['ID_ENTIDAD', 'SECCION']
+        
+        return df.groupby(claves, dropna=False)[vote_columns].sum().reset_index()
+    
+    def _add_section_totals_and_percentages(
+        self,
+        df_agrupado: pd.DataFrame,
+        vote_columns: List[str]
+    ) -> pd.DataFrame:
+        """Recalculate total and percentages on section-level vote sums."""
+        df_agrupado['TOTAL_VOTOS_SUM'] = df_agrupado[vote_columns].sum(axis=1)
+        df_agrupado = self._compact_counts(df_agrupado, ['TOTAL_VOTOS_SUM'])
         
-        return df_agrupado
+        return self._add_percentages(df_agrupado, vote_columns)
+    
+    def _add_percentages(self, df: pd.DataFrame, vote_columns: List[str]) -> pd.DataFrame:
+        """Add a {party}_PCT column per vote column (see add_vote_shares)."""
+        return add_vote_shares(df, vote_columns, self.dtype_profile)
+    
+    def _compact_counts(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """Narrow count columns to the dtype profile's integer type (no-op without a profile)."""
+        if self.dtype_profile is None:
+            return df
+        return self.dtype_profile.apply_counts(df, columns)
+    
+    def _compact_shares(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """Narrow percentage columns to the dtype profile's float type (no-op without a profile)."""
+        if self.dtype_profile is None:
+            return df
+        return self.dtype_profile.apply_shares(df, columns)
+    
+    def _compact_categories(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Store repeated label columns as categoricals (no-op without a profile)."""
+        if self.dtype_profile is None:
+            return df
+        return self.dtype_profile.apply_categories(df)
     
     def _merge_votes_and_lista(
         self,
@@ -261,11 +595,7 @@ class ElectoralDataCleaner:
         df_base = df_lista.merge(df_voto, how='left', on=claves)
         
         # Extract descriptive columns from original data
-        descriptive_cols = []
-        for col in ['ENTIDAD', 'DISTRITO_FEDERAL', 'ID_DISTRITO_FEDERAL', 
-                    'ID_DISTRITO_FEDERAL_STR', 'ID_ENTIDAD_STR', 'SECCION_STR']:
-            if col in df_original.columns:
-                descriptive_cols.append(col)
+        descriptive_cols = self._get_descriptive_columns(df_original)
         
         if descriptive_cols:
             df_info_extra = (
@@ -282,10 +612,12 @@ class ElectoralDataCleaner:
         
         return df_final
     
+    def _get_descriptive_columns(self, df: pd.DataFrame) -> List[str]:
+        """Descriptive (non-vote) columns carried over to the section level."""
+        return [col for col in self.DESCRIPTIVE_COLUMNS if col in df.columns]
+    
     def _remove_null_rows(self, df: pd.DataFrame) -> pd.DataFrame:
         """Remove rows with null values in key columns."""
-        df = df.copy()
-        
         # Define key columns to check (only check if they exist)
         cols_to_check = []
         for col in ['ID_DISTRITO_FEDERAL', 'DISTRITO_FEDERAL', 'SECCION']:
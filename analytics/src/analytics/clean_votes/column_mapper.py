@@ -10,6 +10,8 @@ from typing import Dict, Optional
 import pandas as pd
 import logging
 
+from .dtypes import CompactDtypeProfile
+
 logger = logging.getLogger(__name__)
 
 
@@ -116,9 +118,16 @@ class ColumnMapper:
         'CI': 'CI',    # Candidatura Independiente
     }
     
-    def __init__(self):
-        """Initialize the column mapper."""
-        pass
+    def __init__(self, dtype_profile: Optional[CompactDtypeProfile] = None):
+        """
+        Initialize the column mapper.
+        
+        Args:
+            dtype_profile: Optional compact dtype profile. Repeated label columns
+                          (ENTIDAD, TIPO_CASILLA, ...) are then stored as
+                          categoricals once their standard names are known.
+        """
+        self.dtype_profile = dtype_profile
     
     def homologate_columns(self, df: pd.DataFrame, year: Optional[int] = None) -> pd.DataFrame:
         """
@@ -131,7 +140,8 @@ class ColumnMapper:
         Returns:
             DataFrame with standardized column names
         """
-        df = df.copy()
+        # Shallow copy: only the column index changes, column data is shared
+        df = df.copy(deep=False)
         original_columns = df.columns.tolist()
         
         # Create column rename mapping
@@ -151,14 +161,34 @@ class ColumnMapper:
         
         # Rename columns
         if rename_map:
-            df = df.rename(columns=rename_map)
+            df.columns = [rename_map.get(col, col) for col in original_columns]
             logger.info(f"Homologated {len(rename_map)} column names")
             logger.debug(f"Renamed columns: {list(rename_map.keys())}")
         else:
             logger.info("No column mappings needed (already in standard format)")
         
+        if self.dtype_profile is not None:
+            df = self.dtype_profile.apply_categories(df)
+        
         return df
     
+    def standardize_column_name(self, column: str) -> str:
+        """
+        Get the standard name for a single raw column name.
+        
+        Applies the same mappings as homologate_columns, so it can be used
+        before a file is read (e.g. to decide which columns to parse).
+        
+        Args:
+            column: Original column name
+            
+        Returns:
+            Standardized column name (unchanged if no mapping applies)
+        """
+        if column in self.PARTY_NAME_MAPPINGS:
+            return self.PARTY_NAME_MAPPINGS[column]
+        return self.COLUMN_MAPPINGS.get(column, column)
+    
     def get_column_mapping(self, df: pd.DataFrame) -> Dict[str, str]:
         """
         Get the mapping dictionary for a given DataFrame.
@@ -9,10 +9,13 @@ import sqlite3
 import pandas as pd
 import geopandas as gpd
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import json
 import logging
 
+from .dtypes import CompactDtypeProfile
+from .rollups import SectionRollup
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,7 +26,11 @@ class ElectoralDatabase:
     The database is automatically created on first use if it doesn't exist.
     """
     
-    def __init__(self, db_path: str = "data/processed/electoral_data.db"):
+    def __init__(
+        self,
+        db_path: str = "data/processed/electoral_data.db",
+        dtype_profile: Optional[CompactDtypeProfile] = None
+    ):
         """
         Initialize the database handler.
         
@@ -32,8 +39,11 @@ class ElectoralDatabase:
         
         Args:
             db_path: Path to SQLite database file (relative or absolute)
+            dtype_profile: Optional compact dtype profile applied to loaded
+                          tables (SQLite only returns int64/float64/object).
         """
         self.db_path = Path(db_path).resolve()
+        self.dtype_profile = dtype_profile
         
         # Ensure parent directories exist
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -246,6 +256,9 @@ class ElectoralDatabase:
             
             logger.info(f"Loaded {len(df)} rows")
             
+            if self.dtype_profile is not None:
+                df = self.dtype_profile.apply(df)
+            
             # Convert to GeoDataFrame if requested and geometry available
             if as_geodataframe and 'geometry' in df.columns:
                 from shapely import wkt
@@ -269,6 +282,81 @@ class ElectoralDatabase:
         
         return df
     
+    def rollup_table_name(self, election_name: str, entidad_id: int, level: str) -> str:
+        """
+        Name of the rollup table for an election, entidad and level.
+        
+        Args:
+            election_name: Election name (e.g., 'PRES_2024')
+            entidad_id: State ID (1-32)
+            level: Rollup level (see SectionRollup.LEVELS)
+        
+        Returns:
+            Table name, e.g. 'election_pres_2024_09_distrito'
+        """
+        return f"election_{election_name.lower()}_{entidad_id:02d}_{level}"
+    
+    def save_rollups(
+        self,
+        rollups: Dict[str, pd.DataFrame],
+        election_name: str,
+        entidad_id: int
+    ) -> List[str]:
+        """
+        Save rollup tables next to the section-level table of an entidad.
+        
+        Existing rollup tables for the same election and entidad are replaced.
+        
+        Args:
+            rollups: Dictionary mapping level to rollup DataFrame (from SectionRollup.build)
+            election_name: Election name
+            entidad_id: State ID (1-32)
+        
+        Returns:
+            Names of the saved tables
+        """
+        table_names = []
+        with sqlite3.connect(self.db_path) as conn:
+            for level, df in rollups.items():
+                table_name = self.rollup_table_name(election_name, entidad_id, level)
+                df.to_sql(table_name, conn, if_exists='replace', index=False)
+                table_names.append(table_name)
+        
+        logger.info(f"Saved {len(table_names)} rollup tables: {table_names}")
+        return table_names
+    
+    def load_rollup(self, election_name: str, entidad_id: int, level: str) -> pd.DataFrame:
+        """
+        Load a rollup table.
+        
+        Args:
+            election_name: Election name
+            entidad_id: State ID (1-32)
+            level: Rollup level (see SectionRollup.LEVELS)
+        
+        Returns:
+            Rollup DataFrame
+        
+        Raises:
+            ValueError: If the table does not exist
+        """
+        table_name = self.rollup_table_name(election_name, entidad_id, level)
+        
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                (table_name,)
+            )
+            if not cursor.fetchone():
+                raise ValueError(f"Table not found: {table_name}")
+            
+            df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+        
+        if self.dtype_profile is not None:
+            df = self.dtype_profile.apply(df)
+        
+        return df
+    
     def list_elections(self) -> pd.DataFrame:
         """
         List all elections in the database.
@@ -313,9 +401,42 @@ class ElectoralDatabase:
             
             return info
     
+    def get_source_encoding(self, source_file: str, source_signature: Tuple[int, int]) -> Optional[str]:
+        """
+        Get the encoding recorded the last time a source file was processed.
+        
+        The encoding is only reused while the file is unchanged: a file
+        replaced at the same path (e.g. a UTF-8 re-export of a latin-1 file)
+        must be detected again.
+        
+        Args:
+            source_file: Source file path as passed to save_electoral_data
+            source_signature: Current (mtime_ns, size) of the file (see archives.source_signature)
+        
+        Returns:
+            Encoding name, or None if the file has not been processed before
+            or has changed since
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                """
+                SELECT metadata_json FROM election_metadata
+                WHERE source_file = ? AND metadata_json IS NOT NULL
+                ORDER BY updated_at DESC
+                """,
+                (source_file,)
+            )
+            for (metadata_json,) in cursor:
+                metadata = json.loads(metadata_json)
+                encoding = metadata.get('source_encoding')
+                if encoding and metadata.get('source_signature') == list(source_signature):
+                    return encoding
+        
+        return None
+    
     def delete_election(self, table_name: str):
         """
-        Delete an election table and its metadata.
+        Delete an election table, its rollup tables and its metadata.
         
         Args:
             table_name: Name of the table to delete
@@ -323,8 +444,10 @@ class ElectoralDatabase:
         logger.warning(f"Deleting table: {table_name}")
         
         with sqlite3.connect(self.db_path) as conn:
-            # Delete table
+            # Delete table and its rollups
             conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+            for level in SectionRollup.LEVELS:
+                conn.execute(f"DROP TABLE IF EXISTS {table_name}_{level}")
             # Delete metadata
             conn.execute("DELETE FROM election_metadata WHERE table_name = ?", (table_name,))
             conn.commit()
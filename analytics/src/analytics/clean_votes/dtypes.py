@@ -0,0 +1,124 @@
+"""
+Compact Dtype Profile
+=====================
+
+Memory-lean dtypes for electoral frames, shared by the column mapper,
+cleaner and database.
+
+By default repeated labels are held as object columns and counts and
+percentages end up as float64. The compact profile stores repeated labels
+as categoricals, counts as int32 and shares as float32.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Iterable, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CompactDtypeProfile:
+    """
+    Typed ingestion profile for electoral data.
+    """
+    
+    # Repeated labels (a few dozen distinct values per file)
+    CATEGORICAL_COLUMNS = ['ENTIDAD', 'DISTRITO_FEDERAL', 'TIPO_CASILLA']
+    
+    # Vote counts, LISTA_NOMINAL and TOTAL_VOTOS_SUM
+    COUNT_DTYPE = 'int32'
+    
+    # {party}_PCT columns
+    SHARE_DTYPE = 'float32'
+    
+    def apply_categories(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Store repeated label columns as categoricals.
+        
+        Args:
+            df: DataFrame with standardized column names
+        
+        Returns:
+            DataFrame with CATEGORICAL_COLUMNS as category dtype
+        """
+        for col in self.CATEGORICAL_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        return df
+    
+    def apply_counts(self, df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+        """
+        Store count columns as COUNT_DTYPE.
+        
+        Columns are only narrowed when that is lossless: columns with
+        missing, fractional or out-of-range values keep their dtype.
+        
+        Args:
+            df: DataFrame holding the columns
+            columns: Count columns to narrow
+        
+        Returns:
+            DataFrame with narrowed count columns
+        """
+        info = np.iinfo(self.COUNT_DTYPE)
+        for col in columns:
+            values = df[col]
+            if values.dtype == self.COUNT_DTYPE or not pd.api.types.is_numeric_dtype(values):
+                continue
+            if values.isna().any():
+                continue
+            
+            array = values.to_numpy(dtype='float64')
+            if len(array) and (array.min() < info.min or array.max() > info.max or not np.all(np.mod(array, 1) == 0)):
+                logger.debug(f"Keeping {col} as {values.dtype}: not representable as {self.COUNT_DTYPE}")
+                continue
+            
+            df[col] = array.astype(self.COUNT_DTYPE)
+        return df
+    
+    def apply_shares(self, df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+        """
+        Store share (percentage) columns as SHARE_DTYPE.
+        
+        Args:
+            df: DataFrame holding the columns
+            columns: Share columns to narrow
+        
+        Returns:
+            DataFrame with narrowed share columns
+        """
+        for col in columns:
+            df[col] = df[col].astype(self.SHARE_DTYPE)
+        return df
+    
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Apply the whole profile to a cleaned (section-level) frame.
+        
+        Used when loading tables back from the database, where SQLite only
+        knows TEXT/INTEGER/REAL.
+        
+        Args:
+            df: Cleaned electoral DataFrame
+        
+        Returns:
+            DataFrame with compact dtypes
+        """
+        df = self.apply_categories(df)
+        df = self.apply_shares(df, self.share_columns(df))
+        return self.apply_counts(df, self.count_columns(df))
+    
+    def share_columns(self, df: pd.DataFrame) -> List[str]:
+        """Percentage columns of a cleaned frame."""
+        return [col for col in df.columns if col.endswith('_PCT')]
+    
+    def count_columns(self, df: pd.DataFrame) -> List[str]:
+        """Count columns of a cleaned frame (votes, totals and LISTA_NOMINAL)."""
+        return [
+            col for col in df.columns
+            if pd.api.types.is_numeric_dtype(df[col])
+            and not col.endswith('_PCT')
+            and not col.startswith('ID_')
+            and col not in ['SECCION', 'geometry']
+        ]
@@ -0,0 +1,464 @@
+"""
+DuckDB Electoral Data Cleaner
+=============================
+
+Out-of-core backend for ElectoralDataCleaner.
+
+The section aggregation runs as one SQL query in an embedded DuckDB
+database, directly over a raw CSV file or a (staged) Parquet file, so
+the casillas never become a pandas DataFrame. Only the section-level
+result is fetched. DuckDB streams the file and spills the aggregation to
+disk when it reaches its memory limit, which keeps full national PREP
+files within the RAM of small ingest workers.
+
+As in ElectoralDataCleaner._aggregate_sections, every output column is a
+per-section sum or a per-section first value, so the query is a single
+GROUP BY; totals and shares are then computed on the section rows with
+the pandas cleaner's own methods.
+"""
+
+import tempfile
+from pathlib import Path
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+from .cleaner import ElectoralDataCleaner
+from .dtypes import CompactDtypeProfile
+from .archives import split_archive_path
+from .staging import ParquetStagingCache
+from .reader import ElectoralDataReader
+from .column_mapper import ColumnMapper
+
+logger = logging.getLogger(__name__)
+
+
+class DuckDBElectoralDataCleaner(ElectoralDataCleaner):
+    """
+    ElectoralDataCleaner running the section aggregation in embedded DuckDB.
+    
+    clean_file() cleans a CSV or Parquet file without loading it into
+    pandas. clean() and clean_chunks() take pandas DataFrames like the other
+    backends (chunks are appended to a DuckDB table, which spills to disk,
+    and aggregated once). Output matches the pandas path: same columns,
+    order, values and dtypes. Sums are bit-identical for integer counts,
+    which is what electoral files hold.
+    
+    clean_casillas() is inherited from the pandas implementation.
+    """
+    
+    # Files clean_file() can query directly (archive members go through pandas)
+    FILE_SUFFIXES = ['.csv', '.parquet']
+    
+    # String parse of the ID columns, as in ElectoralDataCleaner._parse_id
+    ID_PATTERN = '-?[0-9]+'
+    
+    # Text values pd.to_numeric turns into int64 (anything else makes the column float64)
+    INTEGER_PATTERN = '[+-]?[0-9]+'
+    
+    # DuckDB type names of numeric columns
+    INTEGER_TYPES = [
+        'TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT',
+        'UTINYINT', 'USMALLINT', 'UINTEGER', 'UBIGINT', 'UHUGEINT'
+    ]
+    FLOAT_TYPES = ['FLOAT', 'DOUBLE']
+    
+    # Spill directory used when none is given
+    DEFAULT_TEMP_DIRECTORY = Path(tempfile.gettempdir()) / 'clean_votes_duckdb'
+    
+    def __init__(
+        self,
+        columns_to_exclude: Optional[List[str]] = None,
+        dtype_profile: Optional[CompactDtypeProfile] = None,
+        memory_limit: Optional[str] = None,
+        temp_directory: Optional[str] = None,
+        threads: Optional[int] = None
+    ):
+        """
+        Initialize the cleaner.
+        
+        Args:
+            columns_to_exclude: Custom list of columns to exclude.
+                              If None, uses COLUMNS_TO_EXCLUDE.
+            dtype_profile: Optional compact dtype profile (see ElectoralDataCleaner)
+            memory_limit: DuckDB memory limit, e.g. '3GB'. Above it the
+                         aggregation spills to temp_directory. If None,
+                         DuckDB's default (80% of RAM) applies.
+            temp_directory: Directory for spilled data.
+                           If None, uses DEFAULT_TEMP_DIRECTORY.
+            threads: DuckDB worker threads (default: one per core)
+        """
+        super().__init__(columns_to_exclude=columns_to_exclude, dtype_profile=dtype_profile)
+        self.memory_limit = memory_limit
+        self.temp_directory = Path(temp_directory) if temp_directory else self.DEFAULT_TEMP_DIRECTORY
+        self.threads = threads
+    
+    def supports_file(self, file_path: str) -> bool:
+        """
+        Check whether clean_file() can query a file directly.
+        
+        Args:
+            file_path: Path to electoral data file
+        
+        Returns:
+            True for plain CSV and Parquet files
+        """
+        return Path(file_path).suffix.lower() in self.FILE_SUFFIXES and split_archive_path(file_path) is None
+    
+    def clean_file(
+        self,
+        file_path: str,
+        reader: Optional[ElectoralDataReader] = None,
+        column_mapper: Optional[ColumnMapper] = None,
+        encoding: Optional[str] = None,
+        entidad_ids: Optional[List[int]] = None
+    ) -> pd.DataFrame:
+        """
+        Clean a CSV or Parquet file in DuckDB, without loading it into pandas.
+        
+        CSV files are parsed with the header row, delimiter and encoding the
+        reader detects, as text like the reader's dtype=str. Column names are
+        homologated with the column mapper before the cleaning rules apply.
+        
+        Args:
+            file_path: Path to a CSV or Parquet file (see supports_file)
+            reader: Reader used to sniff CSV files. Its last_encoding is set
+                   to the codec used, as after ElectoralDataReader.read_file.
+            column_mapper: Column mapper for homologating raw column names
+            encoding: CSV encoding, or None to detect it from the header sample
+            entidad_ids: Only aggregate casillas of these entidades
+        
+        Returns:
+            Cleaned and aggregated DataFrame by ENTIDAD and SECCION
+        
+        Raises:
+            ValueError: If the file cannot be queried directly
+        """
+        if not self.supports_file(file_path):
+            raise ValueError(f"Unsupported file for DuckDB cleaning: {file_path}. "
+                             f"Must be a plain {' or '.join(self.FILE_SUFFIXES)} file.")
+        
+        reader = reader or ElectoralDataReader()
+        column_mapper = column_mapper or ColumnMapper()
+        
+        logger.info(f"Starting DuckDB cleaning process: {file_path}")
+        
+        with self._connect() as conn:
+            if Path(file_path).suffix.lower() == '.csv':
+                source = self._csv_source(file_path, reader, encoding)
+            else:
+                source = f"read_parquet({self._literal(file_path)})"
+            
+            conn.execute(f"CREATE VIEW source AS SELECT * FROM {source}")
+            columns = self._source_columns(conn, column_mapper)
+            return self._clean_source(conn, columns, entidad_ids)
+    
+    def clean(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Main cleaning pipeline, run as a single DuckDB query.
+        
+        Args:
+            df: Raw electoral DataFrame
+        
+        Returns:
+            Cleaned and aggregated DataFrame by ENTIDAD and SECCION
+        """
+        logger.info(f"Starting DuckDB cleaning process. Input shape: {df.shape}")
+        
+        with self._connect() as conn:
+            conn.register('source', self._project_frame(df))
+            columns = self._source_columns(conn)
+            return self._clean_source(conn, columns)
+    
+    def clean_chunks(self, chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Streaming cleaning pipeline for files read in chunks.
+        
+        Chunks are appended to a DuckDB table, which spills to disk past the
+        memory limit, and aggregated by one query at the end.
+        
+        Args:
+            chunks: Iterable of raw electoral DataFrames sharing the same columns
+        
+        Returns:
+            Cleaned and aggregated DataFrame by ENTIDAD and SECCION
+        """
+        rows_in = 0
+        
+        with self._connect() as conn:
+            select = None
+            for chunk_number, chunk in enumerate(chunks, start=1):
+                rows_in += len(chunk)
+                conn.register('chunk', self._project_frame(chunk))
+                
+                if select is None:
+                    # Text columns are stored as VARCHAR so later chunks always fit
+                    select = ', '.join(
+                        self._quote(name) if self._is_numeric_type(dtype) else f"CAST({self._quote(name)} AS VARCHAR) AS {self._quote(name)}"
+                        for name, dtype in self._describe(conn, 'chunk').items()
+                    )
+                    conn.execute(f"CREATE TABLE source AS SELECT {select} FROM chunk")
+                else:
+                    conn.execute(f"INSERT INTO source SELECT {select} FROM chunk")
+                conn.unregister('chunk')
+                
+                logger.info(f"Loaded chunk {chunk_number} ({rows_in} rows so far)")
+            
+            if select is None:
+                raise ValueError("No data chunks to clean")
+            
+            logger.info(f"Starting streaming aggregation finalize. Input rows: {rows_in}")
+            columns = self._source_columns(conn)
+            return self._clean_source(conn, columns)
+    
+    def _connect(self):
+        """Open an in-memory DuckDB database with the memory and spill settings."""
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError(
+                "The duckdb cleaner backend requires duckdb, an analytics dependency. Install it with: uv sync"
+            ) from e
+        
+        self.temp_directory.mkdir(parents=True, exist_ok=True)
+        config = {'temp_directory': str(self.temp_directory)}
+        if self.memory_limit:
+            config['memory_limit'] = self.memory_limit
+        if self.threads:
+            config['threads'] = self.threads
+        
+        return duckdb.connect(':memory:', config=config)
+    
+    def _csv_source(self, file_path: str, reader: ElectoralDataReader, encoding: Optional[str]) -> str:
+        """read_csv() call with the options ElectoralDataReader would use for the file."""
+        header_row, delimiter, _, encoding = reader.sniff_csv(file_path, encoding)
+        reader.last_encoding = encoding
+        
+        options = {
+            'header': 'true',
+            'all_varchar': 'true',
+            'encoding': self._literal(encoding),
+            'quote': "'\"'",
+            'escape': "'\"'",
+            # Like on_bad_lines='skip' (long rows) and pandas' NaN padding (short rows)
+            'ignore_errors': 'true',
+            'null_padding': 'true',
+        }
+        if header_row is None:
+            logger.warning("Could not find header row. Assuming data starts from first row.")
+        else:
+            logger.info(f"Found header at line {header_row}")
+            logger.info(f"Detected delimiter: {repr(delimiter)}")
+            options['skip'] = str(header_row)
+            options['delim'] = self._literal(delimiter)
+        
+        arguments = ', '.join(f"{name}={value}" for name, value in options.items())
+        return f"read_csv({self._literal(file_path)}, {arguments})"
+    
+    def _project_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Columns of a (homologated) frame the cleaner can use."""
+        return df[[
+            col for col in df.columns
+            if col not in self.columns_to_exclude
+            and (self.is_needed_column(col) or pd.api.types.is_numeric_dtype(df[col]))
+        ]]
+    
+    def _describe(self, conn, relation: str) -> Dict[str, str]:
+        """Column names and DuckDB types of a relation."""
+        return {name: dtype for name, dtype, *_ in conn.execute(f"DESCRIBE SELECT * FROM {relation}").fetchall()}
+    
+    def _source_columns(self, conn, column_mapper: Optional[ColumnMapper] = None) -> Dict[str, tuple]:
+        """
+        Map the standard names of the usable source columns to (raw name, DuckDB type).
+        
+        Like the reader's projection, internal columns ('__' prefix) are
+        skipped and numeric-typed columns are always kept.
+        """
+        columns = {}
+        for raw_name, dtype in self._describe(conn, 'source').items():
+            if raw_name.startswith('__'):
+                continue
+            
+            name = column_mapper.standardize_column_name(raw_name) if column_mapper else raw_name
+            if name in columns or name in self.columns_to_exclude:
+                continue
+            if self.is_needed_column(name) or self._is_numeric_type(dtype):
+                columns[name] = (raw_name, dtype)
+        
+        return columns
+    
+    def _is_numeric_type(self, dtype: str) -> bool:
+        """Check whether a DuckDB type is numeric."""
+        return dtype in self.INTEGER_TYPES or dtype in self.FLOAT_TYPES or dtype.startswith('DECIMAL')
+    
+    def _clean_source(
+        self,
+        conn,
+        columns: Dict[str, tuple],
+        entidad_ids: Optional[List[int]] = None
+    ) -> pd.DataFrame:
+        """
+        Aggregate the 'source' relation to sections and finish in pandas.
+        
+        Args:
+            conn: DuckDB connection with a 'source' view or table
+            columns: Output of _source_columns()
+            entidad_ids: Only aggregate casillas of these entidades
+        
+        Returns:
+            Cleaned and aggregated DataFrame by ENTIDAD and SECCION
+        """
+        missing = [col for col in self.KEY_COLUMNS if col not in columns]
+        if missing:
+            raise ValueError(f"Key columns not found: {missing}")
+        
+        # Vote columns, in input order (as _get_vote_columns after _convert_numeric_columns)
+        votes = [
+            name for name, (_, dtype) in columns.items()
+            if (self._is_numeric_column_name(name) or self._is_numeric_type(dtype))
+            and self._is_vote_column_name(name)
+        ]
+        has_lista = 'LISTA_NOMINAL' in columns
+        if not has_lista:
+            logger.warning("LISTA_NOMINAL column not found, skipping")
+        
+        id_columns = [col for col in ['ID_DISTRITO_FEDERAL', 'ID_ENTIDAD', 'SECCION'] if col in columns]
+        available = set(columns) | {f"{col}_STR" for col in id_columns}
+        descriptive = [col for col in self.DESCRIPTIVE_COLUMNS if col in available]
+        # _STR labels are derived from the IDs after aggregation
+        firsts = [col for col in descriptive if not col.endswith('_STR')]
+        
+        # Casilla level: parsed votes, LISTA_NOMINAL and IDs, carried text, integral flags
+        casilla_expressions = [f"{self._number_sql(*columns[col])} AS {self._quote(col)}" for col in votes]
+        casilla_expressions.append(
+            f"{self._number_sql(*columns['LISTA_NOMINAL']) if has_lista else '0.0'} AS \"LISTA_NOMINAL\""
+        )
+        casilla_expressions += [f"{self._id_sql(columns[col][0])} AS {self._quote(col)}" for col in id_columns]
+        casilla_expressions += [
+            f"{self._quote(columns[col][0])} AS {self._quote(col)}"
+            for col in firsts if col not in votes and col not in id_columns
+        ]
+        casilla_expressions += [
+            f"{self._integral_sql(*columns[col])} AS \"__integral_{i}\"" for i, col in enumerate(votes)
+        ]
+        
+        where = ''
+        if entidad_ids is not None:
+            ids = ', '.join(str(int(e)) for e in entidad_ids)
+            # Staged copies carry the numeric entidad key, which lets DuckDB skip row groups
+            if ParquetStagingCache.ENTIDAD_KEY in self._describe(conn, 'source'):
+                where = f"WHERE {self._quote(ParquetStagingCache.ENTIDAD_KEY)} IN ({ids})"
+            else:
+                where = f"WHERE {self._id_sql(columns['ID_ENTIDAD'][0])} IN ({ids})"
+        
+        # Section level: sums, first values in file order, integral flags
+        keys = ', '.join(self._quote(col) for col in self.KEY_COLUMNS)
+        section_expressions = [f"sum({self._quote(col)}) AS {self._quote(col)}" for col in ['LISTA_NOMINAL'] + votes]
+        section_expressions += [
+            f"arg_min_null({self._quote(col)}, __row__) AS \"__first_{i}\"" for i, col in enumerate(firsts)
+        ]
+        section_expressions += [f"bool_and(\"__integral_{i}\") AS \"__integral_{i}\"" for i in range(len(votes))]
+        
+        query = f"""
+            WITH casillas AS (
+                SELECT {', '.join(casilla_expressions)}, row_number() OVER () AS __row__
+                FROM source {where}
+            )
+            SELECT {keys}, {', '.join(section_expressions)}
+            FROM casillas
+            GROUP BY {keys}
+            ORDER BY {', '.join(f'{self._quote(col)} ASC NULLS LAST' for col in self.KEY_COLUMNS)}
+        """
+        sections = conn.execute(query).df()
+        logger.info(f"Aggregated {len(sections)} sections")
+        
+        integral = {col: bool(sections[f"__integral_{i}"].all()) for i, col in enumerate(votes)}
+        first_values = {col: sections[f"__first_{i}"] for i, col in enumerate(firsts)}
+        
+        return self._to_pandas(sections, votes, descriptive, first_values, integral, has_lista)
+    
+    def _to_pandas(
+        self,
+        sections: pd.DataFrame,
+        votes: List[str],
+        descriptive: List[str],
+        first_values: Dict[str, pd.Series],
+        integral: Dict[str, bool],
+        has_lista: bool
+    ) -> pd.DataFrame:
+        """Build the pandas cleaner's output from the aggregated section rows."""
+        df = pd.DataFrame({col: sections[col] for col in self.KEY_COLUMNS + ['LISTA_NOMINAL'] + votes})
+        for col in self.KEY_COLUMNS:
+            df[col] = df[col].astype('Int64')
+        
+        # Integer vote sums are exact in DOUBLE; restore the integer dtype
+        for col in votes:
+            if integral[col]:
+                df[col] = df[col].astype('int64')
+                if col in first_values:
+                    first_values[col] = first_values[col].astype('int64')
+        if 'ID_DISTRITO_FEDERAL' in first_values:
+            first_values['ID_DISTRITO_FEDERAL'] = first_values['ID_DISTRITO_FEDERAL'].astype('Int64')
+        
+        df = self._add_section_totals_and_percentages(df, votes)
+        
+        # ID labels, as _homogenize_id_columns would have made them
+        ids = pd.DataFrame({col: first_values.get(col, df.get(col)) for col in ['ID_DISTRITO_FEDERAL', 'ID_ENTIDAD', 'SECCION']
+                            if f"{col}_STR" in descriptive})
+        labels = self._homogenize_id_columns(ids)
+        
+        # Like the pandas path, columns that are both votes and descriptive
+        # (DISTRITO_FEDERAL) come out as {col}_x (sum) and {col}_y (first)
+        overlap = set(votes) & set(descriptive)
+        df = df.rename(columns={col: f"{col}_x" for col in overlap})
+        for col in descriptive:
+            name = f"{col}_y" if col in overlap else col
+            df[name] = labels[col] if col.endswith('_STR') else first_values[col]
+        
+        logger.info(f"Final merged dataset: {df.shape}")
+        
+        # Without LISTA_NOMINAL the pandas merge has no sections to start from
+        if not has_lista:
+            df = df.iloc[0:0]
+        
+        df = self._remove_null_rows(df)
+        logger.info(f"After removing nulls: {df.shape}")
+        
+        if self.dtype_profile is not None:
+            df = self.dtype_profile.apply(df)
+        
+        return df
+    
+    def _number_sql(self, column: str, dtype: str) -> str:
+        """SQL coercing a column to DOUBLE like pd.to_numeric(errors='coerce'), filling missing with 0."""
+        if self._is_numeric_type(dtype):
+            value = f"CAST({self._quote(column)} AS DOUBLE)"
+        else:
+            # DuckDB accepts '1_000' as a number, pandas does not
+            text = f"trim(CAST({self._quote(column)} AS VARCHAR))"
+            value = f"CASE WHEN NOT contains({text}, '_') THEN TRY_CAST({text} AS DOUBLE) END"
+        return f"coalesce(CASE WHEN isnan({value}) THEN 0.0 ELSE {value} END, 0.0)"
+    
+    def _id_sql(self, column: str) -> str:
+        """SQL parsing an ID column to BIGINT (NULL for anything but optionally negative digits)."""
+        text = f"trim(CAST({self._quote(column)} AS VARCHAR))"
+        return f"CASE WHEN regexp_full_match({text}, '{self.ID_PATTERN}') THEN TRY_CAST({text} AS BIGINT) END"
+    
+    def _integral_sql(self, column: str, dtype: str) -> str:
+        """SQL flagging casillas whose value keeps pd.to_numeric output int64."""
+        if dtype in self.INTEGER_TYPES:
+            return f"({self._quote(column)} IS NOT NULL)"
+        if self._is_numeric_type(dtype):
+            return 'false'
+        text = f"trim(CAST({self._quote(column)} AS VARCHAR))"
+        return f"coalesce(regexp_full_match({text}, '{self.INTEGER_PATTERN}'), false)"
+    
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        """Quote a column name for SQL."""
+        return '"' + str(identifier).replace('"', '""') + '"'
+    
+    @staticmethod
+    def _literal(value: Any) -> str:
+        """Quote a string literal for SQL."""
+        return "'" + str(value).replace("'", "''") + "'"
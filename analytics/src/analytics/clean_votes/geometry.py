@@ -8,9 +8,13 @@ Merges cleaned electoral data with shapefile geometries.
 import geopandas as gpd
 import pandas as pd
 from pathlib import Path
-from typing import Optional, Union
+from typing import Optional, Union, Sequence
 import logging
 
+from .shapefile_catalog import ShapefileCatalog, read_shapefile
+from .geometry_cache import GeometryCache, get_geometry_cache
+from .geoparquet_store import GeoParquetStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,15 +23,39 @@ class GeometryMerger:
     Merges electoral data with shapefile geometries.
     """
     
-    def __init__(self, shapefile_base_dir: Optional[str] = None):
+    # Shapefile attributes the merge and the municipio rollup use
+    MERGE_COLUMNS = ('ENTIDAD', 'SECCION', 'MUNICIPIO')
+    
+    def __init__(
+        self,
+        shapefile_base_dir: Optional[str] = None,
+        catalog_path: Optional[str] = None,
+        geometry_cache: Optional[GeometryCache] = None,
+        geoparquet_store: Optional[GeoParquetStore] = None,
+        columns: Optional[Sequence[str]] = MERGE_COLUMNS
+    ):
         """
         Initialize the geometry merger.
         
         Args:
             shapefile_base_dir: Base directory containing shapefiles organized by state.
                               If None, will need to be provided per merge operation.
+            catalog_path: Shapefile catalog file (see ShapefileCatalog).
+                         If None, uses shapefile_catalog.json in the base directory.
+            geometry_cache: Cache of prepared shapefiles.
+                           If None, uses the process-wide cache (get_geometry_cache()).
+            geoparquet_store: GeoParquet copies of the shapefiles, read instead of
+                             a shapefile whenever its copy is current.
+                             If None, uses the 'geoparquet' folder in the base directory.
+            columns: Shapefile attribute columns to load besides geometry
+                    (default: MERGE_COLUMNS). If None, loads all of them.
         """
         self.shapefile_base_dir = Path(shapefile_base_dir) if shapefile_base_dir else None
+        self.catalog_path = catalog_path
+        self.catalog: Optional[ShapefileCatalog] = None
+        self.geometry_cache = geometry_cache or get_geometry_cache()
+        self.geoparquet_store = geoparquet_store
+        self.columns = tuple(columns) if columns is not None else None
     
     def merge_with_shapefile(
         self,
@@ -55,44 +83,39 @@ class GeometryMerger:
         if shapefile_path is None and entidad_id is None:
             raise ValueError("Must provide either shapefile_path or entidad_id")
         
-        # Construct shapefile path if not provided
+        # Look the shapefile up in the catalog, else construct its path
         if shapefile_path is None:
-            shapefile_path = self._construct_shapefile_path(entidad_id, shapefile_type)
+            shapefile_path = (
+                self._get_catalog().lookup(entidad_id, shapefile_type)
+                or self._construct_shapefile_path(entidad_id, shapefile_type)
+            )
         
         shapefile_path = Path(shapefile_path)
         
         # First try: Use the constructed/provided path
         if shapefile_path.exists():
-            logger.info(f"Reading shapefile: {shapefile_path}")
-            gdf = gpd.read_file(shapefile_path)
-            logger.info(f"Loaded {len(gdf)} geometries")
+            # Check if this shapefile has the correct ENTIDAD (attributes only, no geometry)
+            file_entidad = self._read_entidad(shapefile_path) if entidad_id is not None else None
+            if file_entidad is not None and file_entidad != entidad_id:
+                logger.warning(f"Shapefile has wrong ENTIDAD ({file_entidad}), expected {entidad_id}")
+                logger.info("Searching for correct shapefile...")
+                
+                # Use smart search to find the correct file
+                try:
+                    shapefile_path = self._find_shapefile_by_entidad(entidad_id, shapefile_type)
+                except FileNotFoundError as e:
+                    logger.error(f"Could not find correct shapefile: {e}")
+                    # Continue with wrong data as fallback
             
-            # Check if this shapefile has the correct ENTIDAD
-            if 'ENTIDAD' in gdf.columns and entidad_id is not None:
-                entidad_values = gdf['ENTIDAD'].unique()
-                if len(entidad_values) == 1 and int(entidad_values[0]) != entidad_id:
-                    logger.warning(f"Shapefile has wrong ENTIDAD ({entidad_values[0]}), expected {entidad_id}")
-                    logger.info("Searching for correct shapefile...")
-                    
-                    # Use smart search to find the correct file
-                    try:
-                        shapefile_path = self._find_shapefile_by_entidad(entidad_id, shapefile_type)
-                        gdf = gpd.read_file(shapefile_path)
-                        logger.info(f"Loaded {len(gdf)} geometries from correct file")
-                    except FileNotFoundError as e:
-                        logger.error(f"Could not find correct shapefile: {e}")
-                        # Continue with wrong data as fallback
+            gdf_prepared = self._read_prepared(shapefile_path, shapefile_type)
         else:
             # File doesn't exist at expected path, use smart search
             logger.warning(f"Shapefile not found at expected path: {shapefile_path}")
             logger.info("Searching for correct shapefile...")
             shapefile_path = self._find_shapefile_by_entidad(entidad_id, shapefile_type)
-            logger.info(f"Reading shapefile: {shapefile_path}")
-            gdf = gpd.read_file(shapefile_path)
-            logger.info(f"Loaded {len(gdf)} geometries")
+            gdf_prepared = self._read_prepared(shapefile_path, shapefile_type)
         
-        # Prepare merge keys (no need to override ENTIDAD anymore since we find the correct file)
-        gdf_prepared = self._prepare_geodataframe(gdf, expected_entidad=None)
+        # Merge keys are prepared once per shapefile (and cached)
         df_prepared = self._prepare_dataframe(df)
         
         # Perform merge
@@ -103,6 +126,52 @@ class GeometryMerger:
         
         return gdf_merged
     
+    def _read_prepared(self, shapefile_path: Path, shapefile_type: str) -> gpd.GeoDataFrame:
+        """
+        Read and prepare a shapefile, through the geometry cache.
+        
+        A current GeoParquet copy is read instead of the shapefile itself.
+        
+        Args:
+            shapefile_path: Path to the shapefile
+            shapefile_type: 'peepjf' or 'nacional' (part of the cache key)
+        
+        Returns:
+            Prepared GeoDataFrame, shared with the cache (do not modify it)
+        """
+        gdf_prepared = self.geometry_cache.get(shapefile_path, shapefile_type, self.columns)
+        if gdf_prepared is not None:
+            logger.info(f"Using cached geometries for {shapefile_path} ({len(gdf_prepared)} rows)")
+            return gdf_prepared
+        
+        gdf = self._get_store().read(shapefile_path, columns=self.columns)
+        if gdf is not None:
+            logger.info(f"Loaded {len(gdf)} geometries from the GeoParquet store")
+        else:
+            logger.info(f"Reading shapefile: {shapefile_path}")
+            gdf = read_shapefile(shapefile_path, columns=self.columns)
+            logger.info(f"Loaded {len(gdf)} geometries")
+        
+        gdf_prepared = self._prepare_geodataframe(gdf, expected_entidad=None)
+        self.geometry_cache.put(shapefile_path, shapefile_type, gdf_prepared, self.columns)
+        return gdf_prepared
+    
+    def _read_entidad(self, shapefile_path: Path) -> Optional[int]:
+        """
+        ENTIDAD a shapefile holds, without decoding its geometry.
+        
+        The value recorded in the shapefile catalog is used while the file is
+        unchanged; otherwise only the .dbf ENTIDAD column is read.
+        
+        Args:
+            shapefile_path: Path to the shapefile
+        
+        Returns:
+            The single ENTIDAD value, or None if it cannot be read or the file
+            holds several values
+        """
+        return self._get_catalog().entidad_of(shapefile_path)
+    
     def _find_shapefile_by_entidad(
         self,
         entidad_id: int,
@@ -111,7 +180,9 @@ class GeometryMerger:
         """
         Search for shapefile with matching ENTIDAD value across all folders.
         
-        This handles cases where shapefiles are in the wrong folders.
+        This handles cases where shapefiles are in the wrong folders. The
+        catalog records the ENTIDAD inside each file, so this costs at most
+        one catalog refresh instead of reading every candidate shapefile.
         
         Args:
             entidad_id: State ID to find
@@ -123,39 +194,43 @@ class GeometryMerger:
         Raises:
             FileNotFoundError: If no shapefile with matching ENTIDAD is found
         """
-        import geopandas as gpd
-        
-        base_dir = self.shapefile_base_dir / ('productos_ine_nacional' if shapefile_type == 'nacional' else 'shapefiles_peepjf')
+        base_dir = self._get_base_dir() / ShapefileCatalog.TYPE_DIRS.get(shapefile_type, 'shapefiles_peepjf')
         
         if not base_dir.exists():
             raise FileNotFoundError(f"Base directory not found: {base_dir}")
         
         logger.info(f"Searching for ENTIDAD={entidad_id} in {base_dir.name}...")
         
-        # Search all SECCION.shp files
-        for shp_file in base_dir.rglob('SECCION.shp'):
-            try:
-                # Quick check: read just the ENTIDAD column
-                gdf = gpd.read_file(shp_file, rows=1)
-                
-                if 'ENTIDAD' in gdf.columns:
-                    # Read full file to check all ENTIDAD values
-                    gdf_full = gpd.read_file(shp_file)
-                    entidad_values = gdf_full['ENTIDAD'].unique()
-                    
-                    if len(entidad_values) == 1 and int(entidad_values[0]) == entidad_id:
-                        logger.info(f"✅ Found correct shapefile at: {shp_file.relative_to(self.shapefile_base_dir)}")
-                        return shp_file
-            except Exception as e:
-                # Skip files that can't be read
-                logger.debug(f"Skipping {shp_file}: {e}")
-                continue
+        catalog = self._get_catalog()
+        catalog.refresh()
+        shp_file = catalog.lookup(entidad_id, shapefile_type)
+        if shp_file is not None:
+            logger.info(f"✅ Found correct shapefile at: {shp_file.relative_to(self.shapefile_base_dir)}")
+            return shp_file
         
         raise FileNotFoundError(
             f"No shapefile found with ENTIDAD={entidad_id} in {shapefile_type} directory. "
             f"You may need to re-download the correct shapefile."
         )
     
+    def _get_base_dir(self) -> Path:
+        """Shapefile base directory (default: data/geo at the project root)."""
+        if self.shapefile_base_dir is None:
+            self.shapefile_base_dir = Path(__file__).parents[4] / 'data' / 'geo'
+        return self.shapefile_base_dir
+    
+    def _get_store(self) -> GeoParquetStore:
+        """GeoParquet store for the base directory, created on first use."""
+        if self.geoparquet_store is None:
+            self.geoparquet_store = GeoParquetStore(self._get_base_dir())
+        return self.geoparquet_store
+    
+    def _get_catalog(self) -> ShapefileCatalog:
+        """Shapefile catalog for the base directory, created on first use."""
+        if self.catalog is None:
+            self.catalog = ShapefileCatalog(self._get_base_dir(), self.catalog_path)
+        return self.catalog
+    
     def _construct_shapefile_path(self, entidad_id: int, shapefile_type: str) -> Path:
         """
         Construct shapefile path from entidad_id.
@@ -167,9 +242,7 @@ class GeometryMerger:
         Returns:
             Path to SECCION.shp file
         """
-        if self.shapefile_base_dir is None:
-            # Use default data/geo directory
-            self.shapefile_base_dir = Path(__file__).parents[4] / 'data' / 'geo'
+        self._get_base_dir()
         
         # Map entidad_id to folder name
         entidad_folders = {
@@ -0,0 +1,209 @@
+"""
+Geometry Cache
+==============
+
+Size-bounded LRU cache of prepared SECCION GeoDataFrames.
+
+PRES, SEN and DIP results of the same year merge with identical section
+polygons, and the dashboard merges geometry on every request that needs it.
+Caching the prepared shapefile (typed ENTIDAD/SECCION keys, ready to merge)
+turns every repeat into a dictionary hit. Entries are keyed by
+(path, shapefile_signature, shapefile_type) and the columns read, so an
+edited shapefile is never served stale.
+
+One cache is shared per process (get_geometry_cache()), so the orchestrator
+and the dashboard's DataService hit the same entries. Its entries stay alive
+until evicted (up to DEFAULT_MAX_BYTES), also after a run has freed its
+results; pass a smaller GeometryCache where nothing will be reused.
+"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, Sequence
+import numpy as np
+import geopandas as gpd
+import logging
+
+from .shapefile_catalog import shapefile_signature
+
+logger = logging.getLogger(__name__)
+
+
+class GeometryCache:
+    """
+    Thread-safe LRU cache of prepared section GeoDataFrames with hit/miss counters.
+    """
+    
+    # One entry per state is enough for a full national run
+    DEFAULT_MAX_ENTRIES = 32
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+    
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of cached GeoDataFrames
+            max_bytes: Maximum estimated memory of all cached GeoDataFrames.
+                      A single GeoDataFrame larger than this is not cached.
+        """
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError(f"Invalid cache bounds: max_entries={max_entries}, max_bytes={max_bytes}. Must be positive.")
+        
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, Tuple[gpd.GeoDataFrame, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(
+        self,
+        shapefile_path: Path,
+        shapefile_type: str,
+        columns: Optional[Sequence[str]] = None
+    ) -> Optional[gpd.GeoDataFrame]:
+        """
+        Look up a prepared GeoDataFrame, counting a hit or a miss.
+        
+        Args:
+            shapefile_path: Path to the shapefile
+            shapefile_type: 'peepjf' or 'nacional'
+            columns: Attribute columns the GeoDataFrame was read with (None = all)
+        
+        Returns:
+            The cached GeoDataFrame (do not modify it), or None
+        """
+        key = self._key(shapefile_path, shapefile_type, columns)
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(
+        self,
+        shapefile_path: Path,
+        shapefile_type: str,
+        gdf: gpd.GeoDataFrame,
+        columns: Optional[Sequence[str]] = None
+    ):
+        """
+        Cache a prepared GeoDataFrame, evicting least recently used entries.
+        
+        Entries for older versions of the same file are dropped.
+        
+        Args:
+            shapefile_path: Path the GeoDataFrame was read from
+            shapefile_type: 'peepjf' or 'nacional'
+            gdf: Prepared GeoDataFrame
+            columns: Attribute columns it was read with (None = all)
+        """
+        key = self._key(shapefile_path, shapefile_type, columns)
+        if key is None:
+            return
+        
+        size = self._estimate_bytes(gdf)
+        if size > self.max_bytes:
+            logger.info(f"Not caching {shapefile_path}: ~{size / 1024**2:.0f} MB exceeds the cache size")
+            return
+        
+        with self._lock:
+            for old_key in [k for k in self._entries if k[0] == key[0] and k[2:] == key[2:]]:
+                self._bytes -= self._entries.pop(old_key)[1]
+            
+            self._entries[key] = (gdf, size)
+            self._bytes += size
+            
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache counters.
+        
+        Returns:
+            Dictionary with hits, misses, evictions, hit_rate, entries, bytes,
+            max_entries and max_bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+            }
+    
+    def _key(
+        self,
+        shapefile_path: Path,
+        shapefile_type: str,
+        columns: Optional[Sequence[str]]
+    ) -> Optional[Tuple[str, Tuple[int, int], str, Optional[Tuple[str, ...]]]]:
+        """
+        (resolved path, signature, type, columns), or None if the file is gone.
+        
+        The signature is the one the shapefile catalog and GeoParquetStore
+        use, so all three agree on when a shapefile has changed.
+        """
+        shapefile_path = Path(shapefile_path)
+        try:
+            signature = shapefile_signature(shapefile_path)
+        except OSError:
+            return None
+        return str(shapefile_path.resolve()), signature, shapefile_type, tuple(columns) if columns is not None else None
+    
+    @staticmethod
+    def _estimate_bytes(gdf: gpd.GeoDataFrame) -> int:
+        """Attribute memory plus 16 bytes per coordinate pair and a per-geometry overhead."""
+        import shapely
+        
+        geometry = np.asarray(gdf.geometry.array)
+        attributes = gdf.drop(columns=gdf.geometry.name).memory_usage(index=True, deep=True).sum()
+        return int(attributes + shapely.get_num_coordinates(geometry).sum() * 16 + len(gdf) * 100)
+    
+    def __getstate__(self):
+        """Pickle the bounds only: worker processes start with an empty cache."""
+        return {'max_entries': self.max_entries, 'max_bytes': self.max_bytes}
+    
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+# Process-wide cache shared by every GeometryMerger that is not given its own
+_shared_cache: Optional[GeometryCache] = None
+
+
+def get_geometry_cache() -> GeometryCache:
+    """
+    Get or create the process-wide GeometryCache.
+    
+    Returns:
+        GeometryCache instance
+    """
+    global _shared_cache
+    
+    if _shared_cache is None:
+        _shared_cache = GeometryCache()
+    
+    return _shared_cache
@@ -0,0 +1,235 @@
+"""
+GeoParquet Geometry Store
+=========================
+
+Normalized GeoParquet copies of the SECCION shapefiles under data/geo/.
+
+Shapefiles go through GDAL and the .dbf format on every read: attribute
+types are guessed (ENTIDAD/SECCION as float or text), names are cut to ten
+characters and the whole file is decoded even when a few columns are needed.
+The store converts each SECCION.shp once into GeoParquet with WKB geometry,
+Int32 ENTIDAD/SECCION and the source CRS, so GeometryMerger can read only the
+columns it needs in tens of milliseconds.
+
+Each copy is tied to its shapefile's mtime/size in a manifest; a changed
+shapefile makes its copy stale and the merger reads the shapefile instead
+until the store is rebuilt:
+    uv run python -m analytics.clean_votes.geoparquet_store --base-dir data/geo
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+import pandas as pd
+import geopandas as gpd
+import logging
+
+from .shapefile_catalog import ShapefileCatalog, shapefile_signature, read_shapefile
+
+logger = logging.getLogger(__name__)
+
+
+class GeoParquetStore:
+    """
+    GeoParquet copies of SECCION shapefiles, mirrored under one directory.
+    """
+    
+    STORE_DIR_NAME = 'geoparquet'
+    MANIFEST_NAME = 'manifest.json'
+    VERSION = 1
+    
+    # Merge keys, stored as nullable Int32
+    KEY_COLUMNS = ['ENTIDAD', 'SECCION']
+    
+    def __init__(self, base_dir: str, store_dir: Optional[str] = None):
+        """
+        Initialize the store.
+        
+        Args:
+            base_dir: Shapefile base directory (data/geo)
+            store_dir: Directory for the GeoParquet copies.
+                      If None, uses a 'geoparquet' folder in base_dir.
+        """
+        self.base_dir = Path(base_dir)
+        self.store_dir = Path(store_dir) if store_dir else self.base_dir / self.STORE_DIR_NAME
+        self._manifest: Optional[Dict[str, Dict[str, Any]]] = None
+        self._manifest_mtime_ns: Optional[int] = None
+    
+    def build(self, catalog: Optional[ShapefileCatalog] = None, force: bool = False) -> int:
+        """
+        Convert every catalogued SECCION shapefile whose copy is missing or stale.
+        
+        Args:
+            catalog: Catalog listing the shapefiles (default: a fresh scan of base_dir)
+            force: Convert all shapefiles, even those with a current copy
+        
+        Returns:
+            Number of shapefiles converted
+        """
+        if catalog is None:
+            catalog = ShapefileCatalog(self.base_dir)
+            catalog.scan()
+        
+        converted = 0
+        for entry in sorted(catalog.entries(), key=lambda e: e['path']):
+            shp_file = self.base_dir / entry['path']
+            if force or not self.is_current(shp_file):
+                self.convert(shp_file)
+                converted += 1
+        
+        logger.info(f"GeoParquet store: converted {converted} shapefiles into {self.store_dir}")
+        return converted
+    
+    def convert(self, shp_file: Path) -> Path:
+        """
+        Convert one shapefile into the store.
+        
+        Args:
+            shp_file: Path to a SECCION.shp under base_dir
+        
+        Returns:
+            Path to the GeoParquet copy
+        """
+        shp_file = Path(shp_file)
+        relative_path = shp_file.relative_to(self.base_dir).as_posix()
+        signature = shapefile_signature(shp_file)
+        
+        gdf = self._normalize(read_shapefile(shp_file))
+        if gdf.crs is None:
+            logger.warning(f"{shp_file} has no CRS (.prj); stored without one")
+        
+        store_file = self.store_dir / Path(relative_path).with_suffix('.parquet')
+        store_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = store_file.with_name(f'{store_file.name}.{os.getpid()}.tmp')
+        gdf.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, store_file)
+        
+        manifest = self._load()
+        manifest[relative_path] = {
+            'store_path': store_file.relative_to(self.store_dir).as_posix(),
+            'mtime_ns': signature[0],
+            'size': signature[1],
+            'crs': gdf.crs.to_string() if gdf.crs is not None else None,
+            'rows': len(gdf),
+        }
+        self._save()
+        
+        logger.info(f"Stored {relative_path}: {len(gdf)} sections")
+        return store_file
+    
+    def is_current(self, shp_file: Path) -> bool:
+        """
+        Whether the store holds an up-to-date copy of a shapefile.
+        
+        Args:
+            shp_file: Path to the shapefile
+        
+        Returns:
+            True if the copy exists and the shapefile's mtime/size are unchanged
+        """
+        return self._current_entry(Path(shp_file)) is not None
+    
+    def read(self, shp_file: Path, columns: Optional[List[str]] = None) -> Optional[gpd.GeoDataFrame]:
+        """
+        Read a shapefile's GeoParquet copy, if it is current.
+        
+        Args:
+            shp_file: Path to the shapefile
+            columns: Attribute columns to read (geometry is always read).
+                    If None, reads all columns.
+        
+        Returns:
+            GeoDataFrame, or None if the copy is missing or stale
+        """
+        entry = self._current_entry(Path(shp_file))
+        if entry is None:
+            return None
+        
+        store_file = self.store_dir / entry['store_path']
+        if columns is not None:
+            import pyarrow.parquet as pq
+            
+            # File order, as shapefile reads return them
+            wanted = set(columns) | {'geometry'}
+            columns = [col for col in pq.read_schema(store_file).names if col in wanted]
+        return gpd.read_parquet(store_file, columns=columns)
+    
+    def _current_entry(self, shp_file: Path) -> Optional[Dict[str, Any]]:
+        """Manifest entry of a shapefile, if its copy exists and is not stale."""
+        try:
+            relative_path = shp_file.resolve().relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            return None
+        
+        entry = self._load().get(relative_path)
+        if entry is None or not (self.store_dir / entry['store_path']).exists():
+            return None
+        
+        try:
+            if shapefile_signature(shp_file) != (entry['mtime_ns'], entry['size']):
+                logger.info(f"GeoParquet copy of {relative_path} is stale; reading the shapefile")
+                return None
+        except OSError:
+            return None
+        return entry
+    
+    def _normalize(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """Int32 merge keys and a geometry column named 'geometry'."""
+        if gdf.geometry.name != 'geometry':
+            gdf = gdf.rename_geometry('geometry')
+        for col in self.KEY_COLUMNS:
+            if col in gdf.columns:
+                gdf[col] = pd.to_numeric(gdf[col], errors='coerce').astype('Int32')
+        return gdf
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Manifest entries keyed by shapefile path, re-read when the file changes."""
+        manifest_path = self.store_dir / self.MANIFEST_NAME
+        try:
+            mtime_ns = os.stat(manifest_path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        
+        if self._manifest is None or mtime_ns != self._manifest_mtime_ns:
+            self._manifest = {}
+            self._manifest_mtime_ns = mtime_ns
+            if mtime_ns is not None:
+                try:
+                    with open(manifest_path, encoding='utf-8') as f:
+                        manifest = json.load(f)
+                    if manifest.get('version') == self.VERSION:
+                        self._manifest = manifest['entries']
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Ignoring unreadable GeoParquet manifest {manifest_path}: {e}")
+        return self._manifest
+    
+    def _save(self):
+        """Write the manifest atomically."""
+        manifest_path = self.store_dir / self.MANIFEST_NAME
+        tmp_path = manifest_path.with_name(f'{manifest_path.name}.{os.getpid()}.tmp')
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'entries': self._manifest}, f, indent=1)
+        os.replace(tmp_path, manifest_path)
+        self._manifest_mtime_ns = os.stat(manifest_path).st_mtime_ns
+
+
+def main():
+    """Command-line interface: convert the shapefiles under a base directory."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Convert SECCION shapefiles into the GeoParquet store')
+    parser.add_argument('--base-dir', default='data/geo', help='Shapefile base directory (default: data/geo)')
+    parser.add_argument('--store-dir', help='Store directory (default: <base-dir>/geoparquet)')
+    parser.add_argument('--force', action='store_true', help='Convert all shapefiles, even current ones')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    store = GeoParquetStore(args.base_dir, args.store_dir)
+    converted = store.build(force=args.force)
+    print(f"\n✓ Converted {converted} shapefiles into {store.store_dir}")
+
+
+if __name__ == '__main__':
+    main()
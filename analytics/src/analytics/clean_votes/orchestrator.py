@@ -5,18 +5,28 @@ Clean Votes Orchestrator
 Main workflow coordinator for cleaning electoral data.
 """
 
+import functools
+import itertools
 import pandas as pd
 import geopandas as gpd
 from pathlib import Path
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, Iterable, Iterator, Callable, List, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 import logging
 
+from .archives import open_source, remove_extracted, source_signature
 from .reader import ElectoralDataReader
 from .cleaner import ElectoralDataCleaner
+from .polars_cleaner import PolarsElectoralDataCleaner
+from .duckdb_cleaner import DuckDBElectoralDataCleaner
 from .geometry import GeometryMerger
+from .geometry_cache import GeometryCache
 from .database import ElectoralDatabase
+from .staging import ParquetStagingCache
+from .rollups import SectionRollup
 from .utils import infer_election_metadata, get_default_db_path
 from .column_mapper import ColumnMapper
+from .dtypes import CompactDtypeProfile
 
 # Configure logging
 logging.basicConfig(
@@ -26,6 +36,87 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _configure_worker_logging(level: int) -> None:
+    """Give pool workers the parent's log level (spawned workers start fresh)."""
+    logging.getLogger().setLevel(level)
+
+
+def _prepare_entidad(
+    geometry_merger: GeometryMerger,
+    rollup: Optional[SectionRollup],
+    df_entidad: pd.DataFrame,
+    entidad_id: int,
+    election_name: str,
+    include_geometry: bool,
+    shapefile_path: Optional[str],
+    shapefile_type: str,
+    save_geojson: bool,
+    geojson_output_path: Optional[str]
+) -> Tuple[str, Union[pd.DataFrame, gpd.GeoDataFrame], Optional[Dict[str, pd.DataFrame]]]:
+    """
+    Prepare one entidad for saving: geometry merge, GeoJSON and rollups.
+    
+    Module-level and free of database handles, so it can run in a worker
+    process; the caller does the database writes.
+    
+    Args:
+        geometry_merger: GeometryMerger used for the shapefile merge
+        rollup: SectionRollup to build rollups with (None to skip them)
+        df_entidad: Cleaned rows of this entidad
+        entidad_id: ENTIDAD ID
+        election_name: Election name (for the default GeoJSON path)
+        include_geometry: Whether to merge with shapefile geometries
+        shapefile_path: Explicit shapefile path (if not using auto-detection)
+        shapefile_type: Type of shapefile ('peepjf' or 'nacional')
+        save_geojson: Whether to save as GeoJSON (only if include_geometry=True)
+        geojson_output_path: Path for GeoJSON output
+            (default: data/insights/{election}_{entidad}.geojson)
+    
+    Returns:
+        Tuple of (entidad name, final DataFrame or GeoDataFrame, rollups or None)
+    """
+    logger.info(f"\n--- Processing ENTIDAD {entidad_id:02d} ---")
+    
+    # Get entidad name
+    entidad_name = df_entidad['ENTIDAD'].iloc[0] if 'ENTIDAD' in df_entidad.columns else f"ENTIDAD_{entidad_id:02d}"
+    
+    logger.info(f"Entidad: {entidad_name}, Rows: {len(df_entidad)}")
+    
+    # Step 5: Merge with geometry if requested
+    df_final = df_entidad
+    if include_geometry:
+        logger.info(f"\n[5/6] Merging ENTIDAD {entidad_id:02d} with geometry...")
+        try:
+            gdf_entidad = geometry_merger.merge_with_shapefile(
+                df_entidad,
+                shapefile_path=shapefile_path,
+                entidad_id=entidad_id,
+                shapefile_type=shapefile_type
+            )
+            logger.info(f"✓ Merged with geometry: {len(gdf_entidad)} rows")
+            
+            # Save GeoJSON if requested
+            if save_geojson:
+                output_path = geojson_output_path or f"data/insights/{election_name.lower()}_{entidad_id:02d}.geojson"
+                geometry_merger.save_geojson(gdf_entidad, output_path)
+            
+            df_final = gdf_entidad
+        except Exception as e:
+            logger.error(f"Failed to merge geometry: {e}")
+            logger.warning("Continuing without geometry")
+    
+    # Rollups are optional: a failure here must not keep the sections from being saved
+    rollups = None
+    if rollup is not None:
+        try:
+            rollups = rollup.build(df_final)
+        except Exception as e:
+            logger.error(f"Failed to build rollups: {e}")
+            logger.warning("Continuing without rollups")
+    
+    return entidad_name, df_final, rollups
+
+
 class CleanVotesOrchestrator:
     """
     Orchestrates the complete workflow for cleaning electoral data.
@@ -36,10 +127,28 @@ class CleanVotesOrchestrator:
     - Processes all entidades in the data
     """
     
+    # Cleaner implementations selectable with cleaner_backend
+    CLEANER_BACKENDS = {
+        'pandas': ElectoralDataCleaner,
+        'polars': PolarsElectoralDataCleaner,
+        'duckdb': DuckDBElectoralDataCleaner,
+    }
+    
+    # Return values of process_electoral_file (see result_mode)
+    RESULT_MODES = ['frame', 'iterator', 'summary']
+    
     def __init__(
         self,
         db_path: Optional[str] = None,
-        shapefile_base_dir: Optional[str] = None
+        shapefile_base_dir: Optional[str] = None,
+        csv_engine: str = 'pandas',
+        project_columns: bool = True,
+        use_staging: bool = True,
+        staging_dir: Optional[str] = None,
+        compact_dtypes: bool = False,
+        cleaner_backend: str = 'pandas',
+        cleaner_options: Optional[Dict[str, Any]] = None,
+        geometry_cache: Optional[GeometryCache] = None
     ):
         """
         Initialize the orchestrator.
@@ -49,19 +158,58 @@ class CleanVotesOrchestrator:
                     If None, uses default location: data/processed/electoral_data.db
             shapefile_base_dir: Base directory for shapefiles.
                               If None, auto-detects from data/geo/
+            csv_engine: CSV parse engine ('pandas' or 'pyarrow' for multithreaded parsing)
+            project_columns: Only parse the columns the cleaner uses. Columns it
+                           would drop anyway (OBSERVACIONES, FECHA_HORA_*, ...)
+                           are skipped at read time.
+            use_staging: Keep a Parquet copy of each raw CSV/Excel file, keyed by
+                        content hash, and read it instead of re-parsing the raw
+                        file on later runs.
+            staging_dir: Directory for staged Parquet files.
+                        If None, uses a 'staging' folder next to the database.
+            compact_dtypes: Use the compact dtype profile end to end: categorical
+                           labels, int32 counts and float32 percentages
+                           (see CompactDtypeProfile).
+            cleaner_backend: Cleaning implementation ('pandas', 'polars' or 'duckdb').
+                            'polars' runs the section aggregation as one
+                            multi-threaded LazyFrame plan with the same output.
+                            'duckdb' runs it as SQL directly over CSV and
+                            (staged) Parquet files, spilling to disk, so files
+                            larger than RAM can be processed.
+            cleaner_options: Extra keyword arguments for the cleaner backend,
+                            e.g. {'memory_limit': '3GB'} for 'duckdb'.
+            geometry_cache: Cache of prepared shapefiles for the geometry merge.
+                           If None, uses the process-wide cache, which keeps up
+                           to GeometryCache.DEFAULT_MAX_BYTES of section polygons
+                           alive between runs (see get_geometry_cache()).
         """
+        if cleaner_backend not in self.CLEANER_BACKENDS:
+            raise ValueError(
+                f"Invalid cleaner_backend: {cleaner_backend}. Must be one of {list(self.CLEANER_BACKENDS)}."
+            )
+        
         # Use default database path if not provided
         if db_path is None:
             db_path = str(get_default_db_path())
         
         self.db_path = Path(db_path)
+        self.project_columns = project_columns
         
-        # Initialize components
-        self.reader = ElectoralDataReader()
-        self.column_mapper = ColumnMapper()
-        self.cleaner = ElectoralDataCleaner()
-        self.geometry_merger = GeometryMerger(shapefile_base_dir)
-        self.database = ElectoralDatabase(str(db_path))
+        # Initialize components (sharing one dtype profile, if any)
+        self.dtype_profile = CompactDtypeProfile() if compact_dtypes else None
+        self.reader = ElectoralDataReader(csv_engine=csv_engine)
+        self.column_mapper = ColumnMapper(dtype_profile=self.dtype_profile)
+        self.cleaner = self.CLEANER_BACKENDS[cleaner_backend](
+            dtype_profile=self.dtype_profile, **(cleaner_options or {})
+        )
+        self.geometry_merger = GeometryMerger(shapefile_base_dir, geometry_cache=geometry_cache)
+        self.database = ElectoralDatabase(str(db_path), dtype_profile=self.dtype_profile)
+        self.rollup = SectionRollup(dtype_profile=self.dtype_profile)
+        
+        if use_staging:
+            self.staging = ParquetStagingCache(staging_dir or self.db_path.parent / 'staging')
+        else:
+            self.staging = None
         
         logger.info(f"Orchestrator initialized with database: {self.db_path}")
     
@@ -76,9 +224,14 @@ class CleanVotesOrchestrator:
         save_to_db: bool = True,
         save_geojson: bool = False,
         geojson_output_path: Optional[str] = None,
-        encoding: str = 'utf-8',
-        metadata: Optional[Dict[str, Any]] = None
-    ) -> Union[pd.DataFrame, gpd.GeoDataFrame]:
+        encoding: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        streaming: bool = False,
+        chunksize: Optional[int] = None,
+        entidad_ids: Optional[List[int]] = None,
+        max_workers: int = 1,
+        result_mode: str = 'frame'
+    ) -> Union[pd.DataFrame, gpd.GeoDataFrame, Iterator[Tuple[int, pd.DataFrame]], Dict[str, Any]]:
         """
         Complete workflow: read, clean, optionally merge geometry, and save.
         
@@ -97,11 +250,37 @@ class CleanVotesOrchestrator:
             save_to_db: Whether to save to database
             save_geojson: Whether to save as GeoJSON (only if include_geometry=True)
             geojson_output_path: Path for GeoJSON output
-            encoding: File encoding
+            encoding: File encoding. If None, the encoding recorded for this
+                     file on a previous run is reused while the file is
+                     unchanged; otherwise the reader detects it from the header
+                     sample. The encoding used is stored as 'source_encoding'
+                     in the election metadata, with the file's 'source_signature'.
             metadata: Additional metadata to store
+            streaming: Read the file in chunks and aggregate sections incrementally.
+                      Keeps peak memory bounded by the number of sections instead
+                      of casillas; produces the same output as the default path.
+            chunksize: Rows per chunk when streaming (default: reader's DEFAULT_CHUNKSIZE)
+            entidad_ids: Only process (and save) these entidades. For Parquet
+                        sources and staged copies, only the matching row groups
+                        are read; other sources are read in full and filtered.
+            max_workers: Worker processes for the per-entidad geometry merge,
+                        GeoJSON export and rollups (default: 1, sequential).
+                        Results are written to the database by this process
+                        only, and a failing entidad is logged and skipped as
+                        in the sequential path.
+            result_mode: What to return (one of RESULT_MODES):
+                        'frame' concatenates every entidad into one frame;
+                        'iterator' returns a generator of (entidad_id, frame)
+                        pairs, yielded as each entidad is saved. Nothing runs
+                        until it is iterated; 'summary' processes everything
+                        but frees each entidad after saving it. Prepared
+                        shapefiles stay in the geometry cache either way.
             
         Returns:
-            Cleaned DataFrame or GeoDataFrame
+            'frame': cleaned DataFrame or GeoDataFrame of all entidades.
+            'iterator': iterator of (entidad_id, DataFrame or GeoDataFrame).
+            'summary': dictionary with election_name, entidades (saved IDs),
+            rows, columns and has_geometry.
             
         Examples:
             >>> # Explicit parameters
@@ -118,7 +297,18 @@ class CleanVotesOrchestrator:
             ...     'data/raw/electoral/2024/PRES_2024.csv',  # Auto-detects PRES_2024, 2024
             ...     include_geometry=True
             ... )
+            
+            >>> # One state in memory at a time
+            >>> for entidad_id, gdf in orchestrator.process_electoral_file(
+            ...     'data/raw/electoral/2024/PRES_2024.csv', include_geometry=True, result_mode='iterator'
+            ... ):
+            ...     print(entidad_id, len(gdf))
         """
+        if max_workers < 1:
+            raise ValueError(f"Invalid max_workers: {max_workers}. Must be at least 1.")
+        if result_mode not in self.RESULT_MODES:
+            raise ValueError(f"Invalid result_mode: {result_mode}. Must be one of {self.RESULT_MODES}.")
+        
         # Auto-infer election metadata if not provided
         if election_name is None or election_date is None:
             inferred_name, inferred_date = infer_election_metadata(file_path)
@@ -137,83 +327,165 @@ class CleanVotesOrchestrator:
                 "ensure file path follows pattern: data/raw/electoral/YYYY/TYPE_YYYY.csv"
             )
         
+        entidad_results = self._iter_entidad_results(
+            file_path=file_path,
+            election_name=election_name,
+            election_date=election_date,
+            include_geometry=include_geometry,
+            shapefile_path=shapefile_path,
+            shapefile_type=shapefile_type,
+            save_to_db=save_to_db,
+            save_geojson=save_geojson,
+            geojson_output_path=geojson_output_path,
+            encoding=encoding,
+            metadata=metadata,
+            streaming=streaming,
+            chunksize=chunksize,
+            entidad_ids=entidad_ids,
+            max_workers=max_workers
+        )
+        
+        if result_mode == 'iterator':
+            return entidad_results
+        if result_mode == 'summary':
+            return self._summarize_results(election_name, entidad_results)
+        
+        # Workers finish in any order; keep the output in entidad order
+        results = dict(sorted(entidad_results))
+        
+        # Return combined results if multiple entidades, otherwise return single result
+        if len(results) == 1:
+            return list(results.values())[0]
+        else:
+            # Concatenate all results
+            all_dfs = list(results.values())
+            if isinstance(all_dfs[0], gpd.GeoDataFrame):
+                return gpd.GeoDataFrame(pd.concat(all_dfs, ignore_index=True))
+            else:
+                return pd.concat(all_dfs, ignore_index=True)
+    
+    def _iter_entidad_results(
+        self,
+        file_path: str,
+        election_name: str,
+        election_date: Optional[str],
+        include_geometry: bool,
+        shapefile_path: Optional[str],
+        shapefile_type: str,
+        save_to_db: bool,
+        save_geojson: bool,
+        geojson_output_path: Optional[str],
+        encoding: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+        streaming: bool,
+        chunksize: Optional[int],
+        entidad_ids: Optional[List[int]],
+        max_workers: int
+    ) -> Iterator[Tuple[int, Union[pd.DataFrame, gpd.GeoDataFrame]]]:
+        """
+        Run the workflow, yielding each entidad once it has been saved.
+        
+        Arguments are those of process_electoral_file, with the election name
+        and date already resolved.
+        
+        Yields:
+            (entidad_id, DataFrame or GeoDataFrame) for each entidad processed
+            successfully, in completion order. Failed entidades are logged and
+            skipped.
+        """
         logger.info("="*60)
         logger.info(f"Processing electoral file: {file_path}")
         logger.info(f"Election: {election_name}")
         logger.info(f"Date: {election_date}")
         logger.info("="*60)
         
-        # Step 1: Read data
-        logger.info("\n[1/6] Reading data...")
-        df_raw = self.reader.read_file(file_path, encoding=encoding)
-        logger.info(f"✓ Read {len(df_raw)} rows, {len(df_raw.columns)} columns")
+        # Recorded encodings are only reused for the same version of the file
+        signature = list(source_signature(file_path))
+        if encoding is None:
+            encoding = self.database.get_source_encoding(file_path, signature)
+            if encoding:
+                logger.info(f"Using encoding recorded on a previous run: {encoding}")
+        
+        staged_path = self._staged_path(file_path)
+        file_source = self._cleaner_file_source(file_path, staged_path)
         
-        # Step 2: Homologate column names (standardize 2018/2021/2024 formats)
-        logger.info("\n[2/6] Homologating column names...")
-        detected_year = self.column_mapper.detect_format_year(df_raw)
-        if detected_year:
-            logger.info(f"✓ Detected data format: {detected_year}")
-        df_homologated = self.column_mapper.homologate_columns(df_raw)
-        logger.info(f"✓ Homologated columns: {len(df_homologated.columns)} columns")
+        if file_source is not None:
+            # Steps 1-3 fused: the cleaner queries the file itself (out of core)
+            logger.info(f"\n[1-3/6] Cleaning {file_source} in DuckDB...")
+            self.reader.last_encoding = None
+            df_clean = self.cleaner.clean_file(
+                file_source,
+                reader=self.reader,
+                column_mapper=self.column_mapper,
+                encoding=encoding,
+                entidad_ids=entidad_ids
+            )
+            logger.info(f"✓ Cleaned data: {len(df_clean)} rows, {len(df_clean.columns)} columns")
+        elif streaming:
+            # Steps 1-3 fused: read, homologate and clean chunk by chunk
+            logger.info("\n[1-3/6] Reading, homologating and cleaning data in chunks...")
+            chunks = self._read_source_chunks(file_path, staged_path, encoding, chunksize, entidad_ids)
+            df_clean = self.cleaner.clean_chunks(self._homologate_chunks(chunks))
+            logger.info(f"✓ Cleaned data: {len(df_clean)} rows, {len(df_clean.columns)} columns")
+        else:
+            # Step 1: Read data
+            logger.info("\n[1/6] Reading data...")
+            df_raw = self._read_source(file_path, staged_path, encoding, entidad_ids)
+            logger.info(f"✓ Read {len(df_raw)} rows, {len(df_raw.columns)} columns")
+            
+            # Step 2: Homologate column names (standardize 2018/2021/2024 formats)
+            logger.info("\n[2/6] Homologating column names...")
+            detected_year = self.column_mapper.detect_format_year(df_raw)
+            if detected_year:
+                logger.info(f"✓ Detected data format: {detected_year}")
+            df_homologated = self.column_mapper.homologate_columns(df_raw)
+            logger.info(f"✓ Homologated columns: {len(df_homologated.columns)} columns")
+            
+            # Step 3: Clean data
+            logger.info("\n[3/6] Cleaning data...")
+            df_clean = self.cleaner.clean(df_homologated)
+            logger.info(f"✓ Cleaned data: {len(df_clean)} rows, {len(df_clean.columns)} columns")
         
-        # Step 3: Clean data
-        logger.info("\n[3/6] Cleaning data...")
-        df_clean = self.cleaner.clean(df_homologated)
-        logger.info(f"✓ Cleaned data: {len(df_clean)} rows, {len(df_clean.columns)} columns")
+        # The source has been read (and staged): drop a 7z member's extracted copy
+        remove_extracted(file_path)
+        
+        # Staged reads carry no encoding; keep the one recorded for the raw file
+        source_encoding = self.reader.last_encoding or encoding
+        if source_encoding:
+            metadata = {**(metadata or {}), 'source_encoding': source_encoding, 'source_signature': signature}
         
         # Step 4: Get entidades in the data
         if 'ID_ENTIDAD' not in df_clean.columns:
             raise ValueError("ID_ENTIDAD column not found in cleaned data")
         
         entidades = df_clean['ID_ENTIDAD'].dropna().unique()
+        if entidad_ids is not None:
+            entidades = [e for e in entidades if int(e) in set(entidad_ids)]
         logger.info(f"✓ Found {len(entidades)} entidades: {sorted(entidades)}")
         
-        # Step 5: Process each entidad separately
+        # Step 5: Process each entidad separately. Geometry merges and rollups
+        # may run in worker processes; this process is the only database writer.
         logger.info("\n[4/6] Processing by entidad...")
-        results = {}
+        processed = 0
+        prepare = functools.partial(
+            _prepare_entidad,
+            self.geometry_merger,
+            self.rollup if save_to_db else None,
+            election_name=election_name,
+            include_geometry=include_geometry,
+            shapefile_path=shapefile_path,
+            shapefile_type=shapefile_type,
+            save_geojson=save_geojson,
+            geojson_output_path=geojson_output_path
+        )
         
-        for entidad_id in sorted(entidades):
+        for entidad_id, prepared in self._prepare_entidades(df_clean, sorted(entidades), prepare, max_workers):
             try:
-                entidad_id = int(entidad_id)
-                logger.info(f"\n--- Processing ENTIDAD {entidad_id:02d} ---")
-                
-                # Filter data for this entidad
-                df_entidad = df_clean[df_clean['ID_ENTIDAD'] == entidad_id].copy()
-                
-                # Get entidad name
-                entidad_name = df_entidad['ENTIDAD'].iloc[0] if 'ENTIDAD' in df_entidad.columns else f"ENTIDAD_{entidad_id:02d}"
-                
-                logger.info(f"Entidad: {entidad_name}, Rows: {len(df_entidad)}")
-                
-                # Step 5: Merge with geometry if requested
-                if include_geometry:
-                    logger.info("\n[5/6] Merging with geometry...")
-                    try:
-                        gdf_entidad = self.geometry_merger.merge_with_shapefile(
-                            df_entidad,
-                            shapefile_path=shapefile_path,
-                            entidad_id=entidad_id,
-                            shapefile_type=shapefile_type
-                        )
-                        logger.info(f"✓ Merged with geometry: {len(gdf_entidad)} rows")
-                        
-                        # Save GeoJSON if requested
-                        if save_geojson:
-                            if geojson_output_path is None:
-                                geojson_output_path = f"data/insights/{election_name.lower()}_{entidad_id:02d}.geojson"
-                            self.geometry_merger.save_geojson(gdf_entidad, geojson_output_path)
-                        
-                        df_final = gdf_entidad
-                    except Exception as e:
-                        logger.error(f"Failed to merge geometry: {e}")
-                        logger.warning("Continuing without geometry")
-                        df_final = df_entidad
-                else:
-                    df_final = df_entidad
+                entidad_name, df_final, rollups = prepared.result()
                 
                 # Step 6: Save to database
                 if save_to_db:
-                    logger.info("\n[6/6] Saving to database...")
+                    logger.info(f"\n[6/6] Saving ENTIDAD {entidad_id:02d} to database...")
                     table_name = self.database.save_electoral_data(
                         df=df_final,
                         election_name=election_name,
@@ -225,8 +497,13 @@ class CleanVotesOrchestrator:
                         metadata=metadata
                     )
                     logger.info(f"✓ Saved to table: {table_name}")
+                    
+                    # Municipio, distrito and entidad rollups, so higher-level
+                    # views never need the section rows
+                    if rollups is not None:
+                        rollup_tables = self.database.save_rollups(rollups, election_name, entidad_id)
+                        logger.info(f"✓ Saved rollups: {rollup_tables}")
                 
-                results[entidad_id] = df_final
                 logger.info(f"✓ ENTIDAD {entidad_id:02d} completed successfully")
                 
             except Exception as e:
@@ -234,21 +511,382 @@ class CleanVotesOrchestrator:
                 import traceback
                 traceback.print_exc()
                 continue
+            
+            processed += 1
+            yield entidad_id, df_final
         
         logger.info("\n" + "="*60)
-        logger.info(f"Processing complete! Processed {len(results)}/{len(entidades)} entidades")
+        logger.info(f"Processing complete! Processed {processed}/{len(entidades)} entidades")
         logger.info("="*60)
+    
+    def _summarize_results(
+        self,
+        election_name: str,
+        entidad_results: Iterable[Tuple[int, pd.DataFrame]]
+    ) -> Dict[str, Any]:
+        """
+        Consume per-entidad results, keeping only their counts.
         
-        # Return combined results if multiple entidades, otherwise return single result
-        if len(results) == 1:
-            return list(results.values())[0]
-        else:
-            # Concatenate all results
-            all_dfs = list(results.values())
-            if isinstance(all_dfs[0], gpd.GeoDataFrame):
-                return gpd.GeoDataFrame(pd.concat(all_dfs, ignore_index=True))
+        Args:
+            election_name: Election name
+            entidad_results: (entidad_id, DataFrame or GeoDataFrame) pairs
+        
+        Returns:
+            Dictionary with election_name, entidades (sorted IDs), rows,
+            columns (widest frame) and has_geometry
+        """
+        summary = {
+            'election_name': election_name,
+            'entidades': [],
+            'rows': 0,
+            'columns': 0,
+            'has_geometry': False
+        }
+        for entidad_id, df in entidad_results:
+            summary['entidades'].append(entidad_id)
+            summary['rows'] += len(df)
+            summary['columns'] = max(summary['columns'], len(df.columns))
+            summary['has_geometry'] = summary['has_geometry'] or 'geometry' in df.columns
+        
+        summary['entidades'].sort()
+        return summary
+    
+    def _prepare_entidades(
+        self,
+        df_clean: pd.DataFrame,
+        entidades: List[Any],
+        prepare: Callable[[pd.DataFrame, int], Tuple[str, pd.DataFrame, Optional[Dict[str, pd.DataFrame]]]],
+        max_workers: int
+    ) -> Iterator[Tuple[int, Future]]:
+        """
+        Run prepare on each entidad's rows, in this process or in a process pool.
+        
+        Args:
+            df_clean: Cleaned section-level DataFrame
+            entidades: ENTIDAD IDs to process, in order
+            prepare: Picklable callable taking (df_entidad, entidad_id)
+            max_workers: Worker processes (1 runs each entidad inline, lazily)
+        
+        Yields:
+            (entidad_id, future) pairs, in completion order. result() returns
+            prepare's output or re-raises its exception.
+        """
+        partitions = self._partition_entidades(df_clean)
+        frames = ((int(e), partitions[int(e)]) for e in entidades)
+        
+        if max_workers == 1:
+            for entidad_id, df_entidad in frames:
+                future = Future()
+                try:
+                    future.set_result(prepare(df_entidad, entidad_id))
+                except Exception as e:
+                    future.set_exception(e)
+                yield entidad_id, future
+            return
+        
+        logger.info(f"Fanning out {len(entidades)} entidades to {max_workers} worker processes")
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_configure_worker_logging,
+            initargs=(logging.getLogger().level,)
+        ) as executor:
+            futures = {
+                executor.submit(prepare, df_entidad, entidad_id): entidad_id
+                for entidad_id, df_entidad in frames
+            }
+            try:
+                # Popped so a consumed result is not kept alive by this dict
+                for future in as_completed(futures):
+                    yield futures.pop(future), future
+            finally:
+                # Closed early: do not start the remaining entidades
+                executor.shutdown(cancel_futures=True)
+    
+    def _partition_entidades(self, df_clean: pd.DataFrame) -> Dict[int, pd.DataFrame]:
+        """
+        Split the cleaned frame by ID_ENTIDAD in a single pass.
+        
+        The cleaners return sections sorted by ID_ENTIDAD, so each entidad is a
+        contiguous run of rows and its partition is an iloc slice: a view that
+        shares the parent's memory. Entidades whose rows are not contiguous
+        (frames cleaned elsewhere) fall back to a take() copy.
+        
+        Args:
+            df_clean: Cleaned section-level DataFrame
+        
+        Returns:
+            Dictionary mapping ENTIDAD ID to its rows (rows without an ID are left out)
+        """
+        partitions = {}
+        for entidad_id, positions in df_clean.groupby('ID_ENTIDAD', sort=False).indices.items():
+            start, stop = positions[0], positions[-1] + 1
+            if stop - start == len(positions):
+                partitions[int(entidad_id)] = df_clean.iloc[start:stop]
             else:
-                return pd.concat(all_dfs, ignore_index=True)
+                partitions[int(entidad_id)] = df_clean.take(positions)
+        
+        return partitions
+    
+    def _cleaner_file_source(self, file_path: str, staged_path: Optional[Path]) -> Optional[str]:
+        """
+        Pick the file the cleaner should query directly, if it can.
+        
+        Only the DuckDB backend cleans files itself. It prefers an existing
+        staged Parquet copy and otherwise reads a plain CSV or Parquet file;
+        other sources (Excel, archive members) go through the pandas reader.
+        Raw files are not staged on this path, since that would mean parsing
+        them in pandas.
+        
+        Args:
+            file_path: Path to electoral data file
+            staged_path: Path from _staged_path()
+        
+        Returns:
+            Path for DuckDBElectoralDataCleaner.clean_file(), or None
+        """
+        if not isinstance(self.cleaner, DuckDBElectoralDataCleaner):
+            return None
+        
+        if staged_path is not None and self._has_staged_copy(staged_path, self._column_projection()):
+            return str(staged_path)
+        if self.cleaner.supports_file(file_path):
+            return file_path
+        return None
+    
+    def _staged_path(self, file_path: str) -> Optional[Path]:
+        """
+        Locate the staged Parquet copy of a raw file.
+        
+        Args:
+            file_path: Path to electoral data file
+        
+        Returns:
+            Staged Parquet path (which may not exist yet), or None if the
+            file is not staged
+        """
+        if self.staging is None or not self.staging.supports(file_path):
+            return None
+        
+        return self.staging.staged_path(
+            file_path, self.staging.cached_content_hash(file_path), projected=self.project_columns
+        )
+    
+    def _has_staged_copy(self, staged_path: Path, usecols: Optional[Callable[[str], bool]]) -> bool:
+        """Whether a staged copy exists and holds every column the projection needs."""
+        return staged_path.exists() and self.staging.covers(staged_path, usecols)
+    
+    def _read_source(
+        self,
+        file_path: str,
+        staged_path: Optional[Path],
+        encoding: Optional[str],
+        entidad_ids: Optional[List[int]] = None
+    ) -> pd.DataFrame:
+        """
+        Read a raw file, going through the staging cache when enabled.
+        
+        The raw file is always read projected; only the projected columns are
+        staged, along with the raw header.
+        
+        Args:
+            file_path: Path to electoral data file
+            staged_path: Path from _staged_path()
+            encoding: File encoding (None to auto-detect)
+            entidad_ids: Entidades to read, pushed down to Parquet when possible
+        
+        Returns:
+            Projected DataFrame with the raw electoral data
+        """
+        usecols = self._column_projection()
+        # Only Parquet sources take a row filter; staged formats (CSV/Excel) never do,
+        # so a staged copy always holds every entidad
+        filters = self._source_entidad_filter(file_path, entidad_ids)
+        
+        if staged_path is None:
+            return self.reader.read_file(file_path, encoding=encoding, usecols=usecols, filters=filters)
+        
+        if self._has_staged_copy(staged_path, usecols):
+            logger.info(f"Reading staged copy: {staged_path}")
+            filters = self._staged_entidad_filter(staged_path, entidad_ids)
+            return self.reader.read_file(str(staged_path), usecols=usecols, filters=filters)
+        
+        source_columns, recording_usecols = self._recording_projection(usecols)
+        df = self.reader.read_file(file_path, encoding=encoding, usecols=recording_usecols, filters=filters)
+        self.staging.write(
+            df, staged_path, self._entidad_column(df.columns),
+            source_columns=list(dict.fromkeys(source_columns)) if usecols is not None else None
+        )
+        return df
+    
+    def _read_source_chunks(
+        self,
+        file_path: str,
+        staged_path: Optional[Path],
+        encoding: Optional[str],
+        chunksize: Optional[int],
+        entidad_ids: Optional[List[int]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream a raw file in chunks, going through the staging cache when enabled.
+        
+        The raw file is always read projected; only the projected columns are
+        staged, along with the raw header.
+        
+        Args:
+            file_path: Path to electoral data file
+            staged_path: Path from _staged_path()
+            encoding: File encoding (None to auto-detect)
+            chunksize: Rows per chunk
+            entidad_ids: Entidades to read, pushed down to Parquet when possible
+        
+        Returns:
+            Iterator of projected DataFrame chunks
+        """
+        usecols = self._column_projection()
+        filters = self._source_entidad_filter(file_path, entidad_ids)
+        
+        if staged_path is None:
+            return self.reader.read_file_chunks(
+                file_path, encoding=encoding, chunksize=chunksize, usecols=usecols, filters=filters
+            )
+        
+        if self._has_staged_copy(staged_path, usecols):
+            logger.info(f"Reading staged copy: {staged_path}")
+            filters = self._staged_entidad_filter(staged_path, entidad_ids)
+            return self.reader.read_file_chunks(str(staged_path), chunksize=chunksize, usecols=usecols, filters=filters)
+        
+        source_columns, recording_usecols = self._recording_projection(usecols)
+        chunks = self.reader.read_file_chunks(
+            file_path, encoding=encoding, chunksize=chunksize, usecols=recording_usecols, filters=filters
+        )
+        return self._stage_chunks(chunks, staged_path, source_columns if usecols is not None else None)
+    
+    def _stage_chunks(
+        self,
+        chunks: Iterator[pd.DataFrame],
+        staged_path: Path,
+        source_columns: Optional[List[str]]
+    ) -> Iterator[pd.DataFrame]:
+        """Tee projected chunks into the staging cache as they stream through."""
+        first = next(chunks, None)
+        if first is None:
+            return
+        
+        # The raw header has been seen by the projection once the first chunk is read
+        if source_columns is not None:
+            source_columns = list(dict.fromkeys(source_columns))
+        
+        chunks = itertools.chain([first], chunks)
+        yield from self.staging.write_chunks(
+            chunks, staged_path, self._entidad_column(first.columns), source_columns=source_columns
+        )
+    
+    @staticmethod
+    def _recording_projection(
+        usecols: Optional[Callable[[str], bool]]
+    ) -> Tuple[List[str], Optional[Callable[[str], bool]]]:
+        """
+        Wrap a column projection so it records every raw column name it sees.
+        
+        Args:
+            usecols: Column projection, or None
+        
+        Returns:
+            Tuple of (list filled with raw column names as the file is read,
+            wrapped projection or None)
+        """
+        source_columns: List[str] = []
+        if usecols is None:
+            return source_columns, None
+        
+        def recording_usecols(column: str) -> bool:
+            source_columns.append(column)
+            return usecols(column)
+        
+        return source_columns, recording_usecols
+    
+    def _entidad_column(self, columns: Iterable[str]) -> Optional[str]:
+        """Find the raw column that homologates to ID_ENTIDAD (ID_ENTIDAD, ID_ESTADO, ...)."""
+        for col in columns:
+            if self.column_mapper.standardize_column_name(col) == 'ID_ENTIDAD':
+                return col
+        return None
+    
+    def _staged_entidad_filter(self, staged_path: Path, entidad_ids: Optional[List[int]]) -> Optional[list]:
+        """Row filter on the staging entidad key, or None to read every entidad."""
+        if entidad_ids is None:
+            return None
+        return self.staging.entidad_filter(staged_path, entidad_ids)
+    
+    def _source_entidad_filter(self, file_path: str, entidad_ids: Optional[List[int]]) -> Optional[list]:
+        """
+        Build a row filter on the entidad column of a Parquet source.
+        
+        Integer columns are compared directly; string columns are matched
+        against both the plain and zero-padded ids ('9' and '09').
+        
+        Args:
+            file_path: Path to electoral data file
+            entidad_ids: Entidades to keep
+        
+        Returns:
+            Row filter for the reader, or None to read every row
+        """
+        if entidad_ids is None or Path(file_path).suffix.lower() != '.parquet':
+            return None
+        
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        with open_source(file_path, as_file=True) as source:
+            schema = pq.read_schema(source)
+        entidad_column = self._entidad_column(schema.names)
+        if entidad_column is None:
+            return None
+        
+        column_type = schema.field(entidad_column).type
+        if pa.types.is_integer(column_type):
+            return [(entidad_column, 'in', [int(e) for e in entidad_ids])]
+        if pa.types.is_string(column_type) or pa.types.is_large_string(column_type):
+            values = {str(int(e)) for e in entidad_ids} | {str(int(e)).zfill(2) for e in entidad_ids}
+            return [(entidad_column, 'in', sorted(values))]
+        return None
+    
+    def _column_projection(self) -> Optional[Callable[[str], bool]]:
+        """
+        Build the read-time column projection for the reader.
+        
+        Raw column names are mapped to their standard names with the
+        ColumnMapper, then checked against what the cleaner actually uses.
+        
+        Returns:
+            Callable taking a raw column name, or None if projection is disabled
+        """
+        if not self.project_columns:
+            return None
+        
+        def is_needed(column: str) -> bool:
+            standard_name = self.column_mapper.standardize_column_name(column)
+            return self.cleaner.is_needed_column(standard_name)
+        
+        return is_needed
+    
+    def _homologate_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Homologate column names of each chunk as it streams through.
+        
+        Args:
+            chunks: Iterable of raw DataFrame chunks
+            
+        Yields:
+            Chunks with standardized column names
+        """
+        for chunk_number, chunk in enumerate(chunks):
+            if chunk_number == 0:
+                detected_year = self.column_mapper.detect_format_year(chunk)
+                if detected_year:
+                    logger.info(f"✓ Detected data format: {detected_year}")
+            yield self.column_mapper.homologate_columns(chunk)
     
     def load_election_data(
         self,
@@ -310,6 +948,26 @@ class CleanVotesOrchestrator:
         
         return df
     
+    def load_rollup(self, election_name: str, entidad_id: int, level: str) -> pd.DataFrame:
+        """
+        Load a precomputed rollup (municipio, distrito or entidad level).
+        
+        Args:
+            election_name: Name of election (e.g., 'PRES_2024')
+            entidad_id: State ID (1-32)
+            level: Rollup level (see SectionRollup.LEVELS)
+        
+        Returns:
+            Rollup DataFrame with vote sums and vote-weighted shares
+        
+        Raises:
+            ValueError: If the rollup was not saved (e.g. municipio without geometry)
+        """
+        if level not in SectionRollup.LEVELS:
+            raise ValueError(f"Invalid rollup level: {level}. Must be one of {list(SectionRollup.LEVELS)}.")
+        
+        return self.database.load_rollup(election_name, entidad_id, level)
+    
     def list_available_elections(self) -> pd.DataFrame:
         """
         List all available elections in the database.
@@ -396,8 +1054,65 @@ def main():
     
     parser.add_argument(
         '--encoding',
-        default='utf-8',
-        help='File encoding'
+        default=None,
+        help='File encoding (default: auto-detect)'
+    )
+    
+    parser.add_argument(
+        '--csv-engine',
+        choices=ElectoralDataReader.CSV_ENGINES,
+        default='pandas',
+        help='CSV parse engine (pyarrow parses in parallel on all cores)'
+    )
+    
+    parser.add_argument(
+        '--streaming',
+        action='store_true',
+        help='Read the file in chunks to bound memory on large national files'
+    )
+    
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        help='Rows per chunk when streaming'
+    )
+    
+    parser.add_argument(
+        '--entidades',
+        type=int,
+        nargs='+',
+        help='Only process these entidad ids (e.g., --entidades 9 26)'
+    )
+    
+    parser.add_argument(
+        '--no-staging',
+        action='store_true',
+        help='Do not read or write the Parquet staging copy of the raw file'
+    )
+    
+    parser.add_argument(
+        '--compact-dtypes',
+        action='store_true',
+        help='Use categoricals, int32 counts and float32 percentages to cut memory'
+    )
+    
+    parser.add_argument(
+        '--cleaner-backend',
+        choices=list(CleanVotesOrchestrator.CLEANER_BACKENDS),
+        default='pandas',
+        help='Cleaning implementation (polars runs one multi-threaded query plan, duckdb cleans out of core)'
+    )
+    
+    parser.add_argument(
+        '--memory-limit',
+        help='DuckDB memory limit for --cleaner-backend duckdb (e.g., 3GB)'
+    )
+    
+    parser.add_argument(
+        '--max-workers',
+        type=int,
+        default=1,
+        help='Worker processes for the per-entidad geometry merge (default: 1, sequential)'
     )
     
     parser.add_argument(
@@ -408,7 +1123,21 @@ def main():
     
     args = parser.parse_args()
     
-    orchestrator = CleanVotesOrchestrator(db_path=args.db_path)
+    if args.memory_limit and args.cleaner_backend != 'duckdb':
+        parser.error("--memory-limit requires --cleaner-backend duckdb")
+    if args.max_workers < 1:
+        parser.error("--max-workers must be at least 1")
+    
+    orchestrator = CleanVotesOrchestrator(
+        db_path=args.db_path,
+        csv_engine=args.csv_engine,
+        use_staging=not args.no_staging,
+        compact_dtypes=args.compact_dtypes,
+        cleaner_backend=args.cleaner_backend,
+        cleaner_options={'memory_limit': args.memory_limit} if args.memory_limit else None,
+        # One file merges each state's shapefile once, so there is nothing to reuse
+        geometry_cache=GeometryCache(max_entries=1)
+    )
     
     if args.list_elections:
         elections = orchestrator.list_available_elections()
@@ -429,10 +1158,15 @@ def main():
         save_to_db=not args.no_db,
         save_geojson=bool(args.geojson),
         geojson_output_path=args.geojson,
-        encoding=args.encoding
+        encoding=args.encoding,
+        streaming=args.streaming,
+        chunksize=args.chunksize,
+        entidad_ids=args.entidades,
+        max_workers=args.max_workers,
+        result_mode='summary'
     )
     
-    print(f"\n✓ Processing complete! Final shape: {result.shape}")
+    print(f"\n✓ Processing complete! Final shape: ({result['rows']}, {result['columns']})")
 
 
 if __name__ == '__main__':
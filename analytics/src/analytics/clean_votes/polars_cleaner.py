@@ -0,0 +1,283 @@
+"""
+Polars Electoral Data Cleaner
+=============================
+
+Polars backend for ElectoralDataCleaner.
+
+The whole section-level chain (exclude columns, coerce numerics, homogenize
+IDs, aggregate by ID_ENTIDAD and SECCION, carry LISTA_NOMINAL and the
+descriptive fields, compute totals and shares) is built as one LazyFrame
+query, so Polars optimizes it as a single multi-threaded plan.
+
+As in ElectoralDataCleaner._aggregate_sections, every output column is a
+per-section sum or a per-section first value, so the whole aggregation is a
+single group_by.
+"""
+
+import polars as pl
+import pandas as pd
+from typing import Dict, Iterable
+import logging
+
+from .cleaner import ElectoralDataCleaner
+
+logger = logging.getLogger(__name__)
+
+
+class PolarsElectoralDataCleaner(ElectoralDataCleaner):
+    """
+    ElectoralDataCleaner running clean() and clean_chunks() on Polars LazyFrames.
+    
+    Takes and returns pandas DataFrames, so it is a drop-in replacement for
+    ElectoralDataCleaner. Output matches the pandas path: same columns, order,
+    values and dtypes (vote columns are int64 when every casilla value is an
+    integer, float64 otherwise). Sums are bit-identical for integer counts,
+    which is what electoral files hold.
+    
+    clean_casillas() is inherited from the pandas implementation.
+    """
+    
+    # String parse of the ID columns, as in ElectoralDataCleaner._parse_id
+    ID_PATTERN = r'^-?[0-9]+$'
+    
+    def clean(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Main cleaning pipeline, run as a single Polars query plan.
+        
+        Args:
+            df: Raw electoral DataFrame
+        
+        Returns:
+            Cleaned and aggregated DataFrame by ENTIDAD and SECCION
+        """
+        logger.info(f"Starting Polars cleaning process. Input shape: {df.shape} "
+                    f"({pl.thread_pool_size()} threads)")
+        
+        frame = self._to_polars(df)
+        plan = self._plan(frame)
+        
+        sections, flags = pl.collect_all([
+            self._finalize(self._aggregate(plan), plan),
+            self._integral_flags(frame, plan),
+        ])
+        logger.info(f"Aggregated {len(sections)} sections")
+        
+        return self._to_pandas(sections, plan, self._read_flags(flags))
+    
+    def clean_chunks(self, chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Streaming cleaning pipeline for files read in chunks.
+        
+        Each chunk is reduced to per-section partial sums and first values by
+        the same query plan as clean(); the partials are then folded by a
+        second group_by. Peak memory depends on the number of sections rather
+        than the number of casillas.
+        
+        Args:
+            chunks: Iterable of raw electoral DataFrames sharing the same columns
+        
+        Returns:
+            Cleaned and aggregated DataFrame by ENTIDAD and SECCION
+        """
+        plan = None
+        partials = []
+        integral = {}
+        rows_in = 0
+        
+        for chunk_number, chunk in enumerate(chunks, start=1):
+            rows_in += len(chunk)
+            
+            frame = self._to_polars(chunk)
+            plan = self._plan(frame)
+            partial, flags = pl.collect_all([self._aggregate(plan), self._integral_flags(frame, plan)])
+            partials.append(partial)
+            
+            # A vote column stays integral only if it is integral in every chunk
+            for col, is_integral in self._read_flags(flags).items():
+                integral[col] = integral.get(col, True) and is_integral
+            
+            logger.info(f"Folded chunk {chunk_number} ({rows_in} rows so far)")
+        
+        if plan is None:
+            raise ValueError("No data chunks to clean")
+        
+        logger.info(f"Starting streaming aggregation finalize. Input rows: {rows_in}")
+        
+        sums = [pl.col(name).sum() for name in plan['sums'].values()]
+        firsts = [pl.col(name).first() for name in plan['firsts'].values()]
+        folded = (
+            pl.concat(partials, how='vertical_relaxed')
+            .lazy()
+            .group_by(self.KEY_COLUMNS)
+            .agg(sums + firsts)
+        )
+        sections = self._finalize(folded, plan).collect()
+        logger.info(f"Aggregated {len(sections)} sections")
+        
+        return self._to_pandas(sections, plan, integral)
+    
+    def _to_polars(self, df: pd.DataFrame) -> pl.DataFrame:
+        """Convert the columns the cleaner can use to a Polars DataFrame."""
+        columns = [
+            col for col in df.columns
+            if col not in self.columns_to_exclude
+            and (self.is_needed_column(col) or pd.api.types.is_numeric_dtype(df[col]))
+        ]
+        return pl.from_pandas(df[columns])
+    
+    def _plan(self, frame: pl.DataFrame) -> Dict:
+        """
+        Build the casilla-level cleaning plan for a frame.
+        
+        Mirrors ElectoralDataCleaner.clean(): columns with numeric-looking
+        names (and columns that are already numeric) are coerced and filled
+        with 0, ID columns are parsed to Int64 with a zero-padded _STR label.
+        
+        Returns:
+            Dict with the cleaned 'casillas' LazyFrame, the 'votes' columns,
+            and the output names of the summed ('sums') and first-value
+            ('firsts') columns
+        """
+        schema = frame.schema
+        expressions = []
+        
+        # Vote columns, in input order (as _get_vote_columns after _convert_numeric_columns)
+        votes = [
+            col for col in frame.columns
+            if (self._is_numeric_column_name(col) or schema[col].is_numeric())
+            and self._is_vote_column_name(col)
+        ]
+        for col in votes:
+            expressions.append(self._parse_number(col, schema[col]).alias(col))
+        
+        has_lista = 'LISTA_NOMINAL' in frame.columns
+        if has_lista:
+            expressions.append(self._parse_number('LISTA_NOMINAL', schema['LISTA_NOMINAL']).alias('LISTA_NOMINAL'))
+        else:
+            logger.warning("LISTA_NOMINAL column not found, skipping")
+            expressions.append(pl.lit(0.0).alias('LISTA_NOMINAL'))
+        
+        for col in ['ID_DISTRITO_FEDERAL', 'ID_ENTIDAD', 'SECCION']:
+            if col in frame.columns:
+                ids = self._parse_ids(col)
+                expressions.append(ids.alias(col))
+                expressions.append(ids.cast(pl.String).str.zfill(3).fill_null(str(pd.NA)).alias(f"{col}_STR"))
+        
+        # Descriptive columns not cleaned above are carried as text
+        columns = set(frame.columns) | {f"{col}_STR" for col in frame.columns}
+        descriptive = [col for col in self.DESCRIPTIVE_COLUMNS if col in columns]
+        for col in descriptive:
+            if col not in votes and not col.startswith('ID_') and not col.endswith('_STR'):
+                expressions.append(pl.col(col).cast(pl.String))
+        
+        # Like the pandas path, columns that are both votes and descriptive
+        # (DISTRITO_FEDERAL) come out as {col}_x (sum) and {col}_y (first)
+        overlap = set(votes) & set(descriptive)
+        sums = {col: f"{col}_x" if col in overlap else col for col in votes}
+        firsts = {col: f"{col}_y" if col in overlap else col for col in descriptive}
+        
+        return {
+            'casillas': frame.lazy().with_columns(expressions),
+            'votes': votes,
+            'sums': {'LISTA_NOMINAL': 'LISTA_NOMINAL', **sums},
+            'firsts': firsts,
+            'has_lista': has_lista,
+        }
+    
+    def _parse_number(self, col: str, dtype: pl.DataType) -> pl.Expr:
+        """Coerce a column to Float64 like pd.to_numeric(errors='coerce'), filling missing with 0."""
+        if dtype.is_numeric():
+            values = pl.col(col).cast(pl.Float64)
+        else:
+            values = pl.col(col).cast(pl.String).str.strip_chars().cast(pl.Float64, strict=False)
+        # when/then is cheaper than fill_nan here; NaN only comes from 'nan' text or float input
+        return pl.when(values.is_nan()).then(0.0).otherwise(values).fill_null(0.0)
+    
+    def _parse_ids(self, col: str) -> pl.Expr:
+        """Parse an ID column to Int64 (NA for anything but optionally negative digits)."""
+        text = pl.col(col).cast(pl.String).str.strip_chars()
+        return pl.when(text.str.contains(self.ID_PATTERN)).then(text.cast(pl.Int64, strict=False))
+    
+    def _integral_flags(self, frame: pl.DataFrame, plan: Dict) -> pl.LazyFrame:
+        """
+        One-row plan flagging the vote columns that pd.to_numeric would make int64.
+        
+        That is the case when every value parses as an integer (no missing,
+        fractional or unparseable values).
+        """
+        flags = []
+        for col in plan['votes']:
+            dtype = frame.schema[col]
+            if dtype.is_integer():
+                flag = pl.col(col).null_count() == 0
+            elif dtype.is_numeric():
+                flag = pl.lit(False)
+            else:
+                flag = pl.col(col).cast(pl.String).str.strip_chars().cast(pl.Int64, strict=False).null_count() == 0
+            flags.append(flag.alias(col))
+        
+        return frame.lazy().select(flags)
+    
+    @staticmethod
+    def _read_flags(flags: pl.DataFrame) -> Dict[str, bool]:
+        """Collected integral flags as a dict (empty when there are no vote columns)."""
+        return flags.row(0, named=True) if flags.width else {}
+    
+    def _aggregate(self, plan: Dict) -> pl.LazyFrame:
+        """Group casillas by section: sums of votes and LISTA_NOMINAL, first descriptive values."""
+        sums = [pl.col(col).sum().alias(name) for col, name in plan['sums'].items()]
+        firsts = [pl.col(col).first().alias(name) for col, name in plan['firsts'].items()]
+        
+        # first() follows row order within each group, like drop_duplicates in pandas
+        return plan['casillas'].group_by(self.KEY_COLUMNS).agg(sums + firsts)
+    
+    def _finalize(self, sections: pl.LazyFrame, plan: Dict) -> pl.LazyFrame:
+        """Sort sections like pandas groupby, add TOTAL_VOTOS_SUM and {party}_PCT, order columns."""
+        vote_names = [plan['sums'][col] for col in plan['votes']]
+        
+        total = pl.sum_horizontal(vote_names) if vote_names else pl.lit(0.0)
+        shares = [
+            pl.when(pl.col('TOTAL_VOTOS_SUM') > 0)
+            .then((pl.col(name) / pl.col('TOTAL_VOTOS_SUM')) * 100)
+            .otherwise(0.0)
+            .alias(f"{col}_PCT")
+            for col, name in zip(plan['votes'], vote_names)
+        ]
+        
+        sections = (
+            sections
+            .sort(self.KEY_COLUMNS, nulls_last=True)
+            .with_columns(total.alias('TOTAL_VOTOS_SUM'))
+            .with_columns(shares)
+            .select(
+                self.KEY_COLUMNS + ['LISTA_NOMINAL'] + vote_names + ['TOTAL_VOTOS_SUM']
+                + [f"{col}_PCT" for col in plan['votes']] + list(plan['firsts'].values())
+            )
+        )
+        
+        # Without LISTA_NOMINAL the pandas merge has no sections to start from
+        return sections if plan['has_lista'] else sections.clear()
+    
+    def _to_pandas(self, sections: pl.DataFrame, plan: Dict, integral: Dict[str, bool]) -> pd.DataFrame:
+        """Convert sections back to pandas with the dtypes of the pandas path, then drop null keys."""
+        # Integer vote sums are exact in Float64; restore the integer dtype
+        integer_columns = [plan['sums'][col] for col in plan['votes'] if integral.get(col)]
+        integer_columns += [plan['firsts'][col] for col in plan['votes'] if integral.get(col) and col in plan['firsts']]
+        if plan['votes'] and all(integral.get(col) for col in plan['votes']):
+            integer_columns.append('TOTAL_VOTOS_SUM')
+        sections = sections.with_columns(pl.col(integer_columns).cast(pl.Int64))
+        
+        df = sections.to_pandas()
+        for col in ['ID_ENTIDAD', 'SECCION', 'ID_DISTRITO_FEDERAL']:
+            if col in df.columns:
+                df[col] = df[col].astype('Int64')
+        
+        logger.info(f"Final merged dataset: {df.shape}")
+        
+        df = self._remove_null_rows(df)
+        logger.info(f"After removing nulls: {df.shape}")
+        
+        if self.dtype_profile is not None:
+            df = self.dtype_profile.apply(df)
+        
+        return df
@@ -3,17 +3,29 @@ Electoral Data Reader
 =====================
 
 Flexible reader for electoral data files with automatic header detection.
-Supports CSV, Excel, and Parquet formats.
+Supports CSV, Excel, and Parquet formats, including files stored inside
+.zip/.7z archives (see archives.py).
 """
 
+import codecs
+import csv
+import numpy as np
 import pandas as pd
 from io import StringIO
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict, Any, Iterator, Callable
 import logging
 
+from .archives import open_source, read_source_head, source_exists
+
 logger = logging.getLogger(__name__)
 
+# Column projection: called with each raw column name, True to keep the column
+ColumnFilter = Callable[[str], bool]
+
+# Row filter in PyArrow's DNF form, e.g. [('ID_ENTIDAD', 'in', [9, 26])]
+RowFilter = List[Tuple[str, str, Any]]
+
 
 class ElectoralDataReader:
     """
@@ -30,23 +42,70 @@ class ElectoralDataReader:
         'TIPO_CASILLA'
     ]
     
-    def __init__(self, header_indicators: Optional[List[str]] = None):
+    # Rows per chunk when streaming large files
+    DEFAULT_CHUNKSIZE = 200_000
+    
+    # CSV parse engines: single-threaded pandas or multithreaded PyArrow
+    CSV_ENGINES = ['pandas', 'pyarrow']
+    
+    # Bytes handed to each PyArrow parser thread
+    ARROW_BLOCK_SIZE = 16 * 1024 * 1024
+    
+    # Bytes read from the start of a CSV to find the header and encoding
+    SAMPLE_SIZE = 1024 * 1024
+    
+    # Encoding used when a file is not valid UTF-8 (decodes any byte sequence)
+    FALLBACK_ENCODING = 'latin-1'
+    
+    # Excel cell strings read as missing (pandas' default na_values)
+    EXCEL_NA_VALUES = [
+        '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+        '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+        'n/a', 'nan', 'null',
+    ]
+    
+    def __init__(
+        self,
+        header_indicators: Optional[List[str]] = None,
+        csv_engine: str = 'pandas'
+    ):
         """
         Initialize the reader.
         
         Args:
             header_indicators: List of column names that indicate the header row.
                              If None, uses default HEADER_INDICATORS.
+            csv_engine: CSV parse engine ('pandas' or 'pyarrow'). 'pyarrow' parses
+                       blocks of the file in parallel across all cores.
         """
+        if csv_engine not in self.CSV_ENGINES:
+            raise ValueError(f"Invalid csv_engine: {csv_engine}. Must be one of {self.CSV_ENGINES}.")
+        
         self.header_indicators = header_indicators or self.HEADER_INDICATORS
+        self.csv_engine = csv_engine
+        
+        # Encoding the last CSV file was actually read with
+        self.last_encoding: Optional[str] = None
     
-    def read_file(self, file_path: str, encoding: str = 'utf-8') -> pd.DataFrame:
+    def read_file(
+        self,
+        file_path: str,
+        encoding: Optional[str] = None,
+        usecols: Optional[ColumnFilter] = None,
+        filters: Optional[RowFilter] = None
+    ) -> pd.DataFrame:
         """
         Read electoral data from a file with automatic format detection.
         
         Args:
-            file_path: Path to the data file
-            encoding: File encoding (default: utf-8)
+            file_path: Path to the data file. Files inside an archive are
+                      addressed as 'bundle.zip/member.csv'.
+            encoding: File encoding. If None, it is detected from the
+                     header sample (see detect_encoding).
+            usecols: Optional column projection. Called with each raw column
+                    name; columns for which it returns False are never parsed.
+            filters: Optional row filter, Parquet only. Row groups whose
+                    statistics cannot match are never read.
             
         Returns:
             DataFrame with electoral data
@@ -56,23 +115,166 @@ class ElectoralDataReader:
         """
         path = Path(file_path)
         
-        if not path.exists():
+        if not source_exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
         suffix = path.suffix.lower()
         
         logger.info(f"Reading file: {file_path}")
         
+        self.last_encoding = None
+        self._check_filters(suffix, filters)
+        
         if suffix == '.csv':
-            return self._read_csv(file_path, encoding)
+            return self._read_csv(file_path, encoding, usecols)
         elif suffix in ['.xlsx', '.xls']:
-            return self._read_excel(file_path)
+            return self._read_excel(file_path, usecols)
         elif suffix == '.parquet':
-            return self._read_parquet(file_path)
+            return self._read_parquet(file_path, usecols, filters)
         else:
             raise ValueError(f"Unsupported file format: {suffix}")
     
-    def _read_csv(self, file_path: str, encoding: str) -> pd.DataFrame:
+    def read_file_chunks(
+        self,
+        file_path: str,
+        encoding: Optional[str] = None,
+        chunksize: Optional[int] = None,
+        usecols: Optional[ColumnFilter] = None,
+        filters: Optional[RowFilter] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Read electoral data from a file as an iterator of DataFrame chunks.
+        
+        Files are streamed in bounded chunks so the whole file never has to
+        be held in memory. Legacy .xls workbooks are decoded in full before
+        their rows are chunked.
+        
+        Args:
+            file_path: Path to the data file. Files inside an archive are
+                      addressed as 'bundle.zip/member.csv'.
+            encoding: File encoding. If None, it is detected from the
+                     header sample (see detect_encoding).
+            chunksize: Rows per chunk (default: DEFAULT_CHUNKSIZE)
+            usecols: Optional column projection (see read_file)
+            filters: Optional row filter, Parquet only (see read_file)
+            
+        Returns:
+            Iterator of DataFrames with the same columns as read_file()
+            
+        Raises:
+            ValueError: If file format is not supported
+        """
+        path = Path(file_path)
+        
+        if not source_exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        suffix = path.suffix.lower()
+        chunksize = chunksize or self.DEFAULT_CHUNKSIZE
+        
+        logger.info(f"Streaming file in chunks of {chunksize} rows: {file_path}")
+        
+        self.last_encoding = None
+        self._check_filters(suffix, filters)
+        
+        if suffix == '.csv':
+            return self._iter_csv_chunks(file_path, encoding, chunksize, usecols)
+        elif suffix in ['.xlsx', '.xls']:
+            return self._iter_excel_chunks(file_path, chunksize, usecols)
+        elif suffix == '.parquet':
+            return self._iter_parquet_chunks(file_path, chunksize, usecols, filters)
+        else:
+            raise ValueError(f"Unsupported file format: {suffix}")
+    
+    def _check_filters(self, suffix: str, filters: Optional[RowFilter]):
+        """Reject row filters for formats that cannot apply them at read time."""
+        if filters is not None and suffix != '.parquet':
+            raise ValueError(f"Row filters are only supported for Parquet files, not {suffix}")
+    
+    def detect_encoding(self, file_path: str) -> str:
+        """
+        Detect the encoding of a CSV file from its first SAMPLE_SIZE bytes.
+        
+        Args:
+            file_path: Path to CSV file
+        
+        Returns:
+            'utf-8' if the sample is valid UTF-8, otherwise FALLBACK_ENCODING
+        """
+        return self._detect_sample_encoding(read_source_head(file_path, self.SAMPLE_SIZE))
+    
+    def sniff_csv(
+        self,
+        file_path: str,
+        encoding: Optional[str] = None
+    ) -> Tuple[Optional[int], Optional[str], str, str]:
+        """
+        Find the header row, delimiter and encoding from the first
+        SAMPLE_SIZE bytes of a CSV file.
+        
+        The sample is read once as bytes; when no encoding is given it is
+        detected from those bytes before decoding, so a non-UTF-8 file is
+        parsed with the right codec on the first attempt.
+        
+        Args:
+            file_path: Path to CSV file
+            encoding: File encoding, or None to detect it from the sample
+        
+        Returns:
+            Tuple of (header_row, delimiter, header_line, encoding).
+            header_row and delimiter are None if no header was found, in
+            which case header_line is the first line of the file.
+        
+        Raises:
+            UnicodeDecodeError: If the sample is not valid in the given encoding
+        """
+        # Read first 1MB to find header (much faster for large files)
+        raw_sample = read_source_head(file_path, self.SAMPLE_SIZE)
+        
+        if encoding is None:
+            encoding = self._detect_sample_encoding(raw_sample)
+        logger.info(f"Using encoding: {encoding}")
+        
+        # Decode incrementally so a character cut off at the end of the sample is dropped
+        sample = codecs.getincrementaldecoder(encoding)().decode(raw_sample, final=False)
+        # Split on any line terminator type (\n, \r\n, \r)
+        sample_lines = sample.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        
+        header_row = self._find_header_row(sample_lines)
+        
+        if header_row is None:
+            return None, None, sample_lines[0], encoding
+        
+        # Detect delimiter from header line
+        header_line = sample_lines[header_row]
+        return header_row, self._detect_delimiter(header_line), header_line, encoding
+    
+    def _detect_sample_encoding(self, raw_sample: bytes) -> str:
+        """
+        Pick the encoding for a file from the raw bytes of its header sample.
+        
+        The sample is decoded incrementally so a multi-byte character cut
+        off at the end of the sample is not mistaken for invalid UTF-8.
+        
+        Args:
+            raw_sample: First bytes of the file
+        
+        Returns:
+            'utf-8' or FALLBACK_ENCODING
+        """
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(raw_sample, final=False)
+        except UnicodeDecodeError:
+            logger.info(f"Sample is not valid UTF-8, using {self.FALLBACK_ENCODING}")
+            return self.FALLBACK_ENCODING
+        return 'utf-8'
+    
+    def _read_csv(
+        self,
+        file_path: str,
+        encoding: Optional[str],
+        usecols: Optional[ColumnFilter] = None
+    ) -> pd.DataFrame:
         """
         Read CSV file with flexible header detection and delimiter detection.
         
@@ -80,106 +282,629 @@ class ElectoralDataReader:
         
         Args:
             file_path: Path to CSV file
-            encoding: File encoding
-            
+            encoding: File encoding, or None to detect it from the header sample
+            usecols: Optional column projection
+        
         Returns:
             DataFrame with electoral data
         """
+        if self.csv_engine == 'pyarrow':
+            return self._read_csv_arrow(file_path, encoding, usecols)
+        
         try:
-            # First, try reading the file to find the header row
-            # Handle different line terminators (\n, \r\n, \r) by using pandas' lineterminator param
-            # Read sample to find header and delimiter
-            with open(file_path, encoding=encoding, newline='') as f:
-                # Read first 1MB to find header (much faster for large files)
-                sample = f.read(1024 * 1024)  # 1MB sample
-                # Split on any line terminator type
-                sample_lines = sample.replace('\r\n', '\n').replace('\r', '\n').split('\n')
-            
-            header_row = self._find_header_row(sample_lines)
-            
-            if header_row is None:
-                logger.warning(
-                    f"Could not find header row with indicators {self.header_indicators}. "
-                    "Assuming data starts from first row."
-                )
-                # Try reading with pandas (it handles \r automatically)
-                return pd.read_csv(file_path, encoding=encoding, dtype=str, lineterminator='\r')
-            
-            logger.info(f"Found header at line {header_row}")
-            
-            # Detect delimiter from header line
-            delimiter = self._detect_delimiter(sample_lines[header_row])
-            logger.info(f"Detected delimiter: {repr(delimiter)}")
+            read_kwargs = self._csv_read_kwargs(file_path, encoding, usecols)
             
             # Use pandas to read directly with lineterminator='\r' for CR-only files
             # This is MUCH faster than reading entire file into memory
-            df = pd.read_csv(
-                file_path, 
-                sep=delimiter, 
-                dtype=str, 
-                encoding=encoding,
-                skiprows=header_row,
-                lineterminator='\r',  # Handle CR line terminators
-                on_bad_lines='skip'  # Skip any malformed lines
-            )
-            
-            # Clean up empty columns (sometimes pipe-delimited files have trailing pipes)
-            empty_cols = [col for col in df.columns if str(col).strip() == '']
-            if empty_cols:
-                df = df.drop(columns=empty_cols)
-                logger.info(f"Removed {len(empty_cols)} empty columns")
+            with open_source(file_path) as source:
+                df = pd.read_csv(source, **read_kwargs)
+            df = self._drop_empty_columns(df)
             
+            self.last_encoding = read_kwargs['encoding']
             logger.info(f"Successfully read {len(df)} rows and {len(df.columns)} columns")
             return df
-            
+        
         except UnicodeDecodeError:
-            logger.warning(f"Failed with encoding {encoding}, trying latin-1")
-            return self._read_csv(file_path, encoding='latin-1')
+            # Only reached when the file stops being UTF-8 after the header sample
+            logger.warning(f"Failed with encoding {encoding or 'utf-8'}, trying {self.FALLBACK_ENCODING}")
+            return self._read_csv(file_path, self.FALLBACK_ENCODING, usecols)
     
-    def _read_excel(self, file_path: str) -> pd.DataFrame:
+    def _iter_csv_chunks(
+        self,
+        file_path: str,
+        encoding: Optional[str],
+        chunksize: int,
+        usecols: Optional[ColumnFilter] = None
+    ) -> Iterator[pd.DataFrame]:
         """
-        Read Excel file.
+        Stream a CSV file in chunks using the same parsing options as _read_csv.
+        
+        Falls back to FALLBACK_ENCODING if decoding fails before the first
+        chunk is produced. A decoding error further into the file is
+        re-raised, since chunks already handed to the caller cannot be taken back.
         
         Args:
-            file_path: Path to Excel file
+            file_path: Path to CSV file
+            encoding: File encoding, or None to detect it from the header sample
+            chunksize: Rows per chunk
+            usecols: Optional column projection
+        
+        Yields:
+            DataFrame chunks with electoral data
+        """
+        if self.csv_engine == 'pyarrow':
+            yield from self._iter_csv_chunks_arrow(file_path, encoding, chunksize, usecols)
+            return
+        
+        rows_read = 0
+        try:
+            read_kwargs = self._csv_read_kwargs(file_path, encoding, usecols)
+            self.last_encoding = read_kwargs['encoding']
+            with open_source(file_path) as source, pd.read_csv(source, chunksize=chunksize, **read_kwargs) as chunks:
+                for chunk in chunks:
+                    rows_read += len(chunk)
+                    yield self._drop_empty_columns(chunk)
+        except UnicodeDecodeError:
+            if rows_read > 0:
+                raise
+            logger.warning(f"Failed with encoding {encoding or 'utf-8'}, trying {self.FALLBACK_ENCODING}")
+            yield from self._iter_csv_chunks(file_path, self.FALLBACK_ENCODING, chunksize, usecols)
+            return
+        
+        logger.info(f"Successfully streamed {rows_read} rows")
+    
+    def _csv_read_kwargs(
+        self,
+        file_path: str,
+        encoding: Optional[str],
+        usecols: Optional[ColumnFilter] = None
+    ) -> Dict[str, Any]:
+        """
+        Build pd.read_csv options for a CSV file from its header sample.
+        
+        Args:
+            file_path: Path to CSV file
+            encoding: File encoding, or None to detect it from the header sample
+            usecols: Optional column projection
+        
+        Returns:
+            Keyword arguments for pd.read_csv, including the resolved encoding
+        """
+        header_row, delimiter, header_line, encoding = self.sniff_csv(file_path, encoding)
+        
+        if header_row is None:
+            logger.warning(
+                f"Could not find header row with indicators {self.header_indicators}. "
+                "Assuming data starts from first row."
+            )
+            read_kwargs = {
+                'sep': self._detect_delimiter(header_line),
+                'encoding': encoding,
+                'dtype': str,
+                'lineterminator': '\r'
+            }
+        else:
+            logger.info(f"Found header at line {header_row}")
+            logger.info(f"Detected delimiter: {repr(delimiter)}")
             
+            read_kwargs = {
+                'sep': delimiter,
+                'dtype': str,
+                'encoding': encoding,
+                'skiprows': header_row,
+                'lineterminator': '\r',  # Handle CR line terminators
+                'on_bad_lines': 'skip'  # Skip any malformed lines
+            }
+        
+        if usecols is not None:
+            read_kwargs['usecols'] = usecols
+        
+        return read_kwargs
+    
+    def _read_csv_arrow(
+        self,
+        file_path: str,
+        encoding: Optional[str],
+        usecols: Optional[ColumnFilter] = None
+    ) -> pd.DataFrame:
+        """
+        Read CSV file with PyArrow's multithreaded parser.
+        
+        Uses the same header row and delimiter detection as the pandas engine.
+        PyArrow recognizes CR, LF and CRLF line terminators natively.
+        
+        Args:
+            file_path: Path to CSV file
+            encoding: File encoding, or None to detect it from the header sample
+            usecols: Optional column projection
+        
         Returns:
-            DataFrame with electoral data
+            DataFrame with electoral data (all columns as strings)
+        """
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+        
+        try:
+            read_options, parse_options, convert_options, short_rows = self._arrow_csv_options(
+                file_path, encoding, usecols
+            )
+            with open_source(file_path) as source:
+                table = pa_csv.read_csv(
+                    source,
+                    read_options=read_options,
+                    parse_options=parse_options,
+                    convert_options=convert_options
+                )
+            if short_rows.rows:
+                table = pa.concat_tables([table, short_rows.take_table(table.column_names)])
+        except (UnicodeDecodeError, pa.ArrowInvalid) as e:
+            if encoding == self.FALLBACK_ENCODING or not self._is_decode_error(e):
+                raise
+            logger.warning(f"Failed with encoding {encoding or 'utf-8'} ({e}), trying {self.FALLBACK_ENCODING}")
+            return self._read_csv_arrow(file_path, self.FALLBACK_ENCODING, usecols)
+        
+        df = self._drop_empty_columns(table.to_pandas())
+        
+        self.last_encoding = read_options.encoding
+        logger.info(f"Successfully read {len(df)} rows and {len(df.columns)} columns")
+        return df
+    
+    def _iter_csv_chunks_arrow(
+        self,
+        file_path: str,
+        encoding: Optional[str],
+        chunksize: int,
+        usecols: Optional[ColumnFilter] = None
+    ) -> Iterator[pd.DataFrame]:
         """
-        # Read entire file first to find header
-        df_temp = pd.read_excel(file_path, header=None, dtype=str)
+        Stream a CSV file with PyArrow's incremental reader.
         
-        header_row = None
-        for idx, row in df_temp.iterrows():
-            row_values = row.astype(str).str.upper()
-            if any(indicator.upper() in ' '.join(row_values) for indicator in self.header_indicators):
-                header_row = idx
-                break
+        Record batches are regrouped so every chunk except the last has
+        exactly chunksize rows, matching the pandas engine.
+        
+        Args:
+            file_path: Path to CSV file
+            encoding: File encoding, or None to detect it from the header sample
+            chunksize: Rows per chunk
+            usecols: Optional column projection
+        
+        Yields:
+            DataFrame chunks with electoral data
+        """
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+        
+        rows_read = 0
+        pending = []
+        pending_rows = 0
+        try:
+            read_options, parse_options, convert_options, short_rows = self._arrow_csv_options(
+                file_path, encoding, usecols
+            )
+            self.last_encoding = read_options.encoding
+            with open_source(file_path) as source:
+                stream = pa_csv.open_csv(
+                    source,
+                    read_options=read_options,
+                    parse_options=parse_options,
+                    convert_options=convert_options
+                )
+                for batch in stream:
+                    pending.append(batch)
+                    pending_rows += batch.num_rows
+                    if short_rows.rows:
+                        padded = short_rows.take_table(batch.schema.names)
+                        pending.extend(padded.to_batches())
+                        pending_rows += padded.num_rows
+                    while pending_rows >= chunksize:
+                        table = pa.Table.from_batches(pending)
+                        chunk, rest = table.slice(0, chunksize), table.slice(chunksize)
+                        pending, pending_rows = rest.to_batches(), rest.num_rows
+                        rows_read += chunk.num_rows
+                        yield self._drop_empty_columns(chunk.to_pandas())
+        except (UnicodeDecodeError, pa.ArrowInvalid) as e:
+            if rows_read > 0 or encoding == self.FALLBACK_ENCODING or not self._is_decode_error(e):
+                raise
+            logger.warning(f"Failed with encoding {encoding or 'utf-8'} ({e}), trying {self.FALLBACK_ENCODING}")
+            yield from self._iter_csv_chunks_arrow(file_path, self.FALLBACK_ENCODING, chunksize, usecols)
+            return
+        
+        if pending_rows > 0:
+            rows_read += pending_rows
+            yield self._drop_empty_columns(pa.Table.from_batches(pending).to_pandas())
+        
+        logger.info(f"Successfully streamed {rows_read} rows")
+    
+    @staticmethod
+    def _is_decode_error(error: Exception) -> bool:
+        """
+        Check whether a CSV read failed because of the text encoding.
+        
+        PyArrow validates UTF-8 itself and reports bad bytes as ArrowInvalid
+        ("invalid UTF8 data"); other ArrowInvalid errors (wrong column count,
+        malformed quotes) are real CSV errors and must not be retried.
+        """
+        return isinstance(error, UnicodeDecodeError) or 'invalid utf8' in str(error).lower()
+    
+    def _arrow_csv_options(
+        self,
+        file_path: str,
+        encoding: Optional[str],
+        usecols: Optional[ColumnFilter] = None
+    ) -> Tuple[Any, Any, Any, '_ShortRows']:
+        """
+        Build PyArrow CSV read/parse/convert options from the header sample.
+        
+        Every column is read as a string, like dtype=str in the pandas engine.
+        Rows with too many fields are skipped like on_bad_lines='skip'. PyArrow
+        cannot pad rows with too few fields, so they are collected instead
+        and padded with nulls by the caller, as pandas pads them with NaN.
+        
+        Args:
+            file_path: Path to CSV file
+            encoding: File encoding, or None to detect it from the header sample
+            usecols: Optional column projection
+        
+        Returns:
+            Tuple of (ReadOptions, ParseOptions, ConvertOptions, _ShortRows).
+            ReadOptions carries the resolved encoding.
+        """
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+        
+        header_row, delimiter, header_line, encoding = self.sniff_csv(file_path, encoding)
         
         if header_row is None:
-            logger.warning("Could not find header row, assuming first row is header")
-            return pd.read_excel(file_path, dtype=str)
+            logger.warning(
+                f"Could not find header row with indicators {self.header_indicators}. "
+                "Assuming data starts from first row."
+            )
+            header_row, delimiter = 0, self._detect_delimiter(header_line)
+        else:
+            logger.info(f"Found header at line {header_row}")
+            logger.info(f"Detected delimiter: {repr(delimiter)}")
+        
+        column_names = next(csv.reader([header_line], delimiter=delimiter)) if header_line else []
+        short_rows = _ShortRows(column_names, delimiter)
+        
+        read_options = pa_csv.ReadOptions(
+            skip_rows=header_row,
+            encoding=encoding,
+            use_threads=True,
+            block_size=self.ARROW_BLOCK_SIZE
+        )
+        parse_options = pa_csv.ParseOptions(
+            delimiter=delimiter,
+            invalid_row_handler=short_rows.handle
+        )
+        convert_options = pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in column_names},
+            strings_can_be_null=True
+        )
+        if usecols is not None:
+            convert_options.include_columns = [name for name in column_names if usecols(name)]
+        short_rows.null_values = set(convert_options.null_values)
+        
+        return read_options, parse_options, convert_options, short_rows
+    
+    def _drop_empty_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Remove unnamed empty columns (pipe-delimited files often have trailing pipes).
+        
+        Args:
+            df: DataFrame read from CSV
+            
+        Returns:
+            DataFrame without empty-named columns
+        """
+        empty_cols = [col for col in df.columns if str(col).strip() == '']
+        if empty_cols:
+            df = df.drop(columns=empty_cols)
+            logger.debug(f"Removed {len(empty_cols)} empty columns")
+        return df
+    
+    def _read_excel(self, file_path: str, usecols: Optional[ColumnFilter] = None) -> pd.DataFrame:
+        """
+        Read Excel file in a single pass.
+        
+        The chunks of _iter_excel_chunks are concatenated, so the workbook is
+        only decoded once instead of once for header detection and again for
+        the data.
+        
+        Args:
+            file_path: Path to Excel file
+            usecols: Optional column projection (applied once the header is known)
+            
+        Returns:
+            DataFrame with electoral data
+        """
+        chunks = list(self._iter_excel_chunks(file_path, self.DEFAULT_CHUNKSIZE, usecols))
+        if not chunks:
+            return pd.DataFrame()
         
-        logger.info(f"Found header at row {header_row}")
-        df = pd.read_excel(file_path, header=header_row, dtype=str)
+        df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
         
         logger.info(f"Successfully read {len(df)} rows and {len(df.columns)} columns")
         return df
     
-    def _read_parquet(self, file_path: str) -> pd.DataFrame:
+    def _iter_excel_chunks(
+        self,
+        file_path: str,
+        chunksize: int,
+        usecols: Optional[ColumnFilter] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream an Excel file in chunks.
+        
+        Rows of the first worksheet are streamed and the header row is detected
+        on the fly; rows above it are discarded as soon as it is found. Data
+        rows are gathered into chunks of chunksize rows, each converted with the
+        same rules as pd.read_excel(dtype=str). Trailing empty rows are dropped.
+        
+        Args:
+            file_path: Path to Excel file
+            chunksize: Rows per chunk
+            usecols: Optional column projection (applied once the header is known)
+            
+        Yields:
+            DataFrame chunks with electoral data
+        """
+        header = None
+        preamble = []
+        blank_rows = []
+        rows = []
+        yielded = False
+        
+        for row_number, row in enumerate(self._iter_excel_rows(file_path)):
+            if header is None:
+                if self._is_excel_header_row(row):
+                    logger.info(f"Found header at row {row_number}")
+                    header = row
+                    preamble = []
+                else:
+                    preamble.append(row)
+                continue
+            
+            # Empty rows are only kept when more data follows them
+            if not row:
+                blank_rows.append(row)
+                continue
+            rows.extend(blank_rows)
+            blank_rows = []
+            rows.append(row)
+            
+            if len(rows) >= chunksize:
+                yield self._excel_rows_to_frame(header, rows, usecols)
+                yielded = True
+                rows = []
+        
+        if header is None:
+            # No header row: the whole sheet was held back as preamble
+            while preamble and not preamble[-1]:
+                preamble.pop()
+            if not preamble:
+                logger.warning("Excel file has no data")
+                return
+            logger.warning("Could not find header row, assuming first row is header")
+            header, rows = preamble[0], preamble[1:]
+            while len(rows) > chunksize:
+                yield self._excel_rows_to_frame(header, rows[:chunksize], usecols)
+                yielded = True
+                rows = rows[chunksize:]
+        
+        if rows or not yielded:
+            yield self._excel_rows_to_frame(header, rows, usecols)
+    
+    def _excel_rows_to_frame(
+        self,
+        header: List[Any],
+        rows: List[List[Any]],
+        usecols: Optional[ColumnFilter] = None
+    ) -> pd.DataFrame:
+        """
+        Build a DataFrame of strings from Excel rows below the header.
+        
+        Columns are named as pd.read_excel names them: empty header cells
+        become 'Unnamed: {position}' and repeated names get a '.{n}' suffix.
+        Empty cells and pandas' default NA strings become NaN; every other
+        value is converted to str.
+        
+        Args:
+            header: Header row values
+            rows: Data rows (may be shorter than the header)
+            usecols: Optional column projection
+            
+        Returns:
+            DataFrame with one object column per kept header position
+        """
+        width = max([len(header)] + [len(row) for row in rows])
+        names = self._excel_column_names(header, width)
+        positions = [i for i, name in enumerate(names) if usecols is None or usecols(name)]
+        
+        frame = pd.DataFrame(rows, dtype=object)
+        frame = frame.reindex(columns=positions)
+        frame.columns = [names[i] for i in positions]
+        
+        missing = frame.isna() | frame.isin(self.EXCEL_NA_VALUES)
+        return frame.astype(str).mask(missing)
+    
+    @staticmethod
+    def _excel_column_names(header: List[Any], width: int) -> List[str]:
+        """Name width columns after the header row, the way pd.read_excel does."""
+        names = []
+        seen: Dict[str, int] = {}
+        for position in range(width):
+            value = header[position] if position < len(header) else ''
+            name = f'Unnamed: {position}' if pd.isna(value) or value == '' else str(value)
+            if name in seen:
+                seen[name] += 1
+                name = f'{name}.{seen[name]}'
+            else:
+                seen[name] = 0
+            names.append(name)
+        return names
+    
+    def _iter_excel_rows(self, file_path: str) -> Iterator[List[Any]]:
+        """
+        Stream the cell values of the first worksheet, row by row.
+        
+        .xlsx files are streamed with openpyxl in read-only mode. Legacy .xls
+        files cannot be streamed and are parsed once without a header.
+        Trailing empty cells are trimmed from each row.
+        
+        Args:
+            file_path: Path to Excel file
+            
+        Yields:
+            List of cell values per row ('' for empty cells)
+        """
+        if Path(file_path).suffix.lower() == '.xls':
+            with open_source(file_path) as source:
+                df_raw = pd.read_excel(source, header=None, dtype=object, na_filter=False)
+            for row in df_raw.itertuples(index=False, name=None):
+                yield self._trim_excel_row(list(row))
+            return
+        
+        from openpyxl import load_workbook
+        
+        with open_source(file_path) as source:
+            workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+            try:
+                sheet = workbook.worksheets[0]
+                sheet.reset_dimensions()
+                for row in sheet.iter_rows(values_only=True):
+                    yield self._trim_excel_row([self._convert_excel_value(value) for value in row])
+            finally:
+                workbook.close()
+    
+    @staticmethod
+    def _convert_excel_value(value: Any) -> Any:
+        """Convert an openpyxl cell value the same way pandas does."""
+        from openpyxl.cell.cell import ERROR_CODES
+        
+        if value is None:
+            return ''
+        elif isinstance(value, str) and value in ERROR_CODES:
+            return np.nan
+        elif isinstance(value, float) and value.is_integer():
+            # Whole numbers stored as floats become ints ("12" not "12.0")
+            return int(value)
+        
+        return value
+    
+    @staticmethod
+    def _trim_excel_row(row: List[Any]) -> List[Any]:
+        """Remove trailing empty cells from a row."""
+        while row and row[-1] == '':
+            row.pop()
+        return row
+    
+    def _is_excel_header_row(self, row: List[Any]) -> bool:
+        """Check whether a row of Excel cell values contains a header indicator."""
+        row_text = ' '.join(str(value) for value in row).upper()
+        return any(indicator.upper() in row_text for indicator in self.header_indicators)
+    
+    def _read_parquet(
+        self,
+        file_path: str,
+        usecols: Optional[ColumnFilter] = None,
+        filters: Optional[RowFilter] = None
+    ) -> pd.DataFrame:
         """
         Read Parquet file.
         
         Args:
             file_path: Path to Parquet file
+            usecols: Optional column projection
+            filters: Optional row filter pushed down to the row groups
             
         Returns:
             DataFrame with electoral data
         """
-        df = pd.read_parquet(file_path)
+        columns = self._parquet_columns(file_path, usecols)
+        with open_source(file_path) as source:
+            df = pd.read_parquet(source, columns=columns, filters=filters)
         logger.info(f"Successfully read {len(df)} rows and {len(df.columns)} columns")
         return df
     
+    def _iter_parquet_chunks(
+        self,
+        file_path: str,
+        chunksize: int,
+        usecols: Optional[ColumnFilter] = None,
+        filters: Optional[RowFilter] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream a Parquet file in record batches.
+        
+        Args:
+            file_path: Path to Parquet file
+            chunksize: Rows per batch
+            usecols: Optional column projection
+            filters: Optional row filter pushed down to the row groups
+            
+        Yields:
+            DataFrame chunks with electoral data
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+        
+        columns = self._parquet_columns(file_path, usecols)
+        
+        with open_source(file_path) as source:
+            if filters is None:
+                batches = pq.ParquetFile(source).iter_batches(batch_size=chunksize, columns=columns)
+            else:
+                if isinstance(source, str):
+                    source = pa.memory_map(source)
+                batches = ds.ParquetFileFormat().make_fragment(source).to_batches(
+                    columns=columns,
+                    filter=pq.filters_to_expression(filters),
+                    batch_size=chunksize
+                )
+            
+            for batch in batches:
+                if batch.num_rows > 0:
+                    yield batch.to_pandas()
+    
+    def _parquet_columns(self, file_path: str, usecols: Optional[ColumnFilter]) -> Optional[List[str]]:
+        """
+        Resolve a column projection against a Parquet schema.
+        
+        Columns stored with a numeric type are always kept: unlike CSV text,
+        typed numeric columns are treated as vote columns by the cleaner
+        whatever their name. Internal columns ('__' prefix, such as the
+        pandas index or the staging partition key) are never read.
+        
+        Args:
+            file_path: Path to Parquet file
+            usecols: Optional column projection
+            
+        Returns:
+            List of columns to read, or None to read all columns
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        with open_source(file_path) as source:
+            schema = pq.read_schema(source)
+        internal = [name for name in schema.names if name.startswith('__')]
+        
+        if usecols is None and not internal:
+            return None
+        
+        return [
+            field.name for field in schema
+            if field.name not in internal
+            and (
+                usecols is None
+                or usecols(field.name)
+                or pa.types.is_integer(field.type)
+                or pa.types.is_floating(field.type)
+            )
+        ]
+    
     def _find_header_row(self, lines: List[str]) -> Optional[int]:
         """
         Find the row index that contains the header.
@@ -216,3 +941,53 @@ class ElectoralDataReader:
         # Default to comma (2024)
         return ','
 
+
+class _ShortRows:
+    """
+    PyArrow invalid-row handler keeping rows with too few fields.
+    
+    Rows with too many fields are skipped (pandas' on_bad_lines='skip');
+    short rows are kept as text and turned into null-padded rows, as pandas
+    pads them with NaN, so both CSV engines give the same rows. The parallel
+    parser does not report where a row was, so padded rows are appended
+    after the rows parsed with them: sums are the same, row order is not.
+    """
+    
+    def __init__(self, column_names: List[str], delimiter: str):
+        self.column_names = column_names
+        self.delimiter = delimiter
+        self.null_values = {''}
+        self.rows: List[str] = []
+    
+    def handle(self, row) -> str:
+        """Collect short rows; every invalid row is skipped by the parser itself."""
+        if row.actual_columns < row.expected_columns:
+            self.rows.append(row.text)
+        return 'skip'
+    
+    def take_table(self, names: List[str]) -> Any:
+        """
+        Turn the collected rows into a table and forget them.
+        
+        Args:
+            names: Columns of the parsed table (after projection)
+        
+        Returns:
+            pyarrow.Table of string columns, missing fields as nulls
+        """
+        import pyarrow as pa
+        
+        rows, self.rows = self.rows, []
+        index = {}
+        for position, name in enumerate(self.column_names):
+            index.setdefault(name, position)
+        
+        fields = [next(csv.reader([text], delimiter=self.delimiter), []) for text in rows]
+        columns = {}
+        for name in names:
+            position = index[name]
+            columns[name] = pa.array([
+                row[position] if position < len(row) and row[position] not in self.null_values else None
+                for row in fields
+            ], type=pa.string())
+        return pa.table(columns)
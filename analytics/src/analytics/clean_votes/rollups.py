@@ -0,0 +1,124 @@
+"""
+Section Rollups
+===============
+
+Aggregates cleaned section-level results to municipio, distrito federal and
+entidad level.
+
+Counts (LISTA_NOMINAL, votes, TOTAL_VOTOS_SUM) are summed and shares are
+recomputed from the sums, so {party}_PCT is vote-weighted: a party's share of
+all votes cast in the area, not the mean of its section shares.
+"""
+
+import pandas as pd
+from typing import Dict, List, Optional
+import logging
+
+from .cleaner import add_vote_shares
+from .dtypes import CompactDtypeProfile
+
+logger = logging.getLogger(__name__)
+
+
+class SectionRollup:
+    """
+    Builds higher-level rollups from a section-level electoral DataFrame.
+    """
+    
+    # Grouping keys per rollup level. MUNICIPIO comes from the SECCION
+    # shapefile attributes, so that level needs the geometry merge.
+    LEVELS = {
+        'entidad': ['ID_ENTIDAD'],
+        'distrito': ['ID_ENTIDAD', 'ID_DISTRITO_FEDERAL'],
+        'municipio': ['ID_ENTIDAD', 'MUNICIPIO'],
+    }
+    
+    # Label columns carried over from the first section of each group
+    LABEL_COLUMNS = ['ENTIDAD']
+    
+    def __init__(self, dtype_profile: Optional[CompactDtypeProfile] = None):
+        """
+        Initialize the rollup builder.
+        
+        Args:
+            dtype_profile: Optional compact dtype profile, applied to the
+                          rollup shares as the cleaner does for sections
+        """
+        self.dtype_profile = dtype_profile
+    
+    def build(self, df: pd.DataFrame, levels: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Build rollups for every level the section data supports.
+        
+        Args:
+            df: Cleaned section-level DataFrame (or GeoDataFrame)
+            levels: Levels to build (default: all of LEVELS)
+        
+        Returns:
+            Dictionary mapping level name to its rollup DataFrame. Levels whose
+            keys are missing from df (e.g. municipio without geometry) are skipped.
+        """
+        rollups = {}
+        for level in levels or list(self.LEVELS):
+            keys = self.LEVELS[level]
+            missing = [col for col in keys if col not in df.columns]
+            if missing:
+                logger.info(f"Skipping {level} rollup: missing {missing}")
+                continue
+            rollups[level] = self.build_level(df, level)
+            logger.info(f"Built {level} rollup: {len(rollups[level])} rows")
+        
+        return rollups
+    
+    def build_level(self, df: pd.DataFrame, level: str) -> pd.DataFrame:
+        """
+        Aggregate sections to one rollup level.
+        
+        Args:
+            df: Cleaned section-level DataFrame (or GeoDataFrame)
+            level: One of LEVELS
+        
+        Returns:
+            DataFrame with one row per group: the keys, ENTIDAD, SECCIONES
+            (number of sections), LISTA_NOMINAL, vote sums, TOTAL_VOTOS_SUM and
+            vote-weighted {party}_PCT
+        
+        Raises:
+            ValueError: If level is unknown
+        """
+        if level not in self.LEVELS:
+            raise ValueError(f"Invalid rollup level: {level}. Must be one of {list(self.LEVELS)}.")
+        
+        keys = self.LEVELS[level]
+        vote_columns = self.vote_columns(df)
+        sum_columns = [col for col in ['LISTA_NOMINAL'] + vote_columns + ['TOTAL_VOTOS_SUM'] if col in df.columns]
+        label_columns = [col for col in self.LABEL_COLUMNS if col in df.columns and col not in keys]
+        
+        # Only the needed columns, as a plain DataFrame (no geometry dissolve)
+        sections = pd.DataFrame(df[keys + label_columns + sum_columns])
+        grouped = sections.groupby(keys, dropna=True, observed=True)
+        
+        rollup = grouped[sum_columns].sum()
+        rollup.insert(0, 'SECCIONES', grouped.size())
+        for position, col in enumerate(label_columns):
+            rollup.insert(position, col, grouped[col].first())
+        
+        if 'TOTAL_VOTOS_SUM' in rollup.columns:
+            rollup = add_vote_shares(rollup, vote_columns, self.dtype_profile)
+        
+        return rollup.reset_index()
+    
+    def vote_columns(self, df: pd.DataFrame) -> List[str]:
+        """
+        Vote columns of a section-level frame: those with a {party}_PCT share.
+        
+        Args:
+            df: Cleaned section-level DataFrame
+        
+        Returns:
+            Vote column names, in frame order
+        """
+        return [
+            col[:-len('_PCT')] for col in df.columns
+            if col.endswith('_PCT') and col[:-len('_PCT')] in df.columns
+        ]
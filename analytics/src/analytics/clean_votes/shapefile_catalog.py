@@ -0,0 +1,379 @@
+"""
+Shapefile Catalog
+=================
+
+Persistent index of SECCION shapefiles under data/geo/, so the geometry merge
+can find a state's cartography without walking directories or reading
+candidate files.
+
+Each entry records the entidad found inside the file (not the folder it sits
+in), the cartography type (peepjf/nacional), the vintage (a year in the path,
+if any) and the file's mtime/size. Lookups are dictionary reads; a changed
+file is re-probed on its own and a missing one costs a single refresh.
+
+Build or refresh the catalog with:
+    uv run python -m analytics.clean_votes.shapefile_catalog --base-dir data/geo
+"""
+
+import importlib.util
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def shapefile_signature(shp_file: Path) -> Tuple[int, int]:
+    """
+    Latest mtime and total size of a shapefile's .shp and .dbf.
+    
+    Args:
+        shp_file: Path to the .shp file
+    
+    Returns:
+        (mtime_ns, size) tuple; changes whenever geometry or attributes change
+    
+    Raises:
+        OSError: If the .shp file does not exist
+    """
+    stats = [os.stat(shp_file)]
+    dbf_file = Path(shp_file).with_suffix('.dbf')
+    if dbf_file.exists():
+        stats.append(os.stat(dbf_file))
+    return max(s.st_mtime_ns for s in stats), sum(s.st_size for s in stats)
+
+
+@lru_cache(maxsize=None)
+def _arrow_available() -> bool:
+    """Whether geopandas can read through pyogrio's Arrow path."""
+    return all(importlib.util.find_spec(module) is not None for module in ('pyogrio', 'pyarrow'))
+
+
+def read_shapefile(
+    shp_file: Path,
+    columns: Optional[Sequence[str]] = None,
+    ignore_geometry: bool = False
+):
+    """
+    Read a shapefile, vectorized through pyogrio's Arrow I/O when available.
+    
+    Args:
+        shp_file: Path to the .shp file
+        columns: Attribute columns to read; missing ones are ignored.
+                If None, reads all columns.
+        ignore_geometry: Skip the geometry and return a plain DataFrame
+    
+    Returns:
+        GeoDataFrame, or DataFrame if ignore_geometry is True
+    """
+    import geopandas as gpd
+    
+    options = {'engine': 'pyogrio', 'use_arrow': True} if _arrow_available() else {}
+    return gpd.read_file(
+        shp_file,
+        columns=list(columns) if columns is not None else None,
+        ignore_geometry=ignore_geometry,
+        **options
+    )
+
+
+class ShapefileCatalog:
+    """
+    Maps (cartography type, entidad) to SECCION.shp paths, persisted as JSON.
+    """
+    
+    # Cartography type -> top-level directory under the base dir
+    TYPE_DIRS = {
+        'peepjf': 'shapefiles_peepjf',
+        'nacional': 'productos_ine_nacional',
+    }
+    
+    SHAPEFILE_NAME = 'SECCION.shp'
+    CATALOG_NAME = 'shapefile_catalog.json'
+    VERSION = 1
+    
+    # A standalone year in a path component (e.g. 'cartografia_2023')
+    VINTAGE_PATTERN = re.compile(r'(?<!\d)((?:19|20)\d{2})(?!\d)')
+    
+    def __init__(self, base_dir: str, catalog_path: Optional[str] = None):
+        """
+        Initialize the catalog.
+        
+        Args:
+            base_dir: Base directory containing the shapefile type directories
+            catalog_path: JSON file for the catalog.
+                         If None, uses shapefile_catalog.json in base_dir.
+        """
+        self.base_dir = Path(base_dir)
+        self.catalog_path = Path(catalog_path) if catalog_path else self.base_dir / self.CATALOG_NAME
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._index: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        self._refreshed = False
+    
+    def scan(self) -> int:
+        """
+        Scan the base directory and save the catalog.
+        
+        Files whose mtime and size match their existing entry are not probed
+        again, so re-scanning an unchanged tree only costs the directory walk.
+        
+        Returns:
+            Number of shapefiles in the catalog
+        """
+        previous = self._load()
+        entries = {}
+        
+        for shapefile_type, type_dir in self.TYPE_DIRS.items():
+            type_path = self.base_dir / type_dir
+            if not type_path.exists():
+                continue
+            
+            for shp_file in sorted(type_path.rglob(self.SHAPEFILE_NAME)):
+                key = shp_file.relative_to(self.base_dir).as_posix()
+                entry = previous.get(key)
+                if entry is None or not self._is_current(entry):
+                    entry = self._probe(shp_file, shapefile_type)
+                if entry is not None:
+                    entries[key] = entry
+        
+        self._set_entries(entries)
+        self._refreshed = True
+        if self.base_dir.exists():
+            self._save()
+        logger.info(f"Shapefile catalog: {len(entries)} shapefiles indexed in {self.catalog_path}")
+        return len(entries)
+    
+    def refresh(self) -> int:
+        """
+        Re-scan once per catalog instance; later calls are no-ops.
+        
+        Returns:
+            Number of shapefiles in the catalog
+        """
+        if self._refreshed:
+            return len(self._load())
+        logger.info(f"Refreshing shapefile catalog for {self.base_dir}...")
+        return self.scan()
+    
+    def lookup(self, entidad_id: int, shapefile_type: str, vintage: Optional[str] = None) -> Optional[Path]:
+        """
+        Find the SECCION shapefile holding an entidad.
+        
+        The chosen file's mtime/size are checked first. A changed file is
+        probed again on its own; if it no longer holds this entidad, or no
+        entry matches, the catalog is refreshed (at most once per instance).
+        
+        Args:
+            entidad_id: State ID (1-32)
+            shapefile_type: 'peepjf' or 'nacional'
+            vintage: Cartography year to match. If None, the newest one wins.
+        
+        Returns:
+            Path to SECCION.shp, or None if no shapefile holds this entidad
+        
+        Raises:
+            ValueError: If shapefile_type is unknown
+        """
+        if shapefile_type not in self.TYPE_DIRS:
+            raise ValueError(
+                f"Invalid shapefile_type: {shapefile_type}. Must be one of {list(self.TYPE_DIRS)}."
+            )
+        
+        if not self._load() and not self._refreshed:
+            self.refresh()
+        
+        entry = self._match(entidad_id, shapefile_type, vintage)
+        if entry is not None and not self._is_current(entry):
+            entry = self._reprobe(entry)
+            if entry is None or entry['entidad'] != entidad_id:
+                entry = None
+        
+        if entry is None and not self._refreshed:
+            self.refresh()
+            entry = self._match(entidad_id, shapefile_type, vintage)
+        
+        return self.base_dir / entry['path'] if entry is not None else None
+    
+    def entidad_of(self, shp_file: Path) -> Optional[int]:
+        """
+        ENTIDAD held by a shapefile, from its catalog entry when it is current.
+        
+        Uncatalogued or changed files under a cartography type directory are
+        probed (ENTIDAD column only) and recorded; files elsewhere are probed
+        without being recorded.
+        
+        Args:
+            shp_file: Path to a SECCION.shp
+        
+        Returns:
+            The file's single ENTIDAD value, or None if it is unreadable or
+            holds several
+        """
+        shp_file = Path(shp_file)
+        try:
+            key = shp_file.resolve().relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            key = None
+        
+        entry = self._load().get(key) if key is not None else None
+        if entry is not None and self._is_current(entry):
+            return entry['entidad']
+        
+        type_by_dir = {type_dir: shapefile_type for shapefile_type, type_dir in self.TYPE_DIRS.items()}
+        shapefile_type = type_by_dir.get(key.split('/')[0]) if key is not None else None
+        if shapefile_type is not None:
+            entry = self._reprobe({'path': key, 'shapefile_type': shapefile_type})
+            return entry['entidad'] if entry is not None else None
+        
+        try:
+            entidad_values = self._entidad_values(shp_file)
+        except Exception as e:
+            logger.debug(f"Could not read ENTIDAD from {shp_file}: {e}")
+            return None
+        return int(entidad_values[0]) if len(entidad_values) == 1 else None
+    
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        All catalog entries.
+        
+        Returns:
+            List of dictionaries with path (relative to base_dir), entidad,
+            shapefile_type, vintage, mtime_ns and size
+        """
+        return list(self._load().values())
+    
+    def _match(self, entidad_id: int, shapefile_type: str, vintage: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Best entry for an entidad: the requested vintage, or the newest."""
+        candidates = self._index.get((shapefile_type, int(entidad_id)), [])
+        if vintage is not None:
+            candidates = [e for e in candidates if e['vintage'] == str(vintage)]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda e: (e['vintage'] or '', e['path']))
+    
+    def _reprobe(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Probe one changed file again and save the catalog."""
+        entries = dict(self._load())
+        new_entry = self._probe(self.base_dir / entry['path'], entry['shapefile_type'])
+        if new_entry is None:
+            entries.pop(entry['path'], None)
+        else:
+            entries[entry['path']] = new_entry
+        
+        self._set_entries(entries)
+        self._save()
+        return new_entry
+    
+    def _probe(self, shp_file: Path, shapefile_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a shapefile's ENTIDAD values (attributes only) into a catalog entry.
+        
+        Returns:
+            Catalog entry, or None if the file is unreadable or does not hold
+            exactly one entidad
+        """
+        try:
+            entidad_values = self._entidad_values(shp_file)
+        except Exception as e:
+            logger.debug(f"Skipping {shp_file}: {e}")
+            return None
+        
+        if len(entidad_values) != 1:
+            logger.debug(f"Skipping {shp_file}: ENTIDAD values {list(entidad_values)[:5]}")
+            return None
+        
+        relative_path = shp_file.relative_to(self.base_dir)
+        vintages = self.VINTAGE_PATTERN.findall('/'.join(relative_path.parts[:-1]))
+        mtime_ns, size = self._stat(shp_file)
+        
+        return {
+            'path': relative_path.as_posix(),
+            'entidad': int(entidad_values[0]),
+            'shapefile_type': shapefile_type,
+            'vintage': vintages[-1] if vintages else None,
+            'mtime_ns': mtime_ns,
+            'size': size,
+        }
+    
+    @staticmethod
+    def _entidad_values(shp_file: Path):
+        """Distinct ENTIDAD values, read from the .dbf alone (no geometry)."""
+        import pandas as pd
+        
+        dbf_file = Path(shp_file).with_suffix('.dbf')
+        attributes = read_shapefile(
+            dbf_file if dbf_file.exists() else shp_file, columns=['ENTIDAD'], ignore_geometry=True
+        )
+        return pd.to_numeric(attributes['ENTIDAD'], errors='coerce').dropna().unique()
+    
+    def _is_current(self, entry: Dict[str, Any]) -> bool:
+        """Whether an entry's file still has the recorded mtime and size."""
+        try:
+            return self._stat(self.base_dir / entry['path']) == (entry['mtime_ns'], entry['size'])
+        except OSError:
+            return False
+    
+    @staticmethod
+    def _stat(shp_file: Path) -> Tuple[int, int]:
+        """Latest mtime and total size of the .shp and its .dbf (where ENTIDAD lives)."""
+        return shapefile_signature(shp_file)
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Entries keyed by relative path, read from disk on first use."""
+        if self._entries is None:
+            entries = {}
+            if self.catalog_path.exists():
+                try:
+                    with open(self.catalog_path, encoding='utf-8') as f:
+                        catalog = json.load(f)
+                    if catalog.get('version') == self.VERSION:
+                        entries = {e['path']: e for e in catalog['entries']}
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Ignoring unreadable shapefile catalog {self.catalog_path}: {e}")
+            self._set_entries(entries)
+        return self._entries
+    
+    def _set_entries(self, entries: Dict[str, Dict[str, Any]]):
+        """Replace the entries and rebuild the (type, entidad) index."""
+        self._entries = entries
+        self._index = {}
+        for entry in entries.values():
+            self._index.setdefault((entry['shapefile_type'], entry['entidad']), []).append(entry)
+    
+    def _save(self):
+        """Write the catalog atomically (concurrent writers never leave a partial file)."""
+        catalog = {'version': self.VERSION, 'entries': list(self._entries.values())}
+        tmp_path = self.catalog_path.with_name(f'{self.catalog_path.name}.{os.getpid()}.tmp')
+        try:
+            self.catalog_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(catalog, f, indent=1)
+            os.replace(tmp_path, self.catalog_path)
+        except OSError as e:
+            logger.warning(f"Could not save shapefile catalog {self.catalog_path}: {e}")
+
+
+def main():
+    """Command-line interface: build or refresh the catalog and print it."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Index SECCION shapefiles by entidad, type and vintage')
+    parser.add_argument('--base-dir', default='data/geo', help='Shapefile base directory (default: data/geo)')
+    parser.add_argument('--catalog-path', help='Catalog file (default: <base-dir>/shapefile_catalog.json)')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    catalog = ShapefileCatalog(args.base_dir, args.catalog_path)
+    catalog.scan()
+    
+    print(f"\n{'Type':<10}{'Entidad':>8}  {'Vintage':<8}Path")
+    for entry in sorted(catalog.entries(), key=lambda e: (e['shapefile_type'], e['entidad'], e['path'])):
+        print(f"{entry['shapefile_type']:<10}{entry['entidad']:>8}  {entry['vintage'] or '-':<8}{entry['path']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,380 @@
+"""
+Parquet Staging Cache
+=====================
+
+Keeps a Parquet copy of every raw CSV/Excel file that has been read, keyed
+by a hash of the raw file's content, so re-runs skip text parsing. Hashes are
+remembered with the file's mtime/size, so an unchanged file is not re-read
+just to find its copy.
+
+Copies staged through a column projection hold only the projected columns;
+the raw header is kept in the file metadata so a copy that no longer covers
+the current projection is staged again.
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Optional, Iterable, Iterator, List, Callable, Dict, Any
+import logging
+
+from .archives import open_source, source_signature
+
+logger = logging.getLogger(__name__)
+
+
+class ParquetStagingCache:
+    """
+    Content-addressed Parquet staging layer for raw electoral files.
+    
+    Staged files hold exactly what ElectoralDataReader returned for the raw
+    file (the projected or all columns, as strings), so reading them back
+    gives the cleaner the same input without re-detecting headers,
+    delimiters or encodings.
+    
+    When the entidad column is known, rows also get a numeric ENTIDAD_KEY
+    column and every row group holds a single entidad, so a single state
+    can be read without scanning the rest of the country. write() stores
+    one row group per entidad; write_chunks() buffers each entidad's rows
+    up to ROW_GROUP_ROWS, so only large entidades span several row groups.
+    """
+    
+    # Raw formats worth staging (Parquet sources are read directly)
+    STAGED_SUFFIXES = ['.csv', '.xlsx', '.xls']
+    
+    # Bytes hashed per read when computing the content key
+    HASH_BLOCK_SIZE = 8 * 1024 * 1024
+    
+    # Target rows per row group when staging a stream, and the most rows
+    # buffered across all entidades before the largest buffer is flushed
+    ROW_GROUP_ROWS = 64 * 1024
+    MAX_BUFFERED_ROWS = 256 * 1024
+    
+    # Numeric entidad id used to prune row groups (hidden from the reader)
+    ENTIDAD_KEY = '__ID_ENTIDAD__'
+    
+    # Content hashes of raw files, keyed by path with their mtime/size
+    HASH_INDEX_NAME = 'content_hashes.json'
+    
+    # Schema metadata holding every column name of the raw file
+    SOURCE_COLUMNS_KEY = b'staging.source_columns'
+    
+    def __init__(self, staging_dir: str):
+        """
+        Initialize the staging cache.
+        
+        Args:
+            staging_dir: Directory for staged Parquet files (created on first write)
+        """
+        self.staging_dir = Path(staging_dir)
+        self._hash_index: Optional[Dict[str, Dict[str, Any]]] = None
+    
+    def supports(self, file_path: str) -> bool:
+        """
+        Check whether a file format is staged.
+        
+        Args:
+            file_path: Path to the raw data file
+        
+        Returns:
+            True for CSV and Excel files
+        """
+        return Path(file_path).suffix.lower() in self.STAGED_SUFFIXES
+    
+    def content_hash(self, file_path: str) -> str:
+        """
+        Hash the content of a raw file.
+        
+        Args:
+            file_path: Path to the raw data file (or archive member)
+        
+        Returns:
+            Hex digest identifying the file content
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        with open_source(file_path, as_file=True) as f:
+            for block in iter(lambda: f.read(self.HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def cached_content_hash(self, file_path: str) -> str:
+        """
+        Hash a raw file's content, reusing the hash while its mtime/size are unchanged.
+        
+        Args:
+            file_path: Path to the raw data file (or archive member)
+        
+        Returns:
+            Hex digest identifying the file content
+        """
+        key = str(Path(file_path).absolute())
+        mtime_ns, size = source_signature(file_path)
+        
+        entry = self._load_hash_index().get(key)
+        if entry is not None and (entry['mtime_ns'], entry['size']) == (mtime_ns, size):
+            return entry['hash']
+        
+        content_hash = self.content_hash(file_path)
+        self._hash_index[key] = {'mtime_ns': mtime_ns, 'size': size, 'hash': content_hash}
+        self._save_hash_index()
+        return content_hash
+    
+    def staged_path(self, file_path: str, content_hash: str, projected: bool = False) -> Path:
+        """
+        Get the staging location for a raw file.
+        
+        Args:
+            file_path: Path to the raw data file
+            content_hash: Hash from content_hash()
+            projected: Whether the copy holds projected columns only. Projected
+                      and full copies of the same file are kept apart.
+        
+        Returns:
+            Path of the staged Parquet file (may not exist yet)
+        """
+        suffix = '-projected' if projected else ''
+        return self.staging_dir / f"{Path(file_path).stem}-{content_hash}{suffix}.parquet"
+    
+    def covers(self, staged_path: Path, usecols: Optional[Callable[[str], bool]] = None) -> bool:
+        """
+        Check whether a staged copy holds every column a projection selects.
+        
+        Args:
+            staged_path: Path of an existing staged Parquet file
+            usecols: Column projection over raw column names (None = all columns)
+        
+        Returns:
+            True if the copy can be read instead of the raw file. Copies
+            staged without a recorded raw header are assumed complete.
+        """
+        import pyarrow.parquet as pq
+        
+        schema = pq.read_schema(staged_path)
+        metadata = schema.metadata or {}
+        if self.SOURCE_COLUMNS_KEY not in metadata:
+            return True
+        
+        source_columns = json.loads(metadata[self.SOURCE_COLUMNS_KEY])
+        needed = source_columns if usecols is None else [col for col in source_columns if usecols(col)]
+        return set(needed) <= set(schema.names)
+    
+    def write(
+        self,
+        df: pd.DataFrame,
+        staged_path: Path,
+        entidad_column: Optional[str] = None,
+        source_columns: Optional[List[str]] = None
+    ) -> Path:
+        """
+        Stage a DataFrame read from a raw file.
+        
+        The file is written under a temporary name and renamed, so an
+        interrupted run never leaves a partial file behind.
+        
+        Args:
+            df: DataFrame returned by the reader
+            staged_path: Path from staged_path()
+            entidad_column: Raw entidad id column to group row groups by
+            source_columns: Every column of the raw file, when df is projected
+        
+        Returns:
+            Path of the staged Parquet file
+        """
+        import pyarrow.parquet as pq
+        
+        schema = self._string_schema(df.columns, entidad_column, source_columns)
+        table = self._to_table(df, schema, entidad_column)
+        
+        tmp_path = self._tmp_path(staged_path)
+        with pq.ParquetWriter(tmp_path, table.schema) as writer:
+            self._write_row_groups(writer, table, entidad_column)
+        os.replace(tmp_path, staged_path)
+        
+        logger.info(f"Staged {len(df)} rows to {staged_path}")
+        return staged_path
+    
+    def write_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        staged_path: Path,
+        entidad_column: Optional[str] = None,
+        source_columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stage chunks while passing them through to the caller.
+        
+        The staged file is only published once every chunk has been
+        consumed; an abandoned iteration leaves no staged file.
+        
+        Args:
+            chunks: DataFrame chunks returned by the reader
+            staged_path: Path from staged_path()
+            entidad_column: Raw entidad id column to group row groups by
+                           (rows are buffered per entidad across chunks)
+            source_columns: Every column of the raw file, when the chunks are projected
+        
+        Yields:
+            The input chunks, unchanged
+        """
+        import pyarrow.parquet as pq
+        
+        tmp_path = self._tmp_path(staged_path)
+        writer = None
+        rows = 0
+        # Entidad key -> buffered tables, flushed as one row group
+        pending: Dict[int, List[Any]] = {}
+        try:
+            for chunk in chunks:
+                if writer is None:
+                    schema = self._string_schema(chunk.columns, entidad_column, source_columns)
+                    writer = pq.ParquetWriter(tmp_path, schema)
+                table = self._to_table(chunk, schema, entidad_column)
+                if entidad_column is None:
+                    writer.write_table(table)
+                else:
+                    for key, part in self._split_by_entidad(table):
+                        pending.setdefault(key, []).append(part)
+                    self._flush_pending(writer, pending, final=False)
+                rows += len(chunk)
+                yield chunk
+            
+            if writer is not None:
+                self._flush_pending(writer, pending, final=True)
+        except BaseException:
+            if writer is not None:
+                writer.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        if writer is None:
+            return
+        
+        writer.close()
+        os.replace(tmp_path, staged_path)
+        logger.info(f"Staged {rows} rows to {staged_path}")
+    
+    def _load_hash_index(self) -> Dict[str, Dict[str, Any]]:
+        """Remembered content hashes, read from disk on first use."""
+        if self._hash_index is None:
+            self._hash_index = {}
+            index_path = self.staging_dir / self.HASH_INDEX_NAME
+            if index_path.exists():
+                try:
+                    with open(index_path, encoding='utf-8') as f:
+                        self._hash_index = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable hash index {index_path}: {e}")
+        return self._hash_index
+    
+    def _save_hash_index(self):
+        """Write the hash index atomically."""
+        index_path = self.staging_dir / self.HASH_INDEX_NAME
+        tmp_path = self._tmp_path(index_path)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._hash_index, f, indent=1)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            logger.warning(f"Could not save hash index {index_path}: {e}")
+    
+    def _tmp_path(self, staged_path: Path) -> Path:
+        """Create the staging directory and return a temporary sibling path."""
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        return staged_path.with_name(f"{staged_path.name}.{os.getpid()}.tmp")
+    
+    def entidad_filter(self, staged_path: Path, entidades: Iterable[int]) -> Optional[List[tuple]]:
+        """
+        Build a row filter selecting some entidades from a staged file.
+        
+        Args:
+            staged_path: Path of an existing staged Parquet file
+            entidades: Entidad ids to keep
+        
+        Returns:
+            Row filter for ElectoralDataReader, or None if the file was
+            staged without an entidad key
+        """
+        import pyarrow.parquet as pq
+        
+        if self.ENTIDAD_KEY not in pq.read_schema(staged_path).names:
+            return None
+        return [(self.ENTIDAD_KEY, 'in', [int(e) for e in entidades])]
+    
+    def _to_table(self, df: pd.DataFrame, schema, entidad_column: Optional[str]):
+        """Convert reader output to an Arrow table with the staging schema."""
+        import pyarrow as pa
+        
+        if entidad_column is None:
+            return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+        
+        # Values that are not integers within Int16 (e.g. '1.5', '99999') get no key
+        values = pd.to_numeric(df[entidad_column], errors='coerce')
+        bounds = np.iinfo(np.int16)
+        valid = (values % 1 == 0) & values.between(bounds.min, bounds.max)
+        key = values.where(valid).astype('Int16')
+        return pa.Table.from_pandas(df.assign(**{self.ENTIDAD_KEY: key}), schema=schema, preserve_index=False)
+    
+    def _write_row_groups(self, writer, table, entidad_column: Optional[str]):
+        """Write a table as one row group per entidad (rows keep their order within an entidad)."""
+        if entidad_column is None:
+            writer.write_table(table)
+            return
+        
+        for _, part in self._split_by_entidad(table):
+            writer.write_table(part, row_group_size=max(len(part), 1))
+    
+    def _split_by_entidad(self, table) -> Iterator[tuple]:
+        """Split a table into (entidad key, rows) slices; missing keys are grouped as -1."""
+        import pyarrow.compute as pc
+        
+        # sort_indices is stable, so rows of the same entidad keep their file order
+        table = table.take(pc.sort_indices(table, sort_keys=[(self.ENTIDAD_KEY, 'ascending')]))
+        keys = table.column(self.ENTIDAD_KEY).to_numpy(zero_copy_only=False)
+        keys = np.where(pd.isna(keys), -1, keys)
+        bounds = np.concatenate([[0], np.flatnonzero(keys[1:] != keys[:-1]) + 1, [len(keys)]])
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if end > start:
+                yield int(keys[start]), table.slice(start, end - start)
+    
+    def _flush_pending(self, writer, pending: Dict[int, List[Any]], final: bool):
+        """
+        Write buffered entidad rows as row groups.
+        
+        Entidades holding ROW_GROUP_ROWS rows are written; past
+        MAX_BUFFERED_ROWS the largest buffers are written early to bound
+        memory. With final=True everything left is written.
+        """
+        import pyarrow as pa
+        
+        def flush(key):
+            part = pa.concat_tables(pending.pop(key))
+            writer.write_table(part, row_group_size=max(len(part), 1))
+        
+        counts = {key: sum(len(t) for t in tables) for key, tables in pending.items()}
+        for key in sorted(counts):
+            if final or counts[key] >= self.ROW_GROUP_ROWS:
+                flush(key)
+                del counts[key]
+        
+        while sum(counts.values()) > self.MAX_BUFFERED_ROWS:
+            key = max(counts, key=counts.get)
+            flush(key)
+            del counts[key]
+    
+    def _string_schema(
+        self,
+        columns: Iterable[str],
+        entidad_column: Optional[str] = None,
+        source_columns: Optional[List[str]] = None
+    ):
+        """Arrow schema with every column as a string, like the reader's dtype=str."""
+        import pyarrow as pa
+        
+        fields = [(str(col), pa.string()) for col in columns]
+        if entidad_column is not None:
+            fields.append((self.ENTIDAD_KEY, pa.int16()))
+        metadata = {self.SOURCE_COLUMNS_KEY: json.dumps(source_columns)} if source_columns is not None else None
+        return pa.schema(fields, metadata=metadata)
@@ -0,0 +1,3 @@
+"""
+Analytics Test Suite
+"""
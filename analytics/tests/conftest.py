@@ -0,0 +1,133 @@
+"""
+Pytest Configuration and Fixtures
+==================================
+
+Shared fixtures for testing the clean_votes pipeline.
+"""
+
+import random
+import pandas as pd
+import pytest
+import sys
+from pathlib import Path
+
+# Add analytics to path
+analytics_path = Path(__file__).parents[1] / "src"
+sys.path.insert(0, str(analytics_path))
+
+
+PREP_2024_HEADER = [
+    'CLAVE_CASILLA', 'CLAVE_ACTA', 'ID_ENTIDAD', 'ENTIDAD', 'ID_DISTRITO_FEDERAL',
+    'DISTRITO_FEDERAL', 'SECCION', 'ID_CASILLA', 'TIPO_CASILLA', 'PAN', 'PRI', 'PRD',
+    'PVEM', 'PT', 'MC', 'MORENA', 'PVEM_PT_MORENA', 'NO_REGISTRADAS', 'NULOS',
+    'TOTAL_VOTOS_CALCULADO', 'LISTA_NOMINAL', 'OBSERVACIONES', 'FECHA_HORA_CAPTURA'
+]
+
+PREP_2021_HEADER = [
+    'CLAVE_CASILLA', 'CLAVE_ACTA', 'ID_ESTADO', 'NOMBRE_ESTADO', 'ID_DISTRITO',
+    'NOMBRE_DISTRITO', 'SECCION', 'ID_CASILLA', 'TIPO_CASILLA', 'PAN', 'PRI', 'PRD',
+    'PVEM', 'PT', 'MC', 'MORENA', 'PES', 'RSP', 'FXM', 'PVEM_PT_MORENA', 'PVEM_PT',
+    'CANDIDATO/A NO REGISTRADO/A', 'VOTOS NULOS', 'TOTAL_VOTOS_CALCULADOS',
+    'LISTA_NOMINAL_CASILLA', 'OBSERVACIONES', 'CONTABILIZADA', ''
+]
+
+ENTIDADES = {1: 'AGUASCALIENTES', 9: 'CIUDAD DE MÉXICO', 26: 'SONORA'}
+
+
+def _prep_rows(header, n_rows, seed):
+    """Generate casilla-level rows with the quirks found in PREP files."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        entidad_id = rng.choice(list(ENTIDADES))
+        distrito = rng.randint(1, 3)
+        seccion = rng.randint(1, 40)
+        row = []
+        for col in header:
+            if col in ('ID_ENTIDAD', 'ID_ESTADO'):
+                row.append(str(entidad_id).zfill(rng.choice([1, 2])))
+            elif col in ('ENTIDAD', 'NOMBRE_ESTADO'):
+                row.append(ENTIDADES[entidad_id])
+            elif col in ('ID_DISTRITO_FEDERAL', 'ID_DISTRITO'):
+                row.append(str(distrito))
+            elif col in ('DISTRITO_FEDERAL', 'NOMBRE_DISTRITO'):
+                row.append(f'DISTRITO {distrito}')
+            elif col == 'SECCION':
+                row.append(str(seccion).zfill(4))
+            elif col in ('LISTA_NOMINAL', 'LISTA_NOMINAL_CASILLA'):
+                row.append(rng.choice([str(rng.randint(300, 800))] * 9 + ['-']))
+            elif col in ('CLAVE_CASILLA', 'CLAVE_ACTA', 'ID_CASILLA', 'TIPO_CASILLA'):
+                row.append(f'{col[:2]}{i}')
+            elif col in ('OBSERVACIONES', 'FECHA_HORA_CAPTURA', 'CONTABILIZADA', ''):
+                row.append(rng.choice(['', 'Sin acta', '1']))
+            else:
+                row.append(rng.choice([str(rng.randint(0, 150))] * 12 + ['-', '', 'ilegible']))
+        rows.append(row)
+    return rows
+
+
+def write_prep_csv(path, header, n_rows=600, seed=0, delimiter=',', preamble=2, encoding='utf-8'):
+    """Write a synthetic PREP CSV with a preamble before the header and CRLF endings."""
+    lines = [f'PREP PRUEBA LINEA {i}' for i in range(preamble)]
+    lines.append(delimiter.join(header))
+    lines.extend(delimiter.join(row) for row in _prep_rows(header, n_rows, seed))
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        f.write('\r\n'.join(lines) + '\r\n')
+    return path
+
+
+@pytest.fixture
+def prep_2024_csv(tmp_path):
+    """Comma-delimited 2024-style PREP file."""
+    return write_prep_csv(tmp_path / 'PRES_2024.csv', PREP_2024_HEADER)
+
+
+@pytest.fixture
+def prep_2021_csv(tmp_path):
+    """Pipe-delimited 2021-style PREP file with trailing delimiter."""
+    return write_prep_csv(tmp_path / 'diputaciones.csv', PREP_2021_HEADER, seed=1, delimiter='|')
+
+
+@pytest.fixture
+def prep_2024_latin1_csv(tmp_path):
+    """2024-style PREP file exported as latin-1 (accented ENTIDAD names)."""
+    return write_prep_csv(tmp_path / 'PRES_2024_latin1.csv', PREP_2024_HEADER, encoding='latin-1')
+
+
+# PEEPJF folder of each fixture entidad, as laid out under data/geo/
+PEEPJF_FOLDERS = {1: '1_Aguascalientes', 9: '9_CDMX', 26: '26_Sonora'}
+
+
+def write_seccion_shp(path, entidad_id, n_sections=40):
+    """Write a SECCION shapefile with one square per section of an entidad."""
+    import geopandas as gpd
+    from shapely.geometry import box
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sections = range(1, n_sections + 1)
+    gdf = gpd.GeoDataFrame({
+        'ID': [entidad_id * 10_000 + s for s in sections],
+        'ENTIDAD': [entidad_id] * n_sections,
+        'DISTRITO_F': [s % 3 + 1 for s in sections],
+        'MUNICIPIO': [s % 5 + 1 for s in sections],
+        'SECCION': list(sections),
+        'TIPO': [s % 2 + 1 for s in sections],
+        'CONTROL': [1] * n_sections,
+        'geometry': [box(entidad_id * 1000 + s, 0, entidad_id * 1000 + s + 1, 1) for s in sections],
+    }, crs='EPSG:32614')
+    gdf.to_file(path)
+    return path
+
+
+def seccion_votes(entidad_id):
+    """Section-level votes for the first three sections of an entidad."""
+    return pd.DataFrame({'ID_ENTIDAD': [entidad_id] * 3, 'SECCION': [1, 2, 3], 'PAN': [1, 2, 3]})
+
+
+@pytest.fixture
+def shapefile_base_dir(tmp_path):
+    """data/geo-style tree with PEEPJF SECCION shapefiles for the fixture entidades."""
+    base_dir = tmp_path / 'geo'
+    for entidad_id, folder in PEEPJF_FOLDERS.items():
+        write_seccion_shp(base_dir / 'shapefiles_peepjf' / folder / f'{entidad_id:02d}' / 'SECCION.shp', entidad_id)
+    return base_dir
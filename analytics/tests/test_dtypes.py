@@ -0,0 +1,100 @@
+"""
+Compact Dtype Profile Tests
+===========================
+
+Tests that the compact dtype profile changes memory layout, not results.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.clean_votes import (
+    ElectoralDataReader, ElectoralDataCleaner, ColumnMapper, ElectoralDatabase, CompactDtypeProfile
+)
+
+
+def _clean(path, profile=None, csv_engine='pandas', chunksize=None):
+    """Read, homologate and clean a file, optionally with a dtype profile."""
+    reader = ElectoralDataReader(csv_engine=csv_engine)
+    mapper = ColumnMapper(dtype_profile=profile)
+    cleaner = ElectoralDataCleaner(dtype_profile=profile)
+    if chunksize is None:
+        return cleaner.clean(mapper.homologate_columns(reader.read_file(str(path))))
+    chunks = reader.read_file_chunks(str(path), chunksize=chunksize)
+    return cleaner.clean_chunks(mapper.homologate_columns(c) for c in chunks)
+
+
+def _decategorize(df):
+    """Turn categorical columns back into object columns for comparison."""
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    return df
+
+
+class TestCompactCleaning:
+    """The compact profile gives the same values with smaller dtypes."""
+    
+    @pytest.mark.parametrize("csv_engine", ['pandas', 'pyarrow'])
+    @pytest.mark.parametrize("chunksize", [None, 170])
+    def test_matches_default_profile(self, prep_2024_csv, csv_engine, chunksize):
+        """Values match the default pipeline (percentages to float32 precision)."""
+        expected = _clean(prep_2024_csv)
+        result = _clean(prep_2024_csv, CompactDtypeProfile(), csv_engine, chunksize)
+        
+        assert len(expected) > 0
+        pd.testing.assert_frame_equal(_decategorize(result), expected, check_dtype=False, rtol=1e-6)
+    
+    def test_matches_default_profile_2021(self, prep_2021_csv):
+        """Pipe-delimited 2021 layout also matches."""
+        expected = _clean(prep_2021_csv)
+        result = _clean(prep_2021_csv, CompactDtypeProfile())
+        
+        pd.testing.assert_frame_equal(_decategorize(result), expected, check_dtype=False, rtol=1e-6)
+    
+    def test_output_dtypes(self, prep_2024_csv):
+        """Counts are int32, percentages float32 and ENTIDAD categorical."""
+        result = _clean(prep_2024_csv, CompactDtypeProfile())
+        
+        pct_columns = [col for col in result.columns if col.endswith('_PCT')]
+        assert pct_columns
+        assert all(result[col].dtype == np.float32 for col in pct_columns)
+        for col in ['MORENA', 'PAN', 'NULOS', 'LISTA_NOMINAL', 'TOTAL_VOTOS_SUM']:
+            assert result[col].dtype == np.int32, col
+        assert isinstance(result['ENTIDAD'].dtype, pd.CategoricalDtype)
+
+
+class TestCompactDtypeProfile:
+    """Lossless narrowing rules."""
+    
+    def test_counts_only_narrowed_when_lossless(self):
+        """Columns with NaN, fractions or int32 overflow keep their dtype."""
+        df = pd.DataFrame({
+            'OK': [1.0, 2.0, 3.0],
+            'MISSING': [1.0, np.nan, 3.0],
+            'FRACTION': [1.0, 2.5, 3.0],
+            'HUGE': [1.0, 2.0, 2.0 ** 40],
+        })
+        
+        df = CompactDtypeProfile().apply_counts(df, df.columns)
+        
+        assert df['OK'].dtype == np.int32
+        assert df['OK'].tolist() == [1, 2, 3]
+        assert df['MISSING'].dtype == np.float64
+        assert df['FRACTION'].dtype == np.float64
+        assert df['HUGE'].dtype == np.float64
+    
+    def test_database_round_trip(self, tmp_path, prep_2024_csv):
+        """Tables loaded through a profiled database come back compact."""
+        df = _clean(prep_2024_csv)
+        db = ElectoralDatabase(str(tmp_path / 'test.db'), dtype_profile=CompactDtypeProfile())
+        table_name = db.save_electoral_data(df, 'PRES_2024', 9, 'CIUDAD DE MÉXICO')
+        
+        loaded = db.load_electoral_data(table_name=table_name)
+        
+        assert loaded['MORENA'].dtype == np.int32
+        assert loaded['MORENA_PCT'].dtype == np.float32
+        assert isinstance(loaded['ENTIDAD'].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(_decategorize(loaded), df, check_dtype=False, rtol=1e-6)
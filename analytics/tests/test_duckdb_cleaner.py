@@ -0,0 +1,233 @@
+"""
+DuckDB Cleaner Parity Tests
+===========================
+
+Tests that the DuckDB backend produces the same output as the pandas cleaner,
+from DataFrames and directly from files.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('duckdb')
+
+from analytics.clean_votes import (
+    ElectoralDataReader, ElectoralDataCleaner, DuckDBElectoralDataCleaner, ColumnMapper,
+    CompactDtypeProfile, CleanVotesOrchestrator, ParquetStagingCache
+)
+
+
+def _homologated(path):
+    """Read and homologate a whole file."""
+    return ColumnMapper().homologate_columns(ElectoralDataReader().read_file(str(path)))
+
+
+def _homologated_chunks(path, chunksize):
+    """Read and homologate a file in chunks."""
+    mapper = ColumnMapper()
+    return (mapper.homologate_columns(c) for c in ElectoralDataReader().read_file_chunks(str(path), chunksize=chunksize))
+
+
+@pytest.fixture
+def cleaner(tmp_path):
+    return DuckDBElectoralDataCleaner(temp_directory=str(tmp_path / 'spill'))
+
+
+class TestDuckDBParity:
+    """Same columns, order, values, dtypes and index as the pandas path."""
+    
+    @pytest.mark.parametrize("fixture", ['prep_2024_csv', 'prep_2021_csv', 'prep_2024_latin1_csv'])
+    def test_clean_file_matches_pandas(self, request, cleaner, fixture):
+        """Cleaning straight from the CSV matches exactly, for both layouts and encodings."""
+        path = request.getfixturevalue(fixture)
+        expected = ElectoralDataCleaner().clean(_homologated(path))
+        reader = ElectoralDataReader()
+        
+        result = cleaner.clean_file(str(path), reader=reader)
+        
+        assert len(expected) > 0
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+        if fixture == 'prep_2024_latin1_csv':
+            assert reader.last_encoding == 'latin-1'
+    
+    def test_clean_file_parquet(self, tmp_path, cleaner, prep_2024_csv):
+        """Parquet sources with text columns match too."""
+        parquet_path = tmp_path / 'PRES_2024.parquet'
+        ElectoralDataReader().read_file(str(prep_2024_csv)).to_parquet(parquet_path, index=False)
+        expected = ElectoralDataCleaner().clean(_homologated(parquet_path))
+        
+        result = cleaner.clean_file(str(parquet_path))
+        
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    
+    def test_clean_matches_pandas(self, cleaner, prep_2024_csv):
+        """In-memory cleaning matches exactly."""
+        df = _homologated(prep_2024_csv)
+        
+        result = cleaner.clean(df)
+        
+        pd.testing.assert_frame_equal(result, ElectoralDataCleaner().clean(df), check_exact=True)
+    
+    @pytest.mark.parametrize("chunksize", [170, 10_000])
+    def test_clean_chunks_matches_pandas(self, cleaner, prep_2024_csv, chunksize):
+        """Streaming cleaning matches the pandas in-memory result."""
+        expected = ElectoralDataCleaner().clean(_homologated(prep_2024_csv))
+        
+        result = cleaner.clean_chunks(_homologated_chunks(prep_2024_csv, chunksize))
+        
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    
+    def test_entidad_filter(self, cleaner, prep_2024_csv):
+        """entidad_ids restricts the aggregation to those entidades."""
+        expected = ElectoralDataCleaner().clean(_homologated(prep_2024_csv))
+        expected = expected[expected['ID_ENTIDAD'] == 9].reset_index(drop=True)
+        
+        result = cleaner.clean_file(str(prep_2024_csv), entidad_ids=[9])
+        
+        pd.testing.assert_frame_equal(result.reset_index(drop=True), expected, check_exact=True)
+    
+    def test_entidad_filter_staged(self, tmp_path, cleaner, prep_2024_csv):
+        """Staged copies are filtered on the entidad key, with the same result."""
+        staged_path = tmp_path / 'staged.parquet'
+        ParquetStagingCache(str(tmp_path / 'staging')).write(
+            ElectoralDataReader().read_file(str(prep_2024_csv)), staged_path, 'ID_ENTIDAD'
+        )
+        expected = cleaner.clean_file(str(prep_2024_csv), entidad_ids=[9])
+        
+        queries = []
+        connect = cleaner._connect
+        
+        class RecordingConnection:
+            def __init__(self):
+                self.conn = connect()
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc):
+                self.conn.close()
+            
+            def execute(self, query):
+                queries.append(query)
+                return self.conn.execute(query)
+        
+        cleaner._connect = RecordingConnection
+        result = cleaner.clean_file(str(staged_path), entidad_ids=[9])
+        
+        assert any(f'"{ParquetStagingCache.ENTIDAD_KEY}" IN (9)' in query for query in queries)
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    
+    def test_edge_values(self, cleaner):
+        """Missing keys, unparseable IDs, 'nan' text, fractions and integer-only columns."""
+        df = pd.DataFrame({
+            'ID_ENTIDAD': ['9', ' 09 ', None, '9', '26', 'x', '26'],
+            'ENTIDAD': ['CDMX', 'CDMX', 'CDMX', 'CDMX', 'SONORA', None, 'SONORA'],
+            'ID_DISTRITO_FEDERAL': ['1', '1', '2', '-', '3', '3', '4'],
+            'DISTRITO_FEDERAL': ['D1', 'D1', 'D2', 'D2', 'D3', 'D3', 'D4'],
+            'SECCION': ['0001', '1', '0002', '0002', '7.0', '0005', '0005'],
+            'PAN': ['10', '20', '30', '40', '50', '60', '70'],
+            'PRI': ['1', 'nan', '-', '', ' 4 ', '1.5', 'ilegible'],
+            'MORENA': ['0', '0', '0', '0', '0', '0', '0'],
+            'LISTA_NOMINAL': ['500', '-', '700', '800', '900', '1000', '1100'],
+            'OBSERVACIONES': ['a', 'b', 'c', 'd', 'e', 'f', 'g'],
+        })
+        expected = ElectoralDataCleaner().clean(df)
+        
+        result = cleaner.clean(df)
+        
+        assert expected['PAN'].dtype == np.int64
+        assert expected['PRI'].dtype == np.float64
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    
+    def test_numeric_input(self, cleaner):
+        """Frames with already-numeric vote columns (e.g. typed Parquet) match too."""
+        df = pd.DataFrame({
+            'ID_ENTIDAD': [1, 1, 2],
+            'ENTIDAD': ['A', 'A', 'B'],
+            'ID_DISTRITO_FEDERAL': [1, 1, 2],
+            'SECCION': [10, 10, 11],
+            'PAN': [1, 2, 3],
+            'PES': [0.5, np.nan, 2.0],
+            'LISTA_NOMINAL': [100, 200, 300],
+        })
+        expected = ElectoralDataCleaner().clean(df)
+        
+        result = cleaner.clean(df)
+        
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    
+    def test_compact_profile(self, tmp_path, prep_2024_csv):
+        """With the compact profile both backends give the same values and categoricals."""
+        expected = ElectoralDataCleaner(dtype_profile=CompactDtypeProfile()).clean(
+            ColumnMapper(dtype_profile=CompactDtypeProfile()).homologate_columns(
+                ElectoralDataReader().read_file(str(prep_2024_csv))
+            )
+        )
+        
+        result = DuckDBElectoralDataCleaner(
+            dtype_profile=CompactDtypeProfile(), temp_directory=str(tmp_path / 'spill')
+        ).clean_file(str(prep_2024_csv))
+        
+        assert result['MORENA'].dtype == np.int32
+        assert result['MORENA_PCT'].dtype == np.float32
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_categorical=False)
+    
+    def test_memory_limit(self, tmp_path, prep_2024_csv):
+        """A tight memory limit still gives the same result."""
+        expected = ElectoralDataCleaner().clean(_homologated(prep_2024_csv))
+        cleaner = DuckDBElectoralDataCleaner(memory_limit='64MB', threads=1, temp_directory=str(tmp_path / 'spill'))
+        
+        result = cleaner.clean_file(str(prep_2024_csv))
+        
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    
+    def test_unsupported_file(self, cleaner, tmp_path):
+        """Excel files and archive members are left to the pandas reader."""
+        assert not cleaner.supports_file(str(tmp_path / 'PRES_2024.xlsx'))
+        with pytest.raises(ValueError, match="Unsupported file"):
+            cleaner.clean_file(str(tmp_path / 'PRES_2024.xlsx'))
+
+
+class TestOrchestratorDuckDB:
+    """The duckdb backend cleans files in place and saves the same tables."""
+    
+    def test_matches_pandas_backend(self, tmp_path, prep_2024_csv, monkeypatch):
+        """The raw CSV is never parsed by pandas, and the saved tables are identical."""
+        expected = CleanVotesOrchestrator(db_path=str(tmp_path / 'pandas.db'), use_staging=False)
+        expected.process_electoral_file(str(prep_2024_csv), election_name='PRES_2024', election_date='2024-06-02')
+        
+        orchestrator = CleanVotesOrchestrator(
+            db_path=str(tmp_path / 'duckdb.db'), use_staging=False, cleaner_backend='duckdb',
+            cleaner_options={'temp_directory': str(tmp_path / 'spill')}
+        )
+        monkeypatch.setattr(orchestrator.reader, '_read_csv', lambda *a, **k: pytest.fail("CSV read by pandas"))
+        orchestrator.process_electoral_file(str(prep_2024_csv), election_name='PRES_2024', election_date='2024-06-02')
+        
+        pd.testing.assert_frame_equal(
+            orchestrator.load_election_data('PRES_2024', 9),
+            expected.load_election_data('PRES_2024', 9)
+        )
+        assert orchestrator.get_election_info('PRES_2024', 9)['metadata']['source_encoding'] == 'utf-8'
+    
+    def test_reads_staged_copy(self, tmp_path, prep_2024_csv):
+        """An existing staged Parquet copy is queried instead of the raw CSV."""
+        orchestrator = CleanVotesOrchestrator(
+            db_path=str(tmp_path / 'electoral.db'), cleaner_backend='duckdb',
+            cleaner_options={'temp_directory': str(tmp_path / 'spill')}
+        )
+        staged_path = orchestrator._staged_path(str(prep_2024_csv))
+        orchestrator.staging.write(
+            ElectoralDataReader().read_file(str(prep_2024_csv)), staged_path, 'ID_ENTIDAD'
+        )
+        
+        sources = []
+        clean_file = orchestrator.cleaner.clean_file
+        orchestrator.cleaner.clean_file = lambda path, *a, **k: sources.append(path) or clean_file(path, *a, **k)
+        df = orchestrator.process_electoral_file(
+            str(prep_2024_csv), election_name='PRES_2024', election_date='2024-06-02', save_to_db=False
+        )
+        
+        expected = ElectoralDataCleaner().clean(_homologated(prep_2024_csv))
+        assert sources == [str(staged_path)]
+        pd.testing.assert_frame_equal(df, expected.dropna(subset=['ID_ENTIDAD']).reset_index(drop=True))
@@ -0,0 +1,113 @@
+"""
+Geometry Cache Tests
+====================
+
+Tests for the LRU cache of prepared section GeoDataFrames.
+"""
+
+import os
+import pickle
+
+import pandas as pd
+import pytest
+
+from analytics.clean_votes import GeometryCache, GeometryMerger, CleanVotesOrchestrator, get_geometry_cache
+from .conftest import write_seccion_shp, seccion_votes
+
+
+def _shapefile(base_dir, entidad_id):
+    return base_dir / 'shapefiles_peepjf' / f'{entidad_id}_X' / 'SECCION.shp'
+
+
+@pytest.fixture
+def cache():
+    return GeometryCache()
+
+
+class TestGeometryCache:
+    """Repeat merges are served from memory."""
+    
+    def test_repeat_merge_is_a_hit(self, shapefile_base_dir, cache, monkeypatch):
+        """The second merge of a shapefile does not read it again."""
+        merger = GeometryMerger(str(shapefile_base_dir), geometry_cache=cache)
+        first = merger.merge_with_shapefile(seccion_votes(9), entidad_id=9, shapefile_type='peepjf')
+        
+        monkeypatch.setattr('geopandas.read_file', lambda *a, **k: pytest.fail("shapefile read again"))
+        second = merger.merge_with_shapefile(seccion_votes(9), entidad_id=9, shapefile_type='peepjf')
+        
+        pd.testing.assert_frame_equal(first, second)
+        assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    
+    def test_modified_file_is_reloaded(self, tmp_path, cache):
+        """A new mtime is a new key, and replaces the old entry."""
+        path = write_seccion_shp(_shapefile(tmp_path, 9), 9)
+        merger = GeometryMerger(str(tmp_path), geometry_cache=cache)
+        merger.merge_with_shapefile(seccion_votes(9), shapefile_path=str(path))
+        
+        write_seccion_shp(path, 9, n_sections=2)
+        os.utime(path.with_suffix('.dbf'), ns=(0, os.stat(path).st_mtime_ns + 10**9))
+        gdf = merger.merge_with_shapefile(seccion_votes(9), shapefile_path=str(path))
+        
+        assert len(gdf) == 2
+        assert cache.stats()['misses'] == 2 and cache.stats()['entries'] == 1
+    
+    def test_key_uses_shapefile_signature(self, tmp_path, cache):
+        """A .dbf rewritten within the same mtime is still a new key (its size changed)."""
+        path = write_seccion_shp(_shapefile(tmp_path, 9), 9)
+        merger = GeometryMerger(str(tmp_path), geometry_cache=cache)
+        merger.merge_with_shapefile(seccion_votes(9), shapefile_path=str(path))
+        
+        mtimes = {suffix: os.stat(path.with_suffix(suffix)).st_mtime_ns for suffix in ('.shp', '.dbf', '.shx')}
+        write_seccion_shp(path, 9, n_sections=2)
+        for suffix, mtime in mtimes.items():
+            os.utime(path.with_suffix(suffix), ns=(0, mtime))
+        
+        assert cache.get(path, 'peepjf', merger.columns) is None
+    
+    def test_lru_eviction(self, tmp_path):
+        """The least recently used entry is evicted past max_entries."""
+        cache = GeometryCache(max_entries=2)
+        paths = [write_seccion_shp(_shapefile(tmp_path, e), e) for e in (1, 9, 26)]
+        merger = GeometryMerger(str(tmp_path), geometry_cache=cache)
+        
+        for entidad_id, path in zip((1, 9, 1, 26), (paths[0], paths[1], paths[0], paths[2])):
+            merger.merge_with_shapefile(seccion_votes(entidad_id), shapefile_path=str(path))
+        
+        assert cache.get(paths[0], 'peepjf', merger.columns) is not None
+        assert cache.get(paths[1], 'peepjf', merger.columns) is None
+        assert cache.stats()['evictions'] == 1
+    
+    def test_byte_bound(self, tmp_path):
+        """Entries larger than max_bytes are not cached."""
+        cache = GeometryCache(max_bytes=1024)
+        path = write_seccion_shp(_shapefile(tmp_path, 9), 9)
+        
+        GeometryMerger(str(tmp_path), geometry_cache=cache).merge_with_shapefile(seccion_votes(9), shapefile_path=str(path))
+        
+        assert cache.stats()['entries'] == 0
+    
+    def test_shared_by_default(self, tmp_path, shapefile_base_dir):
+        """Orchestrators and mergers without their own cache share the process-wide one."""
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), shapefile_base_dir=str(shapefile_base_dir))
+        
+        assert orchestrator.geometry_merger.geometry_cache is get_geometry_cache()
+        assert GeometryMerger().geometry_cache is get_geometry_cache()
+    
+    def test_orchestrator_cache(self, tmp_path, shapefile_base_dir):
+        """An orchestrator given its own cache bounds geometry retention with it."""
+        cache = GeometryCache(max_entries=1)
+        orchestrator = CleanVotesOrchestrator(
+            db_path=str(tmp_path / 'electoral.db'), shapefile_base_dir=str(shapefile_base_dir), geometry_cache=cache
+        )
+        
+        assert orchestrator.geometry_merger.geometry_cache is cache
+    
+    def test_pickle_drops_entries(self, shapefile_base_dir, cache):
+        """Worker processes receive the bounds, not the cached polygons."""
+        merger = GeometryMerger(str(shapefile_base_dir), geometry_cache=cache)
+        merger.merge_with_shapefile(seccion_votes(9), entidad_id=9, shapefile_type='peepjf')
+        
+        copy = pickle.loads(pickle.dumps(merger)).geometry_cache
+        
+        assert copy.stats()['entries'] == 0
+        assert copy.max_bytes == cache.max_bytes
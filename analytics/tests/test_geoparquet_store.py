@@ -0,0 +1,110 @@
+"""
+GeoParquet Store Tests
+======================
+
+Tests for the GeoParquet copies of SECCION shapefiles and how the geometry
+merge reads them.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from analytics.clean_votes import GeoParquetStore, GeometryCache, GeometryMerger
+from .conftest import write_seccion_shp, seccion_votes
+
+
+def _touch(path):
+    """Move a shapefile's .dbf mtime forward, as an edit would."""
+    dbf_file = path.with_suffix('.dbf')
+    os.utime(dbf_file, ns=(0, os.stat(dbf_file).st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def store(shapefile_base_dir):
+    store = GeoParquetStore(str(shapefile_base_dir))
+    store.build()
+    return store
+
+
+class TestGeoParquetStore:
+    """Shapefiles are converted once and read back with stable types."""
+    
+    def test_build(self, shapefile_base_dir, store):
+        """Every catalogued shapefile gets a copy and a manifest entry."""
+        assert len(list(store.store_dir.rglob('*.parquet'))) == 3
+        assert (store.store_dir / GeoParquetStore.MANIFEST_NAME).exists()
+        assert store.is_current(shapefile_base_dir / 'shapefiles_peepjf' / '9_CDMX' / '09' / 'SECCION.shp')
+    
+    def test_types_and_crs(self, shapefile_base_dir, store):
+        """Merge keys are Int32 and the CRS is kept."""
+        gdf = store.read(shapefile_base_dir / 'shapefiles_peepjf' / '9_CDMX' / '09' / 'SECCION.shp')
+        
+        assert str(gdf['ENTIDAD'].dtype) == 'Int32'
+        assert str(gdf['SECCION'].dtype) == 'Int32'
+        assert gdf.crs.to_epsg() == 32614
+        assert len(gdf) == 40
+    
+    def test_column_projection(self, shapefile_base_dir, store):
+        """Only the requested columns (and geometry) are read; unknown ones are ignored."""
+        gdf = store.read(
+            shapefile_base_dir / 'shapefiles_peepjf' / '9_CDMX' / '09' / 'SECCION.shp',
+            columns=['ENTIDAD', 'SECCION', 'NOT_A_COLUMN']
+        )
+        
+        assert list(gdf.columns) == ['ENTIDAD', 'SECCION', 'geometry']
+    
+    def test_rebuild_converts_stale_only(self, shapefile_base_dir, store):
+        """A rebuild skips current copies and converts changed shapefiles."""
+        assert store.build() == 0
+        
+        path = shapefile_base_dir / 'shapefiles_peepjf' / '1_Aguascalientes' / '01' / 'SECCION.shp'
+        write_seccion_shp(path, 1, n_sections=5)
+        _touch(path)
+        
+        assert not store.is_current(path)
+        assert store.build() == 1
+        assert len(store.read(path)) == 5
+
+
+class TestMergeFromStore:
+    """GeometryMerger reads current copies instead of the shapefiles."""
+    
+    def test_same_result_without_reading_shapefile(self, tmp_path, shapefile_base_dir, store, monkeypatch):
+        """The merge output is identical and the shapefile is never opened."""
+        expected = GeometryMerger(
+            str(shapefile_base_dir), geometry_cache=GeometryCache(),
+            geoparquet_store=GeoParquetStore(str(shapefile_base_dir), store_dir=str(tmp_path / 'empty_store'))
+        ).merge_with_shapefile(seccion_votes(9), entidad_id=9, shapefile_type='peepjf')
+        
+        monkeypatch.setattr('geopandas.read_file', lambda *a, **k: pytest.fail("shapefile read"))
+        result = GeometryMerger(
+            str(shapefile_base_dir), geometry_cache=GeometryCache()
+        ).merge_with_shapefile(seccion_votes(9), entidad_id=9, shapefile_type='peepjf')
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_stale_copy_falls_back_to_shapefile(self, shapefile_base_dir, store):
+        """An edited shapefile is read directly until the store is rebuilt."""
+        path = shapefile_base_dir / 'shapefiles_peepjf' / '9_CDMX' / '09' / 'SECCION.shp'
+        write_seccion_shp(path, 9, n_sections=2)
+        _touch(path)
+        
+        gdf = GeometryMerger(
+            str(shapefile_base_dir), geometry_cache=GeometryCache()
+        ).merge_with_shapefile(seccion_votes(9), shapefile_path=str(path))
+        
+        assert len(gdf) == 2
+    
+    def test_columns(self, shapefile_base_dir, store):
+        """Mergers given columns load only those attributes."""
+        gdf = GeometryMerger(
+            str(shapefile_base_dir), geometry_cache=GeometryCache(), columns=['ENTIDAD', 'SECCION', 'MUNICIPIO']
+        ).merge_with_shapefile(seccion_votes(9), entidad_id=9, shapefile_type='peepjf')
+        
+        assert 'MUNICIPIO' in gdf.columns
+        assert 'DISTRITO_F' not in gdf.columns and 'CONTROL' not in gdf.columns
+
@@ -0,0 +1,412 @@
+"""
+Clean Votes Orchestrator Tests
+==============================
+
+Tests for the end-to-end read, clean and save workflow.
+"""
+
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.clean_votes import CleanVotesOrchestrator, SectionRollup
+from analytics.clean_votes import orchestrator as orchestrator_module
+from analytics.clean_votes.orchestrator import _prepare_entidad
+
+from .conftest import write_prep_csv, PREP_2024_HEADER
+
+
+def _process(orchestrator, path, **kwargs):
+    return orchestrator.process_electoral_file(
+        str(path),
+        election_name='PRES_2024',
+        election_date='2024-06-02',
+        save_to_db=False,
+        **kwargs
+    )
+
+
+class _FailingRollup(SectionRollup):
+    """Fails for CDMX; module-level so it can be pickled into pool workers."""
+    
+    def build(self, df, levels=None):
+        if (df['ID_ENTIDAD'] == 9).any():
+            raise RuntimeError("rollup failed")
+        return super().build(df, levels)
+
+
+def _prepare_failing_for_cdmx(*args, **kwargs):
+    """Fails for CDMX; module-level so it can be pickled into pool workers."""
+    if args[-1] == 9:
+        raise RuntimeError("worker failed")
+    return _prepare_entidad(*args, **kwargs)
+
+
+class TestSourceEncoding:
+    """The detected encoding is stored and reused on later runs."""
+    
+    def test_encoding_recorded_and_reused(self, tmp_path, prep_2024_latin1_csv, monkeypatch):
+        """A second run goes straight to the recorded codec."""
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        orchestrator.process_electoral_file(
+            str(prep_2024_latin1_csv),
+            election_name='PRES_2024',
+            election_date='2024-06-02'
+        )
+        
+        info = orchestrator.get_election_info('PRES_2024', 9)
+        assert info['metadata']['source_encoding'] == 'latin-1'
+        
+        monkeypatch.setattr(
+            orchestrator.reader, '_detect_sample_encoding',
+            lambda raw: pytest.fail("encoding was detected again")
+        )
+        df = orchestrator.process_electoral_file(
+            str(prep_2024_latin1_csv),
+            election_name='PRES_2024',
+            election_date='2024-06-02'
+        )
+        
+        assert 'CIUDAD DE MÉXICO' in set(df['ENTIDAD'])
+        assert orchestrator.reader.last_encoding == 'latin-1'
+    
+    def test_replaced_file_detected_again(self, tmp_path, prep_2024_latin1_csv):
+        """A UTF-8 export replacing a latin-1 file at the same path is not read as latin-1."""
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        kwargs = dict(election_name='PRES_2024', election_date='2024-06-02')
+        orchestrator.process_electoral_file(str(prep_2024_latin1_csv), **kwargs)
+        
+        write_prep_csv(prep_2024_latin1_csv, PREP_2024_HEADER, n_rows=700, encoding='utf-8')
+        df = orchestrator.process_electoral_file(str(prep_2024_latin1_csv), **kwargs)
+        
+        assert 'CIUDAD DE MÉXICO' in set(df['ENTIDAD'])
+        assert orchestrator.reader.last_encoding == 'utf-8'
+        assert orchestrator.get_election_info('PRES_2024', 9)['metadata']['source_encoding'] == 'utf-8'
+
+
+class TestParquetStaging:
+    """Raw files are parsed once; later runs read the staged Parquet copy."""
+    
+    @pytest.fixture
+    def orchestrator(self, tmp_path):
+        return CleanVotesOrchestrator(db_path=str(tmp_path / 'db' / 'electoral.db'))
+    
+    @pytest.fixture
+    def expected(self, tmp_path, prep_2024_csv):
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        return _process(orchestrator, prep_2024_csv)
+    
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_second_run_reads_staged_copy(self, orchestrator, prep_2024_csv, expected, monkeypatch, streaming):
+        """The staged copy gives the same cleaned output without touching the raw CSV."""
+        first = _process(orchestrator, prep_2024_csv, streaming=streaming, chunksize=250)
+        staged = list(orchestrator.staging.staging_dir.glob('*.parquet'))
+        assert len(staged) == 1
+        
+        monkeypatch.setattr(orchestrator.reader, '_read_csv', lambda *a, **k: pytest.fail("raw CSV re-parsed"))
+        monkeypatch.setattr(orchestrator.reader, '_iter_csv_chunks', lambda *a, **k: pytest.fail("raw CSV re-parsed"))
+        second = _process(orchestrator, prep_2024_csv, streaming=streaming, chunksize=250)
+        
+        pd.testing.assert_frame_equal(first, expected)
+        pd.testing.assert_frame_equal(second, expected)
+    
+    def test_content_change_invalidates(self, orchestrator, prep_2024_csv):
+        """Editing the raw file stages a new copy."""
+        _process(orchestrator, prep_2024_csv)
+        with open(prep_2024_csv, 'a', encoding='utf-8') as f:
+            f.write('\r\n')
+        _process(orchestrator, prep_2024_csv)
+        
+        assert len(list(orchestrator.staging.staging_dir.glob('*.parquet'))) == 2
+    
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_first_run_is_projected(self, orchestrator, prep_2024_csv, monkeypatch, streaming):
+        """The raw file is read projected and only the projected columns are staged."""
+        import pyarrow.parquet as pq
+        
+        requested = []
+        read_file, read_file_chunks = orchestrator.reader.read_file, orchestrator.reader.read_file_chunks
+        monkeypatch.setattr(orchestrator.reader, 'read_file', lambda p, **k: requested.append(k) or read_file(p, **k))
+        monkeypatch.setattr(
+            orchestrator.reader, 'read_file_chunks', lambda p, **k: requested.append(k) or read_file_chunks(p, **k)
+        )
+        _process(orchestrator, prep_2024_csv, streaming=streaming, chunksize=250)
+        
+        staged_path = orchestrator._staged_path(str(prep_2024_csv))
+        columns = pq.read_schema(staged_path).names
+        assert requested[0]['usecols'] is not None
+        assert staged_path.name.endswith('-projected.parquet')
+        assert 'PAN' in columns and 'OBSERVACIONES' not in columns and 'CLAVE_ACTA' not in columns
+    
+    def test_projection_change_restages(self, tmp_path, orchestrator, prep_2024_csv, expected):
+        """A copy missing columns the projection now selects is not reused."""
+        _process(orchestrator, prep_2024_csv)
+        staged_path = orchestrator._staged_path(str(prep_2024_csv))
+        
+        assert orchestrator.staging.covers(staged_path, orchestrator._column_projection())
+        assert not orchestrator.staging.covers(staged_path, lambda col: True)
+        
+        full = CleanVotesOrchestrator(
+            db_path=str(tmp_path / 'db' / 'electoral.db'), project_columns=False
+        )
+        pd.testing.assert_frame_equal(_process(full, prep_2024_csv), expected)
+        assert len(list(orchestrator.staging.staging_dir.glob('*.parquet'))) == 2
+    
+    def test_streamed_row_groups(self, orchestrator, prep_2024_csv):
+        """Small chunks are buffered per entidad instead of becoming tiny row groups."""
+        import pyarrow.parquet as pq
+        
+        _process(orchestrator, prep_2024_csv, streaming=True, chunksize=50)
+        
+        metadata = pq.ParquetFile(orchestrator._staged_path(str(prep_2024_csv))).metadata
+        key_index = metadata.schema.names.index(orchestrator.staging.ENTIDAD_KEY)
+        keys = []
+        for i in range(metadata.num_row_groups):
+            statistics = metadata.row_group(i).column(key_index).statistics
+            if statistics.has_min_max:
+                assert statistics.min == statistics.max
+                keys.append(statistics.min)
+        
+        # One row group per entidad, plus at most one for rows without an entidad
+        assert sorted(keys) == [1, 9, 26]
+        assert metadata.num_row_groups <= 4
+    
+    def test_unchanged_file_not_rehashed(self, orchestrator, prep_2024_csv, monkeypatch):
+        """The content hash is reused while the raw file's mtime/size are unchanged."""
+        _process(orchestrator, prep_2024_csv)
+        staged_path = orchestrator._staged_path(str(prep_2024_csv))
+        
+        fresh = CleanVotesOrchestrator(db_path=str(orchestrator.db_path))
+        monkeypatch.setattr(fresh.staging, 'content_hash', lambda *a: pytest.fail("raw file hashed again"))
+        assert fresh._staged_path(str(prep_2024_csv)) == staged_path
+        
+        monkeypatch.undo()
+        with open(prep_2024_csv, 'a', encoding='utf-8') as f:
+            f.write('\r\n')
+        assert fresh._staged_path(str(prep_2024_csv)) != staged_path
+    
+    @pytest.mark.parametrize("bad_id", ['99999', '1.5'])
+    def test_out_of_range_entidad_staged(self, tmp_path, orchestrator, prep_2024_csv, bad_id):
+        """An ID_ENTIDAD outside Int16 gets no staging key instead of failing the file."""
+        lines = prep_2024_csv.read_bytes().split(b'\r\n')
+        row = lines[10].split(b',')
+        row[PREP_2024_HEADER.index('ID_ENTIDAD')] = bad_id.encode()
+        lines[10] = b','.join(row)
+        prep_2024_csv.write_bytes(b'\r\n'.join(lines))
+        
+        unstaged = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        expected = _process(unstaged, prep_2024_csv)
+        
+        pd.testing.assert_frame_equal(_process(orchestrator, prep_2024_csv), expected)
+        assert orchestrator._staged_path(str(prep_2024_csv)).exists()
+    
+    def test_abandoned_stream_not_staged(self, orchestrator, prep_2024_csv):
+        """A partially consumed stream leaves no staged file."""
+        staged_path = orchestrator._staged_path(str(prep_2024_csv))
+        chunks = orchestrator._read_source_chunks(str(prep_2024_csv), staged_path, None, 100)
+        next(chunks)
+        chunks.close()
+        
+        assert not staged_path.exists()
+        assert list(orchestrator.staging.staging_dir.glob('*.parquet*')) == []
+
+
+class TestEntidadPushdown:
+    """Processing a subset of entidades only reads their rows."""
+    
+    @pytest.fixture
+    def expected_cdmx(self, tmp_path, prep_2024_csv):
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'full.db'), use_staging=False)
+        df = _process(orchestrator, prep_2024_csv)
+        return df[df['ID_ENTIDAD'] == 9].reset_index(drop=True)
+    
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_staged_copy_pushdown(self, tmp_path, prep_2024_csv, expected_cdmx, streaming):
+        """A staged copy is grouped by entidad and filtered by row group."""
+        import pyarrow.parquet as pq
+        
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'db' / 'electoral.db'))
+        _process(orchestrator, prep_2024_csv, streaming=streaming, chunksize=250)
+        
+        staged_path = orchestrator._staged_path(str(prep_2024_csv))
+        metadata = pq.ParquetFile(staged_path).metadata
+        key_index = metadata.schema.names.index(orchestrator.staging.ENTIDAD_KEY)
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(key_index).statistics
+            assert stats.min == stats.max
+        
+        df = _process(orchestrator, prep_2024_csv, streaming=streaming, entidad_ids=[9])
+        
+        pd.testing.assert_frame_equal(df.reset_index(drop=True), expected_cdmx)
+    
+    def test_parquet_source_pushdown(self, tmp_path, prep_2024_csv, expected_cdmx):
+        """String entidad ids in a Parquet source match with or without zero padding."""
+        from analytics.clean_votes import ElectoralDataReader
+        
+        parquet_path = tmp_path / 'PRES_2024.parquet'
+        ElectoralDataReader().read_file(str(prep_2024_csv)).to_parquet(parquet_path, index=False)
+        
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'))
+        df = _process(orchestrator, parquet_path, entidad_ids=[9])
+        
+        pd.testing.assert_frame_equal(df.reset_index(drop=True), expected_cdmx)
+    
+    def test_zipped_parquet_source_pushdown(self, tmp_path, prep_2024_csv, expected_cdmx):
+        """A Parquet member of a zip bundle is filtered without extracting it."""
+        from analytics.clean_votes import ElectoralDataReader
+        
+        parquet_path = tmp_path / 'PRES_2024.parquet'
+        ElectoralDataReader().read_file(str(prep_2024_csv)).to_parquet(parquet_path, index=False)
+        zip_path = tmp_path / 'PRES_2024.zip'
+        with zipfile.ZipFile(zip_path, 'w') as archive:
+            archive.write(parquet_path, 'PRES_2024.parquet')
+        
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'))
+        df = _process(orchestrator, zip_path / 'PRES_2024.parquet', entidad_ids=[9])
+        
+        pd.testing.assert_frame_equal(df.reset_index(drop=True), expected_cdmx)
+
+
+class TestParallelEntidades:
+    """Per-entidad work fanned out to a process pool, saved by one writer."""
+    
+    def test_matches_sequential(self, tmp_path, prep_2024_csv):
+        """The returned frame, section tables and rollups are the same as with one worker."""
+        sequential = CleanVotesOrchestrator(db_path=str(tmp_path / 'sequential.db'), use_staging=False)
+        parallel = CleanVotesOrchestrator(db_path=str(tmp_path / 'parallel.db'), use_staging=False)
+        kwargs = dict(election_name='PRES_2024', election_date='2024-06-02')
+        
+        expected = sequential.process_electoral_file(str(prep_2024_csv), **kwargs)
+        df = parallel.process_electoral_file(str(prep_2024_csv), max_workers=2, **kwargs)
+        
+        pd.testing.assert_frame_equal(df, expected)
+        for entidad_id in expected['ID_ENTIDAD'].unique():
+            pd.testing.assert_frame_equal(
+                parallel.load_election_data('PRES_2024', entidad_id),
+                sequential.load_election_data('PRES_2024', entidad_id)
+            )
+            pd.testing.assert_frame_equal(
+                parallel.load_rollup('PRES_2024', entidad_id, 'distrito'),
+                sequential.load_rollup('PRES_2024', entidad_id, 'distrito')
+            )
+    
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_failing_entidad_is_skipped(self, tmp_path, prep_2024_csv, max_workers, monkeypatch):
+        """An error in one entidad's worker does not stop the others from being saved."""
+        monkeypatch.setattr(orchestrator_module, '_prepare_entidad', _prepare_failing_for_cdmx)
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        
+        df = orchestrator.process_electoral_file(
+            str(prep_2024_csv), election_name='PRES_2024', election_date='2024-06-02', max_workers=max_workers
+        )
+        
+        saved = set(orchestrator.list_available_elections()['entidad_id'])
+        assert 9 not in set(df['ID_ENTIDAD'])
+        assert saved == set(df['ID_ENTIDAD']) and len(saved) > 0
+    
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_failing_rollup_keeps_sections(self, tmp_path, prep_2024_csv, max_workers):
+        """A rollup error only drops that entidad's rollups; its sections are still saved."""
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        orchestrator.rollup = _FailingRollup()
+        
+        df = orchestrator.process_electoral_file(
+            str(prep_2024_csv), election_name='PRES_2024', election_date='2024-06-02', max_workers=max_workers
+        )
+        
+        saved = set(orchestrator.list_available_elections()['entidad_id'])
+        assert saved == set(df['ID_ENTIDAD']) and 9 in saved
+        assert len(orchestrator.load_election_data('PRES_2024', 9)) > 0
+        with pytest.raises(ValueError):
+            orchestrator.load_rollup('PRES_2024', 9, 'distrito')
+        other = min(saved - {9})
+        assert len(orchestrator.load_rollup('PRES_2024', other, 'distrito')) > 0
+    
+    def test_invalid_max_workers(self, tmp_path, prep_2024_csv):
+        """max_workers must be positive."""
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        
+        with pytest.raises(ValueError, match="Invalid max_workers"):
+            _process(orchestrator, prep_2024_csv, max_workers=0)
+
+
+class TestEntidadPartitions:
+    """The cleaned frame is split by entidad once, without copies."""
+    
+    def test_sorted_frame_gives_views(self, tmp_path):
+        """Contiguous entidades become slices sharing the parent's memory."""
+        df = pd.DataFrame({
+            'ID_ENTIDAD': pd.array([1, 1, 2, 2, 2, None], dtype='Int64'),
+            'PAN': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        })
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        
+        partitions = orchestrator._partition_entidades(df)
+        
+        assert list(partitions) == [1, 2]
+        pd.testing.assert_frame_equal(partitions[2], df[df['ID_ENTIDAD'] == 2])
+        assert np.shares_memory(partitions[2]['PAN'].to_numpy(), df['PAN'].to_numpy())
+    
+    def test_unsorted_frame(self, tmp_path):
+        """Interleaved entidades still get exactly their own rows, in order."""
+        df = pd.DataFrame({
+            'ID_ENTIDAD': pd.array([2, 1, 2, 1], dtype='Int64'),
+            'PAN': [1.0, 2.0, 3.0, 4.0],
+        })
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        
+        partitions = orchestrator._partition_entidades(df)
+        
+        for entidad_id in [1, 2]:
+            pd.testing.assert_frame_equal(partitions[entidad_id], df[df['ID_ENTIDAD'] == entidad_id])
+
+
+class TestResultModes:
+    """process_electoral_file can stream per-entidad results or return a summary."""
+    
+    @pytest.fixture
+    def expected(self, tmp_path, prep_2024_csv):
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'frame.db'), use_staging=False)
+        return _process(orchestrator, prep_2024_csv)
+    
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_iterator(self, tmp_path, prep_2024_csv, expected, max_workers):
+        """Each entidad is yielded once saved; together they make up the frame result."""
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        
+        results = orchestrator.process_electoral_file(
+            str(prep_2024_csv), election_name='PRES_2024', election_date='2024-06-02',
+            max_workers=max_workers, result_mode='iterator'
+        )
+        assert orchestrator.list_available_elections().empty
+        
+        saved = []
+        for entidad_id, df in results:
+            assert set(df['ID_ENTIDAD']) == {entidad_id}
+            assert entidad_id in set(orchestrator.list_available_elections()['entidad_id'])
+            saved.append(df)
+        
+        combined = pd.concat(saved).sort_values('ID_ENTIDAD', kind='stable')
+        pd.testing.assert_frame_equal(combined.reset_index(drop=True), expected)
+    
+    def test_summary(self, tmp_path, prep_2024_csv, expected):
+        """The summary has the counts the frame result would give."""
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        
+        summary = _process(orchestrator, prep_2024_csv, result_mode='summary')
+        
+        assert summary == {
+            'election_name': 'PRES_2024',
+            'entidades': sorted(expected['ID_ENTIDAD'].unique()),
+            'rows': len(expected),
+            'columns': len(expected.columns),
+            'has_geometry': False,
+        }
+    
+    def test_invalid_result_mode(self, tmp_path, prep_2024_csv):
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        
+        with pytest.raises(ValueError, match="Invalid result_mode"):
+            _process(orchestrator, prep_2024_csv, result_mode='list')
@@ -0,0 +1,133 @@
+"""
+Polars Cleaner Parity Tests
+===========================
+
+Tests that the Polars backend produces the same output as the pandas cleaner.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.clean_votes import (
+    ElectoralDataReader, ElectoralDataCleaner, PolarsElectoralDataCleaner, ColumnMapper,
+    CompactDtypeProfile, CleanVotesOrchestrator
+)
+
+
+def _homologated(path):
+    """Read and homologate a whole file."""
+    return ColumnMapper().homologate_columns(ElectoralDataReader().read_file(str(path)))
+
+
+def _homologated_chunks(path, chunksize):
+    """Read and homologate a file in chunks."""
+    mapper = ColumnMapper()
+    return (mapper.homologate_columns(c) for c in ElectoralDataReader().read_file_chunks(str(path), chunksize=chunksize))
+
+
+class TestPolarsParity:
+    """Same columns, order, values, dtypes and index as the pandas path."""
+    
+    @pytest.mark.parametrize("fixture", ['prep_2024_csv', 'prep_2021_csv'])
+    def test_clean_matches_pandas(self, request, fixture):
+        """In-memory cleaning matches exactly."""
+        df = _homologated(request.getfixturevalue(fixture))
+        expected = ElectoralDataCleaner().clean(df)
+        
+        result = PolarsElectoralDataCleaner().clean(df)
+        
+        assert len(expected) > 0
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    
+    @pytest.mark.parametrize("chunksize", [170, 10_000])
+    def test_clean_chunks_matches_pandas(self, prep_2024_csv, chunksize):
+        """Streaming cleaning matches the pandas in-memory result."""
+        expected = ElectoralDataCleaner().clean(_homologated(prep_2024_csv))
+        
+        result = PolarsElectoralDataCleaner().clean_chunks(_homologated_chunks(prep_2024_csv, chunksize))
+        
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    
+    def test_input_untouched(self, prep_2024_csv):
+        """The caller's frame is not modified."""
+        df = _homologated(prep_2024_csv)
+        before = df.copy()
+        
+        PolarsElectoralDataCleaner().clean(df)
+        
+        pd.testing.assert_frame_equal(df, before)
+    
+    def test_edge_values(self):
+        """Missing keys, unparseable IDs, 'nan' text, fractions and integer-only columns."""
+        df = pd.DataFrame({
+            'ID_ENTIDAD': ['9', ' 09 ', None, '9', '26', 'x', '26'],
+            'ENTIDAD': ['CDMX', 'CDMX', 'CDMX', 'CDMX', 'SONORA', None, 'SONORA'],
+            'ID_DISTRITO_FEDERAL': ['1', '1', '2', '-', '3', '3', '4'],
+            'DISTRITO_FEDERAL': ['D1', 'D1', 'D2', 'D2', 'D3', 'D3', 'D4'],
+            'SECCION': ['0001', '1', '0002', '0002', '7.0', '0005', '0005'],
+            'PAN': ['10', '20', '30', '40', '50', '60', '70'],
+            'PRI': ['1', 'nan', '-', '', ' 4 ', '1.5', 'ilegible'],
+            'MORENA': ['0', '0', '0', '0', '0', '0', '0'],
+            'LISTA_NOMINAL': ['500', '-', '700', '800', '900', '1000', '1100'],
+            'OBSERVACIONES': ['a', 'b', 'c', 'd', 'e', 'f', 'g'],
+        })
+        expected = ElectoralDataCleaner().clean(df)
+        
+        result = PolarsElectoralDataCleaner().clean(df)
+        
+        assert expected['PAN'].dtype == np.int64
+        assert expected['PRI'].dtype == np.float64
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    
+    def test_numeric_input(self):
+        """Frames with already-numeric vote columns (e.g. typed Parquet) match too."""
+        df = pd.DataFrame({
+            'ID_ENTIDAD': [1, 1, 2],
+            'ENTIDAD': ['A', 'A', 'B'],
+            'ID_DISTRITO_FEDERAL': [1, 1, 2],
+            'SECCION': [10, 10, 11],
+            'PAN': [1, 2, 3],
+            'PES': [0.5, np.nan, 2.0],
+            'LISTA_NOMINAL': [100, 200, 300],
+        })
+        expected = ElectoralDataCleaner().clean(df)
+        
+        result = PolarsElectoralDataCleaner().clean(df)
+        
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    
+    def test_compact_profile(self, prep_2024_csv):
+        """With the compact profile both backends give the same values and categoricals."""
+        df = ColumnMapper(dtype_profile=CompactDtypeProfile()).homologate_columns(
+            ElectoralDataReader().read_file(str(prep_2024_csv))
+        )
+        expected = ElectoralDataCleaner(dtype_profile=CompactDtypeProfile()).clean(df)
+        
+        result = PolarsElectoralDataCleaner(dtype_profile=CompactDtypeProfile()).clean(df)
+        
+        assert result['MORENA'].dtype == np.int32
+        assert result['MORENA_PCT'].dtype == np.float32
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_categorical=False)
+
+
+class TestOrchestratorBackend:
+    """cleaner_backend selects the implementation."""
+    
+    def test_polars_backend_matches_pandas(self, tmp_path, prep_2024_csv):
+        """Both backends save the same tables."""
+        results = {}
+        for backend in ['pandas', 'polars']:
+            orchestrator = CleanVotesOrchestrator(
+                db_path=str(tmp_path / f'{backend}.db'), use_staging=False, cleaner_backend=backend
+            )
+            orchestrator.process_electoral_file(str(prep_2024_csv), election_name='PRES_2024', election_date='2024-06-02')
+            results[backend] = orchestrator.load_election_data('PRES_2024', 9)
+        
+        assert isinstance(orchestrator.cleaner, PolarsElectoralDataCleaner)
+        pd.testing.assert_frame_equal(results['polars'], results['pandas'])
+    
+    def test_unknown_backend(self, tmp_path):
+        """Unknown backends are rejected."""
+        with pytest.raises(ValueError, match="cleaner_backend"):
+            CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), cleaner_backend='spark')
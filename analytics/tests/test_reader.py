@@ -0,0 +1,424 @@
+"""
+Electoral Data Reader Tests
+===========================
+
+Tests for file reading, header detection and CSV parse engines.
+"""
+
+import zipfile
+
+import pandas as pd
+import pytest
+
+from analytics.clean_votes import (
+    ElectoralDataReader, ElectoralDataCleaner, ColumnMapper, ParquetStagingCache, infer_election_metadata
+)
+from analytics.clean_votes import archives
+from analytics.clean_votes.archives import list_archive_members, split_archive_path
+
+
+def _clean(reader, path):
+    df = reader.read_file(str(path))
+    return ElectoralDataCleaner().clean(ColumnMapper().homologate_columns(df))
+
+
+class TestCsvEngines:
+    """The PyArrow engine must be a drop-in replacement for pandas."""
+    
+    def test_invalid_engine(self):
+        """Unknown engines are rejected."""
+        with pytest.raises(ValueError):
+            ElectoralDataReader(csv_engine='polars')
+    
+    @pytest.mark.parametrize("fixture_name", ["prep_2024_csv", "prep_2021_csv"])
+    def test_pyarrow_matches_pandas(self, request, fixture_name):
+        """Both engines produce the same cleaned output."""
+        path = request.getfixturevalue(fixture_name)
+        
+        expected = _clean(ElectoralDataReader(csv_engine='pandas'), path)
+        result = _clean(ElectoralDataReader(csv_engine='pyarrow'), path)
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
+    @pytest.fixture
+    def ragged_csv(self, prep_2024_csv):
+        """2024 file with a truncated row and a row with an extra field."""
+        lines = prep_2024_csv.read_bytes().split(b'\r\n')
+        lines[100] = b','.join(lines[100].split(b',')[:12])
+        lines[200] = lines[200] + b',EXTRA'
+        prep_2024_csv.write_bytes(b'\r\n'.join(lines))
+        return prep_2024_csv
+    
+    def test_pyarrow_matches_pandas_on_ragged_rows(self, ragged_csv):
+        """Short rows are padded and long rows skipped by both engines."""
+        pandas_reader = ElectoralDataReader(csv_engine='pandas')
+        arrow_reader = ElectoralDataReader(csv_engine='pyarrow')
+        
+        for reader in (pandas_reader, arrow_reader):
+            claves = set(reader.read_file(str(ragged_csv)).iloc[:, 0].str.strip())
+            assert 'CL97' in claves and 'CL197' not in claves
+        
+        # Padded rows come after the rows parsed with them, so only the
+        # per-section labels taken from the first casilla may differ
+        labels = ElectoralDataCleaner.DESCRIPTIVE_COLUMNS
+        expected = _clean(pandas_reader, ragged_csv).drop(columns=labels, errors='ignore')
+        result = _clean(arrow_reader, ragged_csv).drop(columns=labels, errors='ignore')
+        pd.testing.assert_frame_equal(result, expected)
+        
+        cleaner = ElectoralDataCleaner()
+        streamed = cleaner.clean_chunks(
+            ColumnMapper().homologate_columns(chunk)
+            for chunk in arrow_reader.read_file_chunks(str(ragged_csv), chunksize=250)
+        )
+        pd.testing.assert_frame_equal(streamed.drop(columns=labels, errors='ignore'), expected)
+    
+    @pytest.mark.parametrize("engine", ["pandas", "pyarrow"])
+    def test_no_header_uses_sniffed_delimiter(self, tmp_path, engine):
+        """Pipe-delimited files without a recognized header are still split on pipes."""
+        path = tmp_path / 'resultados.csv'
+        path.write_text('ESTADO|VOTOS|NULOS\r\n9|10|1\r\n26|20|2\r\n')
+        
+        df = ElectoralDataReader(csv_engine=engine).read_file(str(path))
+        
+        assert list(df.columns) == ['ESTADO', 'VOTOS', 'NULOS']
+        assert df['VOTOS'].dropna().tolist() == ['10', '20']
+    
+    def test_pyarrow_reads_strings_and_drops_empty_columns(self, prep_2021_csv):
+        """Header detection, pipe delimiter and trailing-pipe cleanup are kept."""
+        df = ElectoralDataReader(csv_engine='pyarrow').read_file(str(prep_2021_csv))
+        
+        assert df.columns[0] == 'CLAVE_CASILLA'
+        assert '' not in df.columns
+        assert (df.dtypes == object).all()
+        assert len(df) == 600
+    
+    def test_pyarrow_chunks(self, prep_2024_csv):
+        """Streaming with PyArrow honours chunksize."""
+        reader = ElectoralDataReader(csv_engine='pyarrow')
+        sizes = [len(chunk) for chunk in reader.read_file_chunks(str(prep_2024_csv), chunksize=250)]
+        
+        assert sizes == [250, 250, 100]
+    
+    @pytest.mark.parametrize("engine", ["pandas", "pyarrow"])
+    def test_latin1_fallback(self, tmp_path, engine):
+        """Non UTF-8 files are decoded as latin-1."""
+        path = tmp_path / 'latin1.csv'
+        path.write_bytes('ID_ENTIDAD,ENTIDAD,SECCION\r\n9,CIUDAD DE MÉXICO,1\r\n'.encode('latin-1'))
+        
+        df = ElectoralDataReader(csv_engine=engine).read_file(str(path))
+        
+        assert df['ENTIDAD'].iloc[0] == 'CIUDAD DE MÉXICO'
+
+
+class TestEncodingDetection:
+    """The encoding is picked from the header sample before parsing."""
+    
+    @pytest.mark.parametrize("engine", ["pandas", "pyarrow"])
+    def test_latin1_detected_up_front(self, prep_2024_latin1_csv, engine, monkeypatch):
+        """A latin-1 file is parsed once, with the right codec."""
+        reader = ElectoralDataReader(csv_engine=engine)
+        method = '_read_csv_arrow' if engine == 'pyarrow' else '_read_csv'
+        original = getattr(reader, method)
+        calls = []
+        
+        def spy(file_path, encoding, usecols=None):
+            calls.append(encoding)
+            return original(file_path, encoding, usecols)
+        
+        monkeypatch.setattr(reader, method, spy)
+        df = reader.read_file(str(prep_2024_latin1_csv))
+        
+        assert calls == [None]
+        assert reader.last_encoding == 'latin-1'
+        assert 'CIUDAD DE MÉXICO' in set(df['ENTIDAD'])
+    
+    def test_utf8_detected(self, prep_2024_csv):
+        """UTF-8 files keep the UTF-8 codec."""
+        reader = ElectoralDataReader()
+        reader.read_file(str(prep_2024_csv))
+        
+        assert reader.detect_encoding(str(prep_2024_csv)) == 'utf-8'
+        assert reader.last_encoding == 'utf-8'
+    
+    def test_multibyte_character_cut_by_sample(self, tmp_path, monkeypatch):
+        """A UTF-8 character split at the end of the sample is not a decode error."""
+        path = tmp_path / 'cut.csv'
+        path.write_bytes('ID_ENTIDAD,ENTIDAD,SECCION\r\n9,CIUDAD DE MÉXICO,1\r\n'.encode('utf-8'))
+        cut = path.read_bytes().index('É'.encode('utf-8')) + 1
+        monkeypatch.setattr(ElectoralDataReader, 'SAMPLE_SIZE', cut)
+        
+        assert ElectoralDataReader().detect_encoding(str(path)) == 'utf-8'
+    
+    def test_pyarrow_retries_late_decode_error(self, tmp_path, monkeypatch):
+        """Bytes that stop being UTF-8 after the sample are re-read as latin-1."""
+        path = tmp_path / 'late_latin1.csv'
+        path.write_bytes(b'ID_ENTIDAD,ENTIDAD,SECCION\r\n1,AGS,1\r\n' + '9,CIUDAD DE MÉXICO,2\r\n'.encode('latin-1'))
+        monkeypatch.setattr(ElectoralDataReader, 'SAMPLE_SIZE', 30)
+        reader = ElectoralDataReader(csv_engine='pyarrow')
+        
+        df = reader.read_file(str(path))
+        
+        assert df['ENTIDAD'].tolist() == ['AGS', 'CIUDAD DE MÉXICO']
+        assert reader.last_encoding == 'latin-1'
+    
+    def test_pyarrow_parse_error_not_retried(self, prep_2024_csv, monkeypatch):
+        """CSV errors unrelated to the encoding are raised, not retried as latin-1."""
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+        
+        calls = []
+        
+        def failing_read_csv(*args, **kwargs):
+            calls.append(kwargs['read_options'].encoding)
+            raise pa.ArrowInvalid("CSV parse error: Expected 23 columns, got 24")
+        
+        monkeypatch.setattr(pa_csv, 'read_csv', failing_read_csv)
+        with pytest.raises(pa.ArrowInvalid, match="Expected 23 columns"):
+            ElectoralDataReader(csv_engine='pyarrow').read_file(str(prep_2024_csv))
+        
+        assert calls == ['utf-8']
+    
+    def test_explicit_encoding_skips_detection(self, prep_2024_latin1_csv, monkeypatch):
+        """A known encoding is used as-is."""
+        reader = ElectoralDataReader()
+        monkeypatch.setattr(reader, '_detect_sample_encoding', lambda raw: pytest.fail("detection ran"))
+        
+        reader.read_file(str(prep_2024_latin1_csv), encoding='latin-1')
+        
+        assert reader.last_encoding == 'latin-1'
+
+
+class TestColumnProjection:
+    """Read-time projection must not change the cleaned output."""
+    
+    @staticmethod
+    def _projection():
+        cleaner = ElectoralDataCleaner()
+        mapper = ColumnMapper()
+        return lambda column: cleaner.is_needed_column(mapper.standardize_column_name(column))
+    
+    @pytest.mark.parametrize("engine", ["pandas", "pyarrow"])
+    @pytest.mark.parametrize("fixture_name", ["prep_2024_csv", "prep_2021_csv"])
+    def test_projection_matches_full_read(self, request, fixture_name, engine):
+        """Cleaning a projected read gives the same result as a full read."""
+        path = request.getfixturevalue(fixture_name)
+        reader = ElectoralDataReader(csv_engine=engine)
+        
+        df_projected = reader.read_file(str(path), usecols=self._projection())
+        result = ElectoralDataCleaner().clean(ColumnMapper().homologate_columns(df_projected))
+        expected = _clean(reader, path)
+        
+        assert 'OBSERVACIONES' not in df_projected.columns
+        assert 'CLAVE_CASILLA' not in df_projected.columns
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_parquet_projection_keeps_numeric_columns(self, tmp_path):
+        """Parquet projection resolves names from the schema and keeps typed numbers."""
+        path = tmp_path / 'votes.parquet'
+        pd.DataFrame({
+            'ID_ENTIDAD': ['1'], 'SECCION': ['10'], 'OBSERVACIONES': ['x'], 'PES': [3],
+        }).to_parquet(path)
+        
+        df = ElectoralDataReader().read_file(str(path), usecols=self._projection())
+        
+        assert list(df.columns) == ['ID_ENTIDAD', 'SECCION', 'PES']
+
+
+class TestParquetFilters:
+    """Row filters are pushed down to Parquet row groups."""
+    
+    @pytest.fixture
+    def parquet_path(self, tmp_path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        path = tmp_path / 'grouped.parquet'
+        with pq.ParquetWriter(path, pa.schema([('ID_ENTIDAD', pa.int64()), ('SECCION', pa.string())])) as writer:
+            for entidad_id in (1, 9, 26):
+                writer.write_table(pa.table({
+                    'ID_ENTIDAD': [entidad_id] * 5,
+                    'SECCION': [str(s) for s in range(5)]
+                }))
+        return path
+    
+    def test_read_file_filters(self, parquet_path):
+        """Only the requested entidad is returned."""
+        df = ElectoralDataReader().read_file(str(parquet_path), filters=[('ID_ENTIDAD', 'in', [9])])
+        
+        assert len(df) == 5
+        assert set(df['ID_ENTIDAD']) == {9}
+    
+    def test_read_file_chunks_filters(self, parquet_path):
+        """Streaming applies the same filter."""
+        chunks = ElectoralDataReader().read_file_chunks(
+            str(parquet_path), chunksize=3, filters=[('ID_ENTIDAD', 'in', [1, 26])]
+        )
+        df = pd.concat(list(chunks))
+        
+        assert len(df) == 10
+        assert set(df['ID_ENTIDAD']) == {1, 26}
+    
+    def test_csv_filters_rejected(self, prep_2024_csv):
+        """Text formats cannot apply row filters at read time."""
+        with pytest.raises(ValueError):
+            ElectoralDataReader().read_file(str(prep_2024_csv), filters=[('ID_ENTIDAD', 'in', [9])])
+
+
+class TestArchiveSources:
+    """Files inside zip bundles are read without extracting them."""
+    
+    @pytest.fixture
+    def prep_zip(self, tmp_path, prep_2021_csv):
+        path = tmp_path / '20210607_2000_PREP_DIP.zip'
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(prep_2021_csv, 'PREP/diputaciones.csv')
+            archive.writestr('PREP/LEEME.txt', 'notas')
+        return path
+    
+    @pytest.mark.parametrize("engine", ["pandas", "pyarrow"])
+    def test_member_matches_extracted_file(self, prep_zip, prep_2021_csv, engine):
+        """Reading a member gives the same frame as reading the plain file."""
+        reader = ElectoralDataReader(csv_engine=engine)
+        
+        expected = reader.read_file(str(prep_2021_csv))
+        result = reader.read_file(str(prep_zip / 'PREP' / 'diputaciones.csv'))
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_member_chunks(self, prep_zip, prep_2021_csv):
+        """Members can be streamed in chunks."""
+        reader = ElectoralDataReader()
+        expected = pd.concat(reader.read_file_chunks(str(prep_2021_csv), chunksize=250))
+        chunks = list(reader.read_file_chunks(str(prep_zip / 'PREP' / 'diputaciones.csv'), chunksize=250))
+        
+        assert [len(chunk) for chunk in chunks][:2] == [250, 250]
+        pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+    
+    def test_member_metadata_and_listing(self, prep_zip):
+        """Member paths still carry the election name and date."""
+        assert list_archive_members(prep_zip) == ['PREP/diputaciones.csv', 'PREP/LEEME.txt']
+        assert split_archive_path(str(prep_zip / 'PREP' / 'diputaciones.csv')) == (prep_zip, 'PREP/diputaciones.csv')
+        assert infer_election_metadata(str(prep_zip / 'PREP' / 'diputaciones.csv')) == ('DIP_FED_2021', '2021-06-07')
+    
+    def test_missing_member(self, prep_zip):
+        """Unknown members raise FileNotFoundError like missing files."""
+        with pytest.raises(FileNotFoundError):
+            ElectoralDataReader().read_file(str(prep_zip / 'PREP' / 'senadurias.csv'))
+
+
+class TestSevenZipSources:
+    """7z members are extracted once and reused for sniffing, hashing and reading."""
+    
+    @pytest.fixture
+    def prep_7z(self, tmp_path, prep_2021_csv, monkeypatch):
+        py7zr = pytest.importorskip('py7zr')
+        monkeypatch.setattr(archives, 'EXTRACT_DIR', tmp_path / 'extracted')
+        path = tmp_path / '20210607_2000_PREP_DIP.7z'
+        with py7zr.SevenZipFile(path, 'w') as archive:
+            archive.write(prep_2021_csv, 'PREP/diputaciones.csv')
+        return path
+    
+    def test_member_extracted_once(self, tmp_path, prep_7z, prep_2021_csv, monkeypatch):
+        """Reading and hashing a member decompresses it to disk a single time."""
+        import py7zr
+        
+        extractions = []
+        extract = py7zr.SevenZipFile.extract
+        monkeypatch.setattr(
+            py7zr.SevenZipFile, 'extract',
+            lambda self, path=None, **k: extractions.append(path) or extract(self, path, **k)
+        )
+        member = str(prep_7z / 'PREP' / 'diputaciones.csv')
+        reader = ElectoralDataReader()
+        
+        result = reader.read_file(member)
+        ParquetStagingCache(str(tmp_path / 'staging')).content_hash(member)
+        reader.read_file(member)
+        
+        pd.testing.assert_frame_equal(result, reader.read_file(str(prep_2021_csv)))
+        assert len([path for path in extractions if path is not None]) == 1
+    
+    def test_head_without_extraction(self, prep_7z, prep_2021_csv):
+        """Sniffing the head of a member does not extract it."""
+        member = str(prep_7z / 'PREP' / 'diputaciones.csv')
+        
+        head = archives.read_source_head(member, 100)
+        
+        assert head == prep_2021_csv.read_bytes()[:100]
+        assert not archives.EXTRACT_DIR.exists() or not any(archives.EXTRACT_DIR.rglob('*.csv'))
+    
+    def test_extraction_removed_after_run(self, tmp_path, prep_7z):
+        """The orchestrator deletes a member's extracted copy once it has been read and staged."""
+        from analytics.clean_votes import CleanVotesOrchestrator
+        
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'))
+        df = orchestrator.process_electoral_file(
+            str(prep_7z / 'PREP' / 'diputaciones.csv'), election_name='DIP_FED_2021', save_to_db=False
+        )
+        
+        assert len(df) > 0
+        assert any((tmp_path / 'staging').glob('*.parquet'))
+        assert not archives.EXTRACT_DIR.exists() or not any(archives.EXTRACT_DIR.iterdir())
+
+
+class TestExcelReader:
+    """Single-pass Excel reading."""
+    
+    @pytest.fixture
+    def prep_xlsx(self, tmp_path):
+        """Workbook with a title preamble above the header."""
+        openpyxl = pytest.importorskip("openpyxl")
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['RESULTADOS PREP', None, None, None, 'nota'])
+        sheet.append([])
+        sheet.append(['ID_ENTIDAD', 'ENTIDAD', 'SECCION', 'PAN', 'OBSERVACIONES'])
+        sheet.append([1, 'AGUASCALIENTES', 338, 10, 'NA'])
+        sheet.append([1.0, 'AGUASCALIENTES', '0339', None, 'Sin acta'])
+        sheet.append([9, 'CIUDAD DE MÉXICO', 12, 20.5])
+        sheet.append([])
+        path = tmp_path / 'PRES_2024.xlsx'
+        workbook.save(path)
+        return path
+    
+    def test_matches_pandas(self, prep_xlsx):
+        """Output equals pd.read_excel with the header row given explicitly."""
+        expected = pd.read_excel(prep_xlsx, header=2, dtype=str)
+        
+        df = ElectoralDataReader().read_file(str(prep_xlsx))
+        
+        pd.testing.assert_frame_equal(df, expected)
+    
+    def test_workbook_opened_once(self, prep_xlsx, monkeypatch):
+        """The workbook is decoded a single time."""
+        import openpyxl
+        
+        calls = []
+        load_workbook = openpyxl.load_workbook
+        
+        def counting_load_workbook(*args, **kwargs):
+            calls.append(args)
+            return load_workbook(*args, **kwargs)
+        
+        monkeypatch.setattr(openpyxl, 'load_workbook', counting_load_workbook)
+        
+        ElectoralDataReader().read_file(str(prep_xlsx))
+        
+        assert len(calls) == 1
+    
+    def test_projection(self, prep_xlsx):
+        """Column projection applies to the detected header."""
+        df = ElectoralDataReader().read_file(str(prep_xlsx), usecols=lambda c: c != 'OBSERVACIONES')
+        
+        assert list(df.columns) == ['ID_ENTIDAD', 'ENTIDAD', 'SECCION', 'PAN']
+    
+    def test_chunks_match_full_read(self, prep_xlsx):
+        """Streamed chunks concatenate to the single-frame read."""
+        reader = ElectoralDataReader()
+        
+        chunks = list(reader.read_file_chunks(str(prep_xlsx), chunksize=2))
+        
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index=True), reader.read_file(str(prep_xlsx))
+        )
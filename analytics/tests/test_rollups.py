@@ -0,0 +1,113 @@
+"""
+Section Rollup Tests
+====================
+
+Tests for the municipio, distrito and entidad rollups.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.clean_votes import (
+    CleanVotesOrchestrator, ColumnMapper, CompactDtypeProfile, ElectoralDataCleaner, ElectoralDataReader, SectionRollup
+)
+
+
+@pytest.fixture
+def sections(prep_2024_csv):
+    """Cleaned section-level data for the 2024 fixture."""
+    df = ColumnMapper().homologate_columns(ElectoralDataReader().read_file(str(prep_2024_csv)))
+    return ElectoralDataCleaner().clean(df)
+
+
+class TestSectionRollup:
+    """Sums and vote-weighted shares per level."""
+    
+    def test_entidad_sums_and_shares(self, sections):
+        """Counts are summed; shares are each party's share of all votes."""
+        rollup = SectionRollup().build_level(sections, 'entidad')
+        cdmx = sections[sections['ID_ENTIDAD'] == 9]
+        row = rollup.set_index('ID_ENTIDAD').loc[9]
+        
+        assert len(rollup) == sections['ID_ENTIDAD'].nunique()
+        assert row['SECCIONES'] == len(cdmx)
+        assert row['ENTIDAD'] == cdmx['ENTIDAD'].iloc[0]
+        assert row['LISTA_NOMINAL'] == cdmx['LISTA_NOMINAL'].sum()
+        assert row['MORENA'] == cdmx['MORENA'].sum()
+        assert row['TOTAL_VOTOS_SUM'] == cdmx['TOTAL_VOTOS_SUM'].sum()
+        assert row['MORENA_PCT'] == pytest.approx(cdmx['MORENA'].sum() / cdmx['TOTAL_VOTOS_SUM'].sum() * 100)
+    
+    def test_distrito_partitions_sections(self, sections):
+        """Distrito rollups add up to the entidad rollup."""
+        rollup = SectionRollup()
+        distritos = rollup.build_level(sections, 'distrito')
+        entidades = rollup.build_level(sections, 'entidad')
+        
+        assert distritos['SECCIONES'].sum() == len(sections)
+        from_distritos = distritos.groupby('ID_ENTIDAD')['TOTAL_VOTOS_SUM'].sum()
+        assert (from_distritos.to_numpy() == entidades.set_index('ID_ENTIDAD')['TOTAL_VOTOS_SUM'].to_numpy()).all()
+    
+    def test_municipio_needs_geometry_attributes(self, sections):
+        """Municipio is skipped without MUNICIPIO and built when the shapefile provided it."""
+        rollup = SectionRollup()
+        assert set(rollup.build(sections)) == {'entidad', 'distrito'}
+        
+        sections = sections.assign(MUNICIPIO=np.where(sections['SECCION'] % 2 == 0, 1, 2))
+        municipios = rollup.build(sections)['municipio']
+        
+        assert list(municipios.columns[:2]) == ['ID_ENTIDAD', 'MUNICIPIO']
+        assert municipios['SECCIONES'].sum() == len(sections)
+    
+    def test_empty_votes(self):
+        """Areas without votes get 0 shares, not NaN."""
+        sections = pd.DataFrame({
+            'ID_ENTIDAD': [1, 1], 'ENTIDAD': ['A', 'A'], 'LISTA_NOMINAL': [10, 20],
+            'PAN': [0, 0], 'TOTAL_VOTOS_SUM': [0, 0], 'PAN_PCT': [0.0, 0.0],
+        })
+        
+        rollup = SectionRollup().build_level(sections, 'entidad')
+        
+        assert rollup['PAN_PCT'].tolist() == [0.0]
+        assert rollup['SECCIONES'].tolist() == [2]
+    
+    def test_compact_shares_match_cleaner(self, prep_2024_csv):
+        """With a dtype profile, rollup shares are narrowed the same way as section shares."""
+        profile = CompactDtypeProfile()
+        df = ColumnMapper().homologate_columns(ElectoralDataReader().read_file(str(prep_2024_csv)))
+        sections = ElectoralDataCleaner(dtype_profile=profile).clean(df)
+        
+        rollup = SectionRollup(dtype_profile=profile).build_level(sections, 'entidad')
+        
+        assert rollup['MORENA_PCT'].dtype == sections['MORENA_PCT'].dtype == profile.SHARE_DTYPE
+    
+    def test_unknown_level(self, sections):
+        """Unknown levels are rejected."""
+        with pytest.raises(ValueError, match="Invalid rollup level"):
+            SectionRollup().build_level(sections, 'colonia')
+
+
+class TestRollupStorage:
+    """The orchestrator writes rollups next to the section tables."""
+    
+    def test_saved_and_loaded(self, tmp_path, prep_2024_csv, sections):
+        """Each entidad gets its rollup tables; municipio is absent without geometry."""
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        orchestrator.process_electoral_file(str(prep_2024_csv), election_name='PRES_2024', election_date='2024-06-02')
+        
+        loaded = orchestrator.load_rollup('PRES_2024', 9, 'distrito')
+        expected = SectionRollup().build_level(sections[sections['ID_ENTIDAD'] == 9], 'distrito')
+        
+        pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)
+        with pytest.raises(ValueError, match="Table not found"):
+            orchestrator.load_rollup('PRES_2024', 9, 'municipio')
+    
+    def test_delete_drops_rollups(self, tmp_path, prep_2024_csv):
+        """Deleting an election table also drops its rollups."""
+        orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / 'electoral.db'), use_staging=False)
+        orchestrator.process_electoral_file(str(prep_2024_csv), election_name='PRES_2024', election_date='2024-06-02')
+        
+        orchestrator.database.delete_election('election_pres_2024_09')
+        
+        with pytest.raises(ValueError, match="Table not found"):
+            orchestrator.load_rollup('PRES_2024', 9, 'entidad')
@@ -0,0 +1,184 @@
+"""
+Shapefile Catalog Tests
+=======================
+
+Tests for the persistent SECCION shapefile index and its use in GeometryMerger.
+"""
+
+import shutil
+
+import pytest
+
+from analytics.clean_votes import GeometryCache, GeometryMerger, ShapefileCatalog
+from .conftest import write_seccion_shp
+
+
+def _swap_folders(base_dir, a, b):
+    """Swap the shapefiles of two entidad folders (the wrong-folder case)."""
+    peepjf = base_dir / 'shapefiles_peepjf'
+    tmp = peepjf / 'tmp'
+    shutil.move(str(peepjf / a), str(tmp))
+    shutil.move(str(peepjf / b), str(peepjf / a))
+    shutil.move(str(tmp), str(peepjf / b))
+
+
+class TestShapefileCatalog:
+    """Entidad comes from the file, lookups never read shapefiles."""
+    
+    def test_scan_and_reload(self, shapefile_base_dir, monkeypatch):
+        """A scan is persisted; a new instance looks up without probing any file."""
+        assert ShapefileCatalog(shapefile_base_dir).scan() == 3
+        
+        catalog = ShapefileCatalog(shapefile_base_dir)
+        monkeypatch.setattr(catalog, '_probe', lambda *a: pytest.fail("shapefile probed"))
+        
+        assert catalog.lookup(9, 'peepjf') == shapefile_base_dir / 'shapefiles_peepjf/9_CDMX/09/SECCION.shp'
+        assert catalog.lookup(9, 'nacional') is None
+        entry = next(e for e in catalog.entries() if e['entidad'] == 26)
+        assert entry['shapefile_type'] == 'peepjf' and entry['vintage'] is None
+    
+    def test_wrong_folder(self, shapefile_base_dir):
+        """Files are indexed by the ENTIDAD they hold, not their folder name."""
+        _swap_folders(shapefile_base_dir, '9_CDMX', '26_Sonora')
+        
+        catalog = ShapefileCatalog(shapefile_base_dir)
+        
+        assert catalog.lookup(9, 'peepjf').parts[-3] == '26_Sonora'
+        assert catalog.lookup(26, 'peepjf').parts[-3] == '9_CDMX'
+    
+    def test_vintages(self, shapefile_base_dir):
+        """The newest vintage wins unless one is requested."""
+        nacional = shapefile_base_dir / 'productos_ine_nacional' / '9_CDMX'
+        write_seccion_shp(nacional / 'cartografia_2021' / 'SECCION.shp', 9)
+        write_seccion_shp(nacional / 'cartografia_2024' / 'SECCION.shp', 9)
+        catalog = ShapefileCatalog(shapefile_base_dir)
+        
+        assert catalog.lookup(9, 'nacional').parts[-2] == 'cartografia_2024'
+        assert catalog.lookup(9, 'nacional', vintage='2021').parts[-2] == 'cartografia_2021'
+        assert catalog.lookup(9, 'nacional', vintage='2018') is None
+    
+    def test_changed_file_reprobed(self, shapefile_base_dir, monkeypatch):
+        """A file whose mtime/size changed is probed again on its own."""
+        ShapefileCatalog(shapefile_base_dir).scan()
+        path = shapefile_base_dir / 'shapefiles_peepjf/9_CDMX/09/SECCION.shp'
+        write_seccion_shp(path, 26, n_sections=12)
+        
+        catalog = ShapefileCatalog(shapefile_base_dir)
+        probed = []
+        probe = catalog._probe
+        monkeypatch.setattr(catalog, '_probe', lambda shp, t: probed.append(shp) or probe(shp, t))
+        
+        assert catalog.lookup(1, 'peepjf') is not None
+        assert probed == []
+        
+        # 9 no longer exists anywhere: one re-probe, then one refresh
+        assert catalog.lookup(9, 'peepjf') is None
+        assert probed == [path]
+        assert catalog.lookup(26, 'peepjf').parts[-3] in ('9_CDMX', '26_Sonora')
+    
+    def test_new_file_costs_one_refresh(self, shapefile_base_dir, monkeypatch):
+        """A shapefile added after the scan is found with a single refresh."""
+        ShapefileCatalog(shapefile_base_dir).scan()
+        write_seccion_shp(shapefile_base_dir / 'shapefiles_peepjf/14_Jalisco/14/SECCION.shp', 14)
+        
+        catalog = ShapefileCatalog(shapefile_base_dir)
+        scans = []
+        scan = catalog.scan
+        monkeypatch.setattr(catalog, 'scan', lambda: scans.append(1) or scan())
+        
+        assert catalog.lookup(14, 'peepjf') is not None
+        assert catalog.lookup(15, 'peepjf') is None
+        assert catalog.lookup(16, 'peepjf') is None
+        assert len(scans) == 1
+    
+    def test_entidad_of(self, tmp_path, shapefile_base_dir, monkeypatch):
+        """ENTIDAD comes from the catalog; changed or outside files read the .dbf alone."""
+        import geopandas
+        
+        ShapefileCatalog(shapefile_base_dir).scan()
+        path = shapefile_base_dir / 'shapefiles_peepjf/9_CDMX/09/SECCION.shp'
+        catalog = ShapefileCatalog(shapefile_base_dir)
+        
+        monkeypatch.setattr('geopandas.read_file', lambda *a, **k: pytest.fail("shapefile read"))
+        assert catalog.entidad_of(path) == 9
+        
+        reads = []
+        monkeypatch.undo()
+        read_file = geopandas.read_file
+        monkeypatch.setattr('geopandas.read_file', lambda p, **k: reads.append((p, k)) or read_file(p, **k))
+        write_seccion_shp(path, 26, n_sections=12)
+        outside = write_seccion_shp(tmp_path / 'elsewhere' / 'SECCION.shp', 1)
+        
+        assert catalog.entidad_of(path) == 26
+        assert catalog.entidad_of(outside) == 1
+        assert [p.suffix for p, _ in reads] == ['.dbf', '.dbf']
+        assert all(k['ignore_geometry'] for _, k in reads)
+        assert sorted(e['entidad'] for e in ShapefileCatalog(shapefile_base_dir).entries()) == [1, 26, 26]
+
+
+class TestGeometryMergerCatalog:
+    """GeometryMerger resolves shapefiles through the catalog."""
+    
+    def test_merge_from_wrong_folder(self, shapefile_base_dir):
+        """Swapped folders are merged with the right polygons."""
+        import pandas as pd
+        
+        _swap_folders(shapefile_base_dir, '9_CDMX', '26_Sonora')
+        df = pd.DataFrame({'ID_ENTIDAD': [9, 9], 'SECCION': [1, 2], 'PAN': [10, 20]})
+        
+        gdf = GeometryMerger(str(shapefile_base_dir)).merge_with_shapefile(df, entidad_id=9, shapefile_type='peepjf')
+        
+        assert len(gdf) == 2
+        assert gdf['ENTIDAD'].tolist() == [9, 9]
+        assert (shapefile_base_dir / ShapefileCatalog.CATALOG_NAME).exists()
+    
+    def test_missing_entidad(self, shapefile_base_dir):
+        """Entidades without a shapefile still raise FileNotFoundError."""
+        import pandas as pd
+        
+        df = pd.DataFrame({'ID_ENTIDAD': [14], 'SECCION': [1]})
+        
+        with pytest.raises(FileNotFoundError):
+            GeometryMerger(str(shapefile_base_dir)).merge_with_shapefile(df, entidad_id=14, shapefile_type='peepjf')
+
+
+class TestProjectedReads:
+    """Shapefiles are read through Arrow, with only the columns the merge needs."""
+    
+    @pytest.fixture
+    def reads(self, monkeypatch):
+        """Record (path, kwargs) of every geopandas.read_file call."""
+        import geopandas
+        
+        calls = []
+        read_file = geopandas.read_file
+        monkeypatch.setattr('geopandas.read_file', lambda path, **k: calls.append((path, k)) or read_file(path, **k))
+        return calls
+    
+    def test_default_columns(self, shapefile_base_dir, reads):
+        """The merge loads ENTIDAD, SECCION and MUNICIPIO through the Arrow path."""
+        import pandas as pd
+        
+        df = pd.DataFrame({'ID_ENTIDAD': [9], 'SECCION': [1], 'PAN': [10]})
+        merger = GeometryMerger(str(shapefile_base_dir), geometry_cache=GeometryCache())
+        
+        gdf = merger.merge_with_shapefile(df, entidad_id=9, shapefile_type='peepjf')
+        
+        assert list(gdf.columns[:4]) == ['ENTIDAD', 'MUNICIPIO', 'SECCION', 'geometry']
+        geometry_reads = [k for _, k in reads if not k.get('ignore_geometry')]
+        assert geometry_reads and all(k.get('use_arrow') for k in geometry_reads)
+        assert geometry_reads[0]['columns'] == list(GeometryMerger.MERGE_COLUMNS)
+    
+    def test_wrong_entidad_check_skips_geometry(self, shapefile_base_dir, reads):
+        """A wrong shapefile is detected from its attributes; only the right one is decoded."""
+        import pandas as pd
+        
+        df = pd.DataFrame({'ID_ENTIDAD': [9], 'SECCION': [1], 'PAN': [10]})
+        wrong_path = shapefile_base_dir / 'shapefiles_peepjf' / '26_Sonora' / '26' / 'SECCION.shp'
+        merger = GeometryMerger(str(shapefile_base_dir), geometry_cache=GeometryCache())
+        
+        gdf = merger.merge_with_shapefile(df, shapefile_path=str(wrong_path), entidad_id=9, shapefile_type='peepjf')
+        
+        assert gdf['ENTIDAD'].tolist() == [9]
+        geometry_reads = [path for path, k in reads if not k.get('ignore_geometry')]
+        assert [p.parent.name for p in geometry_reads] == ['09']
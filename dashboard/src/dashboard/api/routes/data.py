@@ -18,6 +18,7 @@ sys.path.insert(0, str(shared_path))
 from config.estados import ENTIDADES
 from dashboard.api.models import ElectionMetadata, StateInfo
 from dashboard.api.services import DataService
+from analytics.clean_votes import SectionRollup
 
 logger = logging.getLogger(__name__)
 
@@ -167,7 +168,8 @@ async def get_election_data(
 async def get_election_metrics(
     election_name: str,
     entidad_id: int,
-    variables: List[str] = Query(None, description="Variables to include")
+    variables: List[str] = Query(None, description="Variables to include"),
+    weighted: bool = Query(False, description="Vote-weighted shares instead of the mean of section shares")
 ):
     """
     Get aggregated metrics for an election and state.
@@ -176,6 +178,8 @@ async def get_election_metrics(
         election_name: Name of the election
         entidad_id: State ID (1-32)
         variables: Optional list of variables to include
+        weighted: Serve vote-weighted shares from the entidad rollup
+                 (as /rollup/entidad) instead of the mean of section shares
         
     Returns:
         Aggregated metrics dictionary
@@ -190,7 +194,8 @@ async def get_election_metrics(
         metrics = data_service.get_aggregated_metrics(
             election_name=election_name,
             entidad_id=entidad_id,
-            variables=variables
+            variables=variables,
+            weighted=weighted
         )
         
         return metrics
@@ -200,3 +205,61 @@ async def get_election_metrics(
     except Exception as e:
         logger.error(f"Error computing metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/election/{election_name}/{entidad_id}/rollup/{level}")
+async def get_election_rollup(election_name: str, entidad_id: int, level: str):
+    """
+    Get municipio, distrito or entidad totals for an election and state.
+    
+    Args:
+        election_name: Name of the election
+        entidad_id: State ID (1-32)
+        level: Rollup level ('municipio', 'distrito' or 'entidad')
+    
+    Returns:
+        One record per area with vote sums and vote-weighted shares
+    """
+    try:
+        if entidad_id < 1 or entidad_id > 32:
+            raise HTTPException(
+                status_code=400,
+                detail="entidad_id must be between 1 and 32"
+            )
+        
+        if level not in SectionRollup.LEVELS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"level must be one of {list(SectionRollup.LEVELS)}"
+            )
+        
+        rollup = data_service.get_rollup(
+            election_name=election_name,
+            entidad_id=entidad_id,
+            level=level
+        )
+        
+        return rollup.to_dict('records')
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error loading rollup: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cache/geometry")
+async def get_geometry_cache_stats():
+    """
+    Get hit/miss counters of the prepared-geometry cache.
+    
+    Returns:
+        Cache statistics (hits, misses, evictions, hit_rate, entries, bytes)
+    """
+    try:
+        return data_service.get_geometry_cache_stats()
+    except Exception as e:
+        logger.error(f"Error fetching geometry cache stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
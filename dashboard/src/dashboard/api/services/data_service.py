@@ -17,7 +17,7 @@ import logging
 analytics_path = Path(__file__).parents[5] / "analytics" / "src"
 sys.path.insert(0, str(analytics_path))
 
-from analytics.clean_votes import CleanVotesOrchestrator
+from analytics.clean_votes import CleanVotesOrchestrator, SectionRollup
 from dashboard.config import DEFAULT_DB_PATH, MAJOR_PARTIES
 
 logger = logging.getLogger(__name__)
@@ -168,11 +168,57 @@ class DataService:
             logger.error(f"Error loading election data: {e}")
             raise ValueError(f"Failed to load election data: {str(e)}")
     
+    def get_rollup(self, election_name: str, entidad_id: int, level: str) -> pd.DataFrame:
+        """
+        Get the municipio, distrito or entidad rollup of an election and state.
+        
+        Reads the rollup table written by the orchestrator. Databases written
+        before rollups existed fall back to aggregating the section table.
+        
+        Args:
+            election_name: Name of the election
+            entidad_id: State ID (1-32)
+            level: Rollup level ('municipio', 'distrito' or 'entidad')
+        
+        Returns:
+            Rollup DataFrame with vote sums and vote-weighted shares
+        
+        Raises:
+            ValueError: If the level is unknown or no data is available for it
+        """
+        if level not in SectionRollup.LEVELS:
+            raise ValueError(f"Invalid rollup level: {level}. Must be one of {list(SectionRollup.LEVELS)}.")
+        
+        try:
+            return self.orchestrator.load_rollup(election_name.upper(), entidad_id, level)
+        except ValueError:
+            logger.warning(f"No {level} rollup stored for {election_name}, entidad_id={entidad_id}; "
+                           f"aggregating section rows")
+        
+        df = self.load_election_data(election_name, entidad_id, as_geodataframe=False)
+        rollups = SectionRollup().build(df, levels=[level])
+        if level not in rollups:
+            raise ValueError(f"No {level} data for {election_name}, entidad_id={entidad_id}")
+        return rollups[level]
+    
+    def get_geometry_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters of the prepared-geometry cache.
+        
+        The cache is shared with every orchestrator in this process, so
+        geometry merged for one election is reused for the others.
+        
+        Returns:
+            Dictionary with hits, misses, evictions, hit_rate, entries and sizes
+        """
+        return self.orchestrator.geometry_merger.geometry_cache.stats()
+    
     def get_aggregated_metrics(
         self,
         election_name: str,
         entidad_id: int,
-        variables: Optional[List[str]] = None
+        variables: Optional[List[str]] = None,
+        weighted: bool = False
     ) -> Dict[str, Any]:
         """
         Get aggregated metrics for an election and state.
@@ -181,11 +227,22 @@ class DataService:
             election_name: Name of the election
             entidad_id: State ID
             variables: List of variables to include (default: major parties)
+            weighted: Serve vote-weighted shares (a party's share of all votes
+                     in the state) from the entidad rollup, without loading the
+                     sections. By default shares are the mean of section shares.
             
         Returns:
             Dictionary with aggregated metrics
         """
-        df = self.load_election_data(election_name, entidad_id, as_geodataframe=False)
+        if weighted:
+            rollup = self.get_rollup(election_name, entidad_id, 'entidad')
+            if len(rollup) == 0:
+                raise ValueError(f"No data for {election_name}, entidad_id={entidad_id}")
+            df = rollup
+            sections = int(rollup["SECCIONES"].iloc[0])
+        else:
+            df = self.load_election_data(election_name, entidad_id, as_geodataframe=False)
+            sections = len(df)
         
         if variables is None:
             variables = [f"{party}_PCT" for party in MAJOR_PARTIES if f"{party}_PCT" in df.columns]
@@ -194,11 +251,12 @@ class DataService:
             "election_name": election_name.upper(),
             "entidad_id": entidad_id,
             "entidad_name": df["ENTIDAD"].iloc[0] if "ENTIDAD" in df.columns else f"State {entidad_id}",
-            "sections": len(df),
+            "sections": sections,
             "total_votes": float(df["TOTAL_VOTOS_SUM"].sum()) if "TOTAL_VOTOS_SUM" in df.columns else 0,
+            "weighted": weighted,
         }
         
-        # Add party percentages
+        # Add party percentages (a single rollup row, or the mean over sections)
         for var in variables:
             if var in df.columns:
                 metrics[var] = float(df[var].mean())
@@ -5,6 +5,7 @@ Pytest Configuration and Fixtures
 Shared fixtures for testing the Electoral Dashboard.
 """
 
+import pandas as pd
 import pytest
 from fastapi.testclient import TestClient
 import sys
@@ -15,6 +16,8 @@ dashboard_path = Path(__file__).parents[1] / "src"
 sys.path.insert(0, str(dashboard_path))
 
 from dashboard.api.main import app
+from dashboard.api.routes.data import data_service
+from analytics.clean_votes import CleanVotesOrchestrator, SectionRollup
 
 
 @pytest.fixture
@@ -45,3 +48,31 @@ def sample_variable():
 def sample_entidad_ids():
     """Sample state IDs for comparison."""
     return [1, 9, 15, 19]  # Aguascalientes, CDMX, Estado de México, Nuevo León
+
+
+@pytest.fixture
+def rollup_db(tmp_path, monkeypatch):
+    """
+    Database with PRES_2024 sections and rollups for CDMX only, served by the data routes.
+    
+    MORENA has 10 of 100 votes in distrito 1 and 100 of 200 plus 20 of 100
+    in distrito 2: a 40% vote-weighted share there, against a 35% mean.
+    """
+    sections = pd.DataFrame({
+        "ID_ENTIDAD": [9, 9, 9],
+        "ENTIDAD": ["CIUDAD DE MEXICO"] * 3,
+        "ID_DISTRITO_FEDERAL": [1, 2, 2],
+        "SECCION": [1, 2, 3],
+        "LISTA_NOMINAL": [200, 250, 350],
+        "MORENA": [10, 100, 20],
+        "TOTAL_VOTOS_SUM": [100, 200, 100],
+        "MORENA_PCT": [10.0, 50.0, 20.0],
+    })
+    orchestrator = CleanVotesOrchestrator(db_path=str(tmp_path / "electoral.db"))
+    orchestrator.database.save_electoral_data(
+        sections, election_name="PRES_2024", entidad_id=9, entidad_name="CIUDAD DE MEXICO"
+    )
+    orchestrator.database.save_rollups(SectionRollup().build(sections), "PRES_2024", 9)
+    
+    monkeypatch.setattr(data_service, "orchestrator", orchestrator)
+    return orchestrator
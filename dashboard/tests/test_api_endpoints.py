@@ -5,8 +5,12 @@ API Endpoints Tests
 Tests for all API endpoints.
 """
 
+import pandas as pd
 import pytest
 
+from analytics.clean_votes import SectionRollup
+from dashboard.api.routes.data import data_service
+
 
 class TestHealthEndpoints:
     """Test health check endpoints."""
@@ -93,6 +97,67 @@ class TestDataEndpoints:
             assert "election_name" in data
             assert "entidad_id" in data
             assert "sections" in data
+    
+    def test_get_election_metrics_weighted(self, client, monkeypatch):
+        """Test that weighted metrics are vote-weighted and the default is the mean of section shares."""
+        # MORENA: 10 of 100 votes (10%) and 150 of 300 votes (50%)
+        sections = pd.DataFrame({
+            "ID_ENTIDAD": [9, 9],
+            "ENTIDAD": ["CIUDAD DE MEXICO"] * 2,
+            "SECCION": [1, 2],
+            "MORENA": [10, 150],
+            "TOTAL_VOTOS_SUM": [100, 300],
+            "MORENA_PCT": [10.0, 50.0],
+        })
+        orchestrator = data_service.orchestrator
+        monkeypatch.setattr(orchestrator, "load_election_data", lambda *args, **kwargs: sections)
+        monkeypatch.setattr(
+            orchestrator, "load_rollup", lambda election_name, entidad_id, level: SectionRollup().build_level(sections, level)
+        )
+        
+        mean = client.get("/api/data/election/PRES_2024/9/metrics").json()
+        weighted = client.get("/api/data/election/PRES_2024/9/metrics", params={"weighted": True}).json()
+        
+        assert mean["MORENA_PCT"] == pytest.approx(30.0) and not mean["weighted"]
+        assert weighted["MORENA_PCT"] == pytest.approx(160 / 400 * 100) and weighted["weighted"]
+        assert weighted["sections"] == mean["sections"] == 2
+        assert weighted["total_votes"] == mean["total_votes"] == 400
+    
+    def test_get_election_rollup(self, client, rollup_db):
+        """Test getting distrito-level totals with vote-weighted shares."""
+        response = client.get("/api/data/election/PRES_2024/9/rollup/distrito")
+        
+        assert response.status_code == 200
+        data = {row["ID_DISTRITO_FEDERAL"]: row for row in response.json()}
+        assert set(data) == {1, 2}
+        assert data[2]["SECCIONES"] == 2
+        assert data[2]["LISTA_NOMINAL"] == 600
+        assert data[2]["MORENA"] == 120
+        assert data[2]["TOTAL_VOTOS_SUM"] == 300
+        assert data[1]["MORENA_PCT"] == pytest.approx(10.0)
+        assert data[2]["MORENA_PCT"] == pytest.approx(120 / 300 * 100)
+    
+    def test_get_election_rollup_not_found(self, client, rollup_db):
+        """Test that a state without stored data returns 404."""
+        response = client.get("/api/data/election/PRES_2024/15/rollup/distrito")
+        
+        assert response.status_code == 404
+    
+    def test_get_election_rollup_invalid_level(self, client, sample_election_name, sample_entidad_id):
+        """Test that unknown rollup levels are rejected."""
+        response = client.get(
+            f"/api/data/election/{sample_election_name}/{sample_entidad_id}/rollup/colonia"
+        )
+        
+        assert response.status_code == 400
+    
+    def test_geometry_cache_stats(self, client):
+        """Test the shared geometry cache counters."""
+        response = client.get("/api/data/cache/geometry")
+        assert response.status_code == 200
+        data = response.json()
+        for key in ["hits", "misses", "hit_rate", "entries", "max_entries"]:
+            assert key in data
 
 
 class TestSpatialEndpoints: